@@ -1,16 +1,14 @@
 import logging
 from functools import cache
-from hfst_optimized_lookup import TransducerFile
-from django.conf import settings
+
+from morphodict.analysis import FST_DIR, caching_transducer
 
 logger = logging.getLogger(__name__)
 
 
 @cache
 def cmro_transcriptor():
-    return TransducerFile(
-        settings.BASE_DIR / "resources" / "fst" / "default-to-cmro.hfstol"
-    )
+    return caching_transducer("cmro_transcriptor", FST_DIR / "default-to-cmro.hfstol")
 
 
 def to_cmro(sro_circumflex: str) -> str:
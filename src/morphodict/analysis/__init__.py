@@ -1,30 +1,61 @@
 import re
 from functools import cache
+from typing import Iterable, Optional
 
 from django.conf import settings
 from hfst_optimized_lookup import TransducerFile, Analysis
 
+from morphodict.analysis.transducer import CachingTransducer, TransducerCacheStats
+
 FST_DIR = settings.BASE_DIR / "resources" / "fst"
 
+# Every CachingTransducer created so far, by name, for reporting stats
+_loaded_transducers: dict[str, CachingTransducer] = {}
+
+
+def caching_transducer(name: str, path) -> CachingTransducer:
+    """Load the FST at path with a lookup cache, reporting its stats as name"""
+    transducer = CachingTransducer(
+        TransducerFile(path), getattr(settings, "MORPHODICT_FST_CACHE_SIZE", 10_000)
+    )
+    _loaded_transducers[name] = transducer
+    return transducer
+
+
+def transducer_cache_stats() -> dict[str, TransducerCacheStats]:
+    """Return the lookup cache stats of every transducer loaded so far"""
+    return {
+        name: transducer.stats() for name, transducer in _loaded_transducers.items()
+    }
+
 
 @cache
 def strict_generator():
-    return TransducerFile(FST_DIR / settings.STRICT_GENERATOR_FST_FILENAME)
+    return caching_transducer(
+        "strict_generator", FST_DIR / settings.STRICT_GENERATOR_FST_FILENAME
+    )
 
 
 @cache
 def strict_generator_with_morpheme_boundaries():
-    return TransducerFile(FST_DIR / "generator-gt-dict-norm-with-boundaries.hfstol")
+    return caching_transducer(
+        "strict_generator_with_morpheme_boundaries",
+        FST_DIR / "generator-gt-dict-norm-with-boundaries.hfstol",
+    )
 
 
 @cache
 def relaxed_analyzer():
-    return TransducerFile(FST_DIR / settings.RELAXED_ANALYZER_FST_FILENAME)
+    return caching_transducer(
+        "relaxed_analyzer", FST_DIR / settings.RELAXED_ANALYZER_FST_FILENAME
+    )
 
 
 @cache
 def strict_analyzer():
-    return TransducerFile(FST_DIR / settings.STRICT_ANALYZER_FST_FILENAME)
+    return caching_transducer(
+        "strict_analyzer", FST_DIR / settings.STRICT_ANALYZER_FST_FILENAME
+    )
 
 
 def rich_analyze_relaxed(text):
@@ -39,6 +70,72 @@ def rich_analyze_strict(text):
     )
 
 
+def bulk_generate_with_morphemes(
+    requests: Iterable[tuple["RichAnalysis", str]],
+) -> dict[tuple["RichAnalysis", str], Optional[list[str]]]:
+    """Segment many (analysis, inflection) pairs into morphemes at once
+
+    This does the same thing as calling RichAnalysis.generate_with_morphemes()
+    on every pair, but with a single bulk lookup in the generator FST.
+    """
+    requests = set(requests)
+    segmented = bulk_segment_analyses(
+        (analysis.smushed(), inflection) for analysis, inflection in requests
+    )
+    return {
+        (analysis, inflection): segmented[analysis.smushed(), inflection]
+        for analysis, inflection in requests
+    }
+
+
+def bulk_segment_analyses(
+    requests: Iterable[tuple[str, str]],
+) -> dict[tuple[str, str], Optional[list[str]]]:
+    """Segment many (analysis string, inflection) pairs into morphemes at once
+
+    Like bulk_generate_with_morphemes(), for analyses that are already strings,
+    such as those generated from paradigm layouts.
+    """
+    requests = set(requests)
+    if not requests:
+        return {}
+
+    try:
+        generated = strict_generator_with_morpheme_boundaries().bulk_lookup(
+            {analysis for analysis, _ in requests}
+        )
+    except RuntimeError as e:
+        print("Could not generate morphemes:", e)
+        return {request: [] for request in requests}
+
+    return {
+        (analysis, inflection): _select_morphemes(
+            # bulk_lookup returns sets; sort them for deterministic output
+            sorted(generated.get(analysis, ())),
+            inflection,
+        )
+        for analysis, inflection in requests
+    }
+
+
+def _select_morphemes(results, inflection) -> Optional[list[str]]:
+    """Pick the generated form with boundaries that matches the inflection
+
+    >>> _select_morphemes(["nip<âw"], "nipâw")
+    ['nip', 'âw']
+    >>> _select_morphemes(["a<b", "ab<c"], "abc")
+    ['ab', 'c']
+    >>> _select_morphemes([], "abc") is None
+    True
+    """
+    if len(results) != 1:
+        for result in results:
+            if "".join(re.split(r"[<>]", result)) == inflection:
+                return re.split(r"[<>]", result)
+        return None
+    return re.split(r"[<>]", results[0])
+
+
 class RichAnalysis:
     """The one true FST analysis class.
 
@@ -81,15 +178,10 @@ class RichAnalysis:
     def generate_with_morphemes(self, inflection):
         try:
             results = strict_generator_with_morpheme_boundaries().lookup(self.smushed())
-            if len(results) != 1:
-                for result in results:
-                    if "".join(re.split(r"[<>]", result)) == inflection:
-                        return re.split(r"[<>]", result)
-                return None
-            return re.split(r"[<>]", results[0])
         except RuntimeError as e:
             print("Could not generate morphemes:", e)
             return []
+        return _select_morphemes(results, inflection)
 
     def smushed(self):
         return "".join(self.prefix_tags) + self.lemma + "".join(self.suffix_tags)
@@ -0,0 +1,107 @@
+"""
+Memoizing wrapper around HFST transducers
+
+The same strings are looked up over and over: the analyses of popular
+queries, the cells of popular paradigms, the morphemes of the same lemmas.
+CachingTransducer has the lookup API of hfst_optimized_lookup.TransducerFile,
+but remembers the most recent results in a bounded LRU cache.
+
+The cache is shared between threads. Every call returns new lists and sets,
+so callers may modify what they get back.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable, TypeVar
+
+from hfst_optimized_lookup import Analysis, TransducerFile
+
+T = TypeVar("T")
+
+
+@dataclass
+class TransducerCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class CachingTransducer:
+    def __init__(self, transducer: TransducerFile, maxsize: int):
+        """
+        Wrap transducer, caching up to maxsize results
+
+        With a maxsize of 0, nothing is cached, but lookups are still
+        counted as misses.
+        """
+        if maxsize < 0:
+            raise ValueError(f"cache size must not be negative, not {maxsize}")
+        self._transducer = transducer
+        self._maxsize = maxsize
+        # Keys are (method name, input string), so that results of different
+        # methods don’t get mixed up
+        self._entries: OrderedDict[tuple[str, str], tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def lookup(self, string: str) -> list[str]:
+        return list(self._cached("lookup", string, self._transducer.lookup))
+
+    def lookup_lemma_with_affixes(self, string: str) -> list[Analysis]:
+        return list(
+            self._cached(
+                "lookup_lemma_with_affixes",
+                string,
+                self._transducer.lookup_lemma_with_affixes,
+            )
+        )
+
+    def bulk_lookup(self, strings: Iterable[str]) -> dict[str, set[str]]:
+        # TransducerFile.bulk_lookup is a loop over lookup() too
+        return {
+            string: set(self._cached("lookup", string, self._transducer.lookup))
+            for string in strings
+        }
+
+    def _cached(self, method: str, string: str, do_lookup: Callable[[str], list[T]]):
+        key = (method, string)
+        with self._lock:
+            results = self._entries.get(key)
+            if results is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return results
+            self._misses += 1
+
+        # Looked up outside the lock, so that threads don’t wait on each
+        # other’s lookups. Two threads may occasionally both look up the same
+        # string; they get the same results.
+        results = tuple(do_lookup(string))
+
+        if self._maxsize:
+            with self._lock:
+                self._entries[key] = results
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._maxsize:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> TransducerCacheStats:
+        with self._lock:
+            return TransducerCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+            )
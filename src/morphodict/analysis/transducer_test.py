@@ -0,0 +1,89 @@
+from collections import Counter
+
+import pytest
+from hfst_optimized_lookup import Analysis
+
+from morphodict.analysis.transducer import CachingTransducer
+
+
+class CountingTransducer:
+    """Turns every input into two outputs, counting lookups"""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def lookup(self, string):
+        self.calls[string] += 1
+        return [string + "+A", string + "+B"]
+
+    def lookup_lemma_with_affixes(self, string):
+        self.calls[string] += 1
+        return [Analysis(prefixes=(), lemma=string, suffixes=("+A",))]
+
+
+def test_repeated_lookups_are_cached():
+    fst = CountingTransducer()
+    transducer = CachingTransducer(fst, maxsize=10)
+
+    assert transducer.lookup("x") == ["x+A", "x+B"]
+    assert transducer.lookup("x") == ["x+A", "x+B"]
+    assert transducer.bulk_lookup(["x", "y"]) == {
+        "x": {"x+A", "x+B"},
+        "y": {"y+A", "y+B"},
+    }
+
+    assert fst.calls == {"x": 1, "y": 1}
+    stats = transducer.stats()
+    assert (stats.hits, stats.misses, stats.size) == (2, 2, 2)
+
+
+def test_methods_are_cached_separately():
+    fst = CountingTransducer()
+    transducer = CachingTransducer(fst, maxsize=10)
+
+    transducer.lookup("x")
+    assert transducer.lookup_lemma_with_affixes("x") == [
+        Analysis(prefixes=(), lemma="x", suffixes=("+A",))
+    ]
+    assert fst.calls["x"] == 2
+
+
+def test_results_can_be_modified():
+    transducer = CachingTransducer(CountingTransducer(), maxsize=10)
+
+    transducer.lookup("x").append("oops")
+    transducer.bulk_lookup(["x"])["x"].add("oops")
+
+    assert transducer.lookup("x") == ["x+A", "x+B"]
+
+
+def test_least_recently_used_are_evicted():
+    fst = CountingTransducer()
+    transducer = CachingTransducer(fst, maxsize=2)
+
+    transducer.lookup("a")
+    transducer.lookup("b")
+    transducer.lookup("a")
+    transducer.lookup("c")
+    transducer.lookup("a")
+    transducer.lookup("b")
+
+    assert fst.calls == {"a": 1, "b": 2, "c": 1}
+    stats = transducer.stats()
+    assert (stats.evictions, stats.size) == (2, 2)
+
+
+def test_zero_size_disables_caching():
+    fst = CountingTransducer()
+    transducer = CachingTransducer(fst, maxsize=0)
+
+    transducer.lookup("x")
+    transducer.lookup("x")
+
+    assert fst.calls["x"] == 2
+    assert transducer.stats().size == 0
+
+
+def test_negative_size():
+    with pytest.raises(ValueError):
+        CachingTransducer(CountingTransducer(), maxsize=-1)
@@ -32,12 +32,12 @@ class APIConfig(AppConfig):
             self.perform_time_consuming_initializations()
 
     def perform_time_consuming_initializations(self):
-        from morphodict.search import affix
-        from morphodict.lexicon.models import wordform_cache
+        from morphodict.search import affix, frequency, preverbs
 
         logger.debug("preloading caches")
         affix.cache.preload()
-        wordform_cache.preload()
+        preverbs.cache.preload()
+        frequency.tables.preload()
         if settings.MORPHODICT_ENABLE_CVD:
             cvd.preload_models()
 
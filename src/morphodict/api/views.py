@@ -13,6 +13,7 @@ from typing import Any, TypedDict
 from nltk.corpus import wordnet as wn
 
 from morphodict.frontend.views import (
+    get_page_params,
     should_include_auto_definitions,
     should_inflect_phrases,
 )
@@ -37,6 +38,7 @@ class SearchApiDict(TypedDict):
     query_string: str
     search_results: list[SerializedPresentationResult]
     did_search: bool
+    has_more: bool
 
 
 @require_GET
@@ -52,7 +54,12 @@ def click_in_text(request: HttpRequest) -> HttpResponse:
     elif q == "":
         return HttpResponseBadRequest("query param q is an empty string")
 
-    results = api_search(q, include_auto_definitions=False)
+    try:
+        limit, offset = get_page_params(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    results = api_search(q, include_auto_definitions=False, limit=limit, offset=offset)
 
     response = {"results": results}
 
@@ -253,7 +260,7 @@ def wordnet_index_search(request: HttpRequest) -> HttpResponse:
 
 
 @require_GET
-def search_api(request: HttpRequest) -> JsonResponse:
+def search_api(request: HttpRequest) -> HttpResponse:
     """
     homepage with optional initial search results to display
 
@@ -263,8 +270,18 @@ def search_api(request: HttpRequest) -> JsonResponse:
 
     query_string = request.GET.get("query")
 
+    try:
+        limit, offset = get_page_params(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
     json_response = JsonResponse(
-        {"query_string": "", "search_results": [], "did_search": False}
+        {
+            "query_string": "",
+            "search_results": [],
+            "did_search": False,
+            "has_more": False,
+        }
     )
 
     if query_string:
@@ -273,13 +290,18 @@ def search_api(request: HttpRequest) -> JsonResponse:
             include_auto_definitions=should_include_auto_definitions(request),
             inflect_english_phrases=should_inflect_phrases(request),
         )
-        search_results = search_run.serialized_presentation_results()
+        # Ask for one extra result to find out if there is another page
+        search_results = search_run.serialized_presentation_results(
+            limit=None if limit is None else limit + 1, offset=offset
+        )
+        has_more = limit is not None and len(search_results) > limit
 
         json_response = JsonResponse(
             {
                 "query_string": query_string,
-                "search_results": search_results,
+                "search_results": search_results[:limit],
                 "did_search": True,
+                "has_more": has_more,
             }
         )
 
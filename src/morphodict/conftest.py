@@ -1,6 +1,7 @@
 import pytest
 from django.conf import settings
 from morphodict.search.affix import cache as affix_cache
+from morphodict.search.preverbs import cache as preverb_cache
 
 # See “`conftest.py`: sharing fixtures across multiple files”
 # https://docs.pytest.org/en/stable/fixture.html#conftest-py-sharing-fixtures-across-multiple-files
@@ -53,3 +54,4 @@ def django_db_setup(request, django_db_blocker):
             call_command("ensuretestdb", verbosity=0)
             affix_cache.flush()
             affix_cache.preload()
+            preverb_cache.flush()
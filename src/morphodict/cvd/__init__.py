@@ -1,11 +1,17 @@
+import hashlib
+import json
 import logging
 import re
 from functools import cache
 from os import fspath
+from pathlib import Path
+from typing import Optional
 
+import numpy as np
 from django.conf import settings
 from gensim.models import KeyedVectors
 
+from morphodict.cvd.ann import IVFIndex, ann_index_path
 from morphodict.lexicon import MORPHODICT_LEXICON_RESOURCE_DIR
 from morphodict.relabelling import LABELS
 
@@ -28,10 +34,32 @@ def _load_vectors(path):
 
 
 @cache
-def google_news_vectors():
+def full_news_vectors():
+    """The full Google News model, with about three million keys"""
     return _load_vectors(shared_vector_model_dir / "news_vectors.kv")
 
 
+def pruned_news_vectors_path():
+    filename = "news_vectors_pruned.kv"
+    if settings.USE_TEST_DB:
+        filename = f"test_db_{filename}"
+    return language_specific_vector_model_dir / filename
+
+
+@cache
+def google_news_vectors():
+    """The news vectors used at runtime for looking up query words
+
+    This is the model at settings.MORPHODICT_NEWS_VECTORS_PATH, usually one
+    made by `manage.py buildprunednewsvectors`, or the full model if that
+    setting is not set.
+    """
+    path = getattr(settings, "MORPHODICT_NEWS_VECTORS_PATH", None)
+    if path:
+        return _load_vectors(path)
+    return full_news_vectors()
+
+
 class DefinitionVectorsNotFoundException(Exception):
     def __init__(self):
         super().__init__(
@@ -55,16 +83,159 @@ def definition_vectors():
         raise DefinitionVectorsNotFoundException
 
 
+def vectors_fingerprint(keyed_vectors: KeyedVectors) -> str:
+    """A hash of the keys and vectors, to tell whether files built alongside
+    the vectors were built from these same vectors"""
+    h = hashlib.sha256()
+    h.update("\n".join(keyed_vectors.index_to_key).encode("UTF-8"))
+    h.update(np.ascontiguousarray(keyed_vectors.vectors).data)
+    return h.hexdigest()
+
+
+@cache
+def definition_vectors_fingerprint() -> str:
+    return vectors_fingerprint(definition_vectors())
+
+
+@cache
+def definition_vectors_index() -> Optional[IVFIndex]:
+    """Return the ANN index for definition_vectors(), or None if unusable"""
+    path = ann_index_path(definition_vectors_path())
+    try:
+        index = IVFIndex.load(path)
+    except FileNotFoundError:
+        logger.warning(
+            f"No ANN index at {path}, falling back to exact cosine vector search. Run `manage.py builddefinitionvectors`."
+        )
+        return None
+    except ValueError:
+        logger.exception("Not using ANN index")
+        return None
+
+    if index.fingerprint != definition_vectors_fingerprint():
+        logger.warning(
+            f"ANN index at {path} does not match the definition vectors, falling back to exact cosine vector search. Run `manage.py builddefinitionvectors`."
+        )
+        return None
+    return index
+
+
+def wordform_ids_path(vectors_path: Path) -> Path:
+    """Return where the wordform IDs for the vectors at vectors_path live
+
+    Row i of the array is the primary key of the wordform defined by the
+    definition in row i of the KeyedVectors.
+
+    >>> wordform_ids_path(Path("vector_models/definitions_v2.kv"))
+    PosixPath('vector_models/definitions_v2.wordform_ids.npy')
+    """
+    return vectors_path.with_suffix(".wordform_ids.npy")
+
+
+def wordform_ids_stamp_path(vectors_path: Path) -> Path:
+    """Return where the ImportStamp of the wordform IDs’ database is saved
+
+    >>> wordform_ids_stamp_path(Path("vector_models/definitions_v2.kv"))
+    PosixPath('vector_models/definitions_v2.wordform_ids.json')
+    """
+    return vectors_path.with_suffix(".wordform_ids.json")
+
+
+def save_wordform_ids(
+    vectors_path: Path, wordform_ids: list[int], import_stamp: Optional[float]
+):
+    np.save(wordform_ids_path(vectors_path), np.array(wordform_ids, dtype=np.int64))
+    wordform_ids_stamp_path(vectors_path).write_text(
+        json.dumps({"import_stamp": import_stamp})
+    )
+
+
+@cache
+def _saved_wordform_ids() -> Optional[tuple[np.ndarray, Optional[float]]]:
+    vectors_path = definition_vectors_path()
+    path = wordform_ids_path(vectors_path)
+    try:
+        wordform_ids = np.load(path, mmap_mode="r")
+        import_stamp = json.loads(wordform_ids_stamp_path(vectors_path).read_text())[
+            "import_stamp"
+        ]
+    except FileNotFoundError:
+        logger.warning(
+            f"No wordform IDs at {path}, falling back to looking up CVD keys. Run `manage.py builddefinitionvectors`."
+        )
+        return None
+
+    if len(wordform_ids) != len(definition_vectors()):
+        logger.warning(
+            f"Wordform IDs at {path} do not match the definition vectors, falling back to looking up CVD keys. Run `manage.py builddefinitionvectors`."
+        )
+        return None
+    return wordform_ids, import_stamp
+
+
+def definition_wordform_ids() -> Optional[np.ndarray]:
+    """Return the wordform ID of each definition vector, or None if unusable
+
+    The IDs are only usable with the database they were saved from: after a
+    re-import, or restoring or rebuilding the database, they may point at
+    other wordforms.
+    """
+    # Imported here because this module is loaded before Django’s apps are
+    from morphodict.lexicon.models import ImportStamp
+
+    saved = _saved_wordform_ids()
+    if saved is None:
+        return None
+
+    wordform_ids, import_stamp = saved
+    if import_stamp != ImportStamp.latest_timestamp():
+        _warn_once(
+            f"Wordform IDs at {wordform_ids_path(definition_vectors_path())} are from another import, falling back to looking up CVD keys. Run `manage.py builddefinitionvectors`."
+        )
+        return None
+    return wordform_ids
+
+
+def closest_definitions(query_vector, topn: int) -> list[tuple[int, float]]:
+    """Return (row, similarity) for the definitions closest to query_vector
+
+    Rows index into definition_vectors() and definition_wordform_ids().
+
+    Uses the ANN index when settings.MORPHODICT_CVD_ANN_NPROBE is set and the
+    index exists, otherwise compares against every definition vector.
+    """
+    vectors = definition_vectors()
+    nprobe: Optional[int] = getattr(settings, "MORPHODICT_CVD_ANN_NPROBE", None)
+    index = definition_vectors_index() if nprobe else None
+    if not nprobe or index is None:
+        return [
+            (vectors.key_to_index[key], similarity)
+            for key, similarity in vectors.similar_by_vector(query_vector, topn)
+        ]
+
+    rows, similarities = index.search(query_vector, topn, nprobe)
+    return [
+        (int(row), float(similarity)) for row, similarity in zip(rows, similarities)
+    ]
+
+
 def preload_models():
     try:
         definition_vectors()
+        _saved_wordform_ids()
+        if index := definition_vectors_index():
+            # Touch the centroids so that the first search doesn’t page them in
+            index.centroids.sum()
     except DefinitionVectorsNotFoundException:
         logger.exception("")
 
     # doing a similarity search compares against every other vector, so by doing
-    # similar_by_key for any key at all, we preload the entire vector model into
-    # memory.
-    google_news_vectors().similar_by_key("hello")
+    # a similarity search for any vector at all, we preload the entire vector
+    # model into memory.
+    news_vectors = google_news_vectors()
+    # A pruned model can be empty, e.g. when built from an empty dictionary
+    if len(news_vectors):
+        news_vectors.similar_by_vector(news_vectors.vectors[0], topn=1)
 
 
 # Implementation from https://stackoverflow.com/a/48027864/14558 which cites
@@ -75,15 +246,16 @@ def uniq(l: list) -> list:
     return list(dict.fromkeys(l))
 
 
-# Note: The computation of this vector for definition is memoized by the builddefinitionvectors django command.
-# They are not live-computed.  If there are changes to this code, please make sure to re-run builddefinitionvectors
-# as a command.
+# Note: The computation of this vector for definition is memoized by the builddefinitionvectors django command,
+# which computes the same sums in bulk with its sum_vectors().  They are not live-computed.  If there are changes
+# to this code, please make sure to re-run builddefinitionvectors as a command, without --incremental.
 def vector_for_keys(keyed_vectors, keys: list[str]):
     """Return the sum of vectors in keyed_vectors for the given keys"""
     if not keys:
         raise ValueError("keys cannot be empty")
 
-    return keyed_vectors[keys].sum(axis=0)
+    # Summed as float32 in case the vectors are stored as float16
+    return keyed_vectors[keys].sum(axis=0, dtype=np.float32)
 
 
 RE_PUNCTUATION = re.compile(r'[!,.\[\]\(\)\{\};:"/\?]+')
@@ -96,13 +268,7 @@ def extract_keyed_words(query: str, keys, already_warned=None, analysis=[]):
     """
     ret = []
 
-    query = query.lower()
-    query = RE_PUNCTUATION.sub(" ", query)
-    # ‘ice-cream’ is coded in the news vectors as ‘ice_cream’
-    query = query.replace("-", "_")
-    query = query.strip()
-
-    for word in query.split():
+    for word in _split_words(query):
         if word in keys:
             ret.append(word)
         elif word.endswith("'s") and word[:-2] in keys:
@@ -126,6 +292,35 @@ def extract_keyed_words(query: str, keys, already_warned=None, analysis=[]):
     return uniq(ret)
 
 
+def _split_words(text: str) -> list[str]:
+    text = text.lower()
+    text = RE_PUNCTUATION.sub(" ", text)
+    # ‘ice-cream’ is coded in the news vectors as ‘ice_cream’
+    text = text.replace("-", "_")
+    return text.split()
+
+
+def candidate_keys(text: str) -> set[str]:
+    """Return every key that extract_keyed_words() might look up for text
+
+    >>> sorted(candidate_keys("Bear's ice-cream"))
+    ['bear', "bear's", 'cream', 'ice', 'ice_cream']
+    """
+    ret = set()
+    for word in _split_words(text):
+        ret.add(word)
+        if word.endswith("'s"):
+            ret.add(word[:-2])
+        if "_" in word:
+            ret.update(word.split("_"))
+    return ret
+
+
+@cache
+def _warn_once(msg):
+    logger.warning(msg)
+
+
 def _warn(word, msg, already_warned):
     if (
         logger.isEnabledFor(logging.DEBUG)
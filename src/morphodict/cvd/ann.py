@@ -0,0 +1,278 @@
+"""
+Approximate nearest-neighbour index for definition vectors
+
+KeyedVectors.similar_by_vector() compares the query against every definition
+vector, so each English search costs time proportional to the size of the
+dictionary. This module implements an inverted file (IVF) index instead:
+
+  - At build time, the normalized definition vectors are clustered with
+    spherical k-means into `nlist` lists, and stored grouped by list.
+  - At search time, the query is compared with the `nlist` centroids, and only
+    the vectors in the `nprobe` closest lists are scored exactly.
+
+Searching all lists gives exactly the same results as the brute-force search;
+fewer lists trade recall for speed. recall_at_k() measures that trade-off.
+
+The index is saved as a directory of .npy files next to the KeyedVectors
+file, and loaded memory-mapped so that worker processes share the pages. The
+stored vectors can be quantized to float16 or int8, see quantize.py.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from morphodict.cvd.quantize import dot, normalize, quantize
+
+logger = logging.getLogger(__name__)
+
+# Bump this when changing the on-disk layout
+ANN_INDEX_FORMAT = 2
+
+_FILES = ("centroids", "offsets", "rows", "vectors")
+_OPTIONAL_FILES = ("scales",)
+
+
+def ann_index_path(vectors_path: Path) -> Path:
+    """
+    Return where the index for the KeyedVectors file at vectors_path lives
+
+    >>> ann_index_path(Path("vector_models/definitions_v2.kv"))
+    PosixPath('vector_models/definitions_v2.ivf')
+    """
+    return vectors_path.with_suffix(".ivf")
+
+
+def default_nlist(count: int) -> int:
+    """
+    The number of lists to use when none is given: about √count
+
+    >>> default_nlist(20_000)
+    141
+    >>> default_nlist(0)
+    1
+    """
+    return max(1, round(math.sqrt(count)))
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the k largest scores, largest first"""
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk_size=8192):
+    """Return the index of the closest centroid for each vector"""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_size):
+        chunk = vectors[start : start + chunk_size]
+        assignments[start : start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def _spherical_kmeans(
+    vectors: np.ndarray, nlist: int, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity, returning unit centroids"""
+    centroids = vectors[rng.choice(len(vectors), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=nlist)
+
+        # Empty lists would never be probed, so restart them on random vectors
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), size=len(empty))]
+        centroids = normalize(sums)
+    return centroids
+
+
+@dataclass
+class IVFIndex:
+    # (nlist, dim) unit vectors
+    centroids: np.ndarray
+    # (nlist + 1,) list i holds rows[offsets[i]:offsets[i + 1]]
+    offsets: np.ndarray
+    # (count,) the KeyedVectors row of each stored vector
+    rows: np.ndarray
+    # (count, dim) normalized vectors, grouped by list, possibly quantized
+    vectors: np.ndarray
+    # (count,) per-vector scales for int8 vectors, otherwise None
+    scales: Optional[np.ndarray] = None
+    # Identifies the KeyedVectors the index was built from, see
+    # morphodict.cvd.vectors_fingerprint()
+    fingerprint: Optional[str] = None
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        *,
+        iterations: int = 10,
+        training_sample: int = 256,
+        seed: int = 0,
+        dtype: str = "float32",
+    ) -> IVFIndex:
+        """
+        Build an index over vectors, one row per KeyedVectors key
+
+        The centroids are trained on at most `training_sample` vectors per
+        list, which is plenty for k-means and keeps building fast for big
+        dictionaries.
+        """
+        normalized = normalize(vectors)
+        count = len(normalized)
+        if count == 0:
+            raise ValueError("cannot build an index without vectors")
+        if nlist is None:
+            nlist = default_nlist(count)
+        nlist = max(1, min(nlist, count))
+
+        rng = np.random.default_rng(seed)
+        if count > nlist * training_sample:
+            training = normalized[
+                rng.choice(count, size=nlist * training_sample, replace=False)
+            ]
+        else:
+            training = normalized
+        centroids = _spherical_kmeans(training, nlist, iterations, rng)
+
+        assignments = _assign(normalized, centroids)
+        rows = np.argsort(assignments, kind="stable").astype(np.int32)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=nlist), out=offsets[1:])
+
+        stored, scales = quantize(normalized[rows], dtype)
+        return cls(
+            centroids=centroids,
+            offsets=offsets,
+            rows=rows,
+            vectors=stored,
+            scales=scales,
+        )
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def search(
+        self, query_vector: np.ndarray, k: int, nprobe: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (rows, similarities) of the k closest stored vectors
+
+        Results are ordered most similar first, with cosine similarities like
+        the ones from KeyedVectors.similar_by_vector().
+        """
+        query = normalize(query_vector)
+        probed_lists = _top_k(self.centroids @ query, min(nprobe, self.nlist))
+
+        candidate_rows = []
+        candidate_scores = []
+        for i in probed_lists:
+            start, end = self.offsets[i], self.offsets[i + 1]
+            if start == end:
+                continue
+            candidate_rows.append(self.rows[start:end])
+            candidate_scores.append(
+                dot(
+                    self.vectors[start:end],
+                    None if self.scales is None else self.scales[start:end],
+                    query,
+                )
+            )
+        if not candidate_rows:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        rows = np.concatenate(candidate_rows)
+        scores = np.concatenate(candidate_scores)
+        best = _top_k(scores, k)
+        return rows[best], scores[best]
+
+    def save(self, path: Path):
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _FILES + _OPTIONAL_FILES:
+            file = path / f"{name}.npy"
+            if (array := getattr(self, name)) is not None:
+                np.save(file, array)
+            else:
+                file.unlink(missing_ok=True)
+        (path / "meta.json").write_text(
+            json.dumps(
+                {
+                    "format": ANN_INDEX_FORMAT,
+                    "nlist": self.nlist,
+                    "count": len(self),
+                    "dtype": self.vectors.dtype.name,
+                    "fingerprint": self.fingerprint,
+                }
+            )
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> IVFIndex:
+        """
+        Load a saved index memory-mapped
+
+        Raises FileNotFoundError if there is no index at path, and ValueError
+        if it was saved in a different format.
+        """
+        meta = json.loads((path / "meta.json").read_text())
+        if meta.get("format") != ANN_INDEX_FORMAT:
+            raise ValueError(
+                f"ANN index at {path} has format {meta.get('format')},"
+                f" expected {ANN_INDEX_FORMAT}; re-run builddefinitionvectors"
+            )
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in _FILES}
+        for name in _OPTIONAL_FILES:
+            if (path / f"{name}.npy").exists():
+                arrays[name] = np.load(path / f"{name}.npy", mmap_mode="r")
+        return cls(**arrays, fingerprint=meta.get("fingerprint"))
+
+
+def exact_search(
+    vectors: np.ndarray, query_vector: np.ndarray, k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Brute-force counterpart of IVFIndex.search() over unnormalized vectors"""
+    scores = normalize(vectors) @ normalize(query_vector)
+    best = _top_k(scores, k)
+    return best, scores[best]
+
+
+def recall_at_k(
+    index: IVFIndex,
+    vectors: np.ndarray,
+    queries: Sequence[np.ndarray],
+    *,
+    k: int = 50,
+    nprobe: int,
+) -> float:
+    """
+    Return the fraction of the exact top-k rows that the index also finds,
+    averaged over queries
+    """
+    if not len(queries):
+        raise ValueError("need at least one query")
+    normalized = normalize(vectors)
+    total = 0.0
+    for query in queries:
+        exact = set(_top_k(normalized @ normalize(query), k).tolist())
+        approximate = set(index.search(query, k, nprobe)[0].tolist())
+        total += len(exact & approximate) / len(exact)
+    return total / len(queries)
@@ -0,0 +1,74 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from morphodict.cvd.ann import IVFIndex, exact_search, recall_at_k
+
+
+@pytest.fixture(scope="module")
+def clustered_vectors():
+    """Vectors in loose clusters, like definitions about related things"""
+    rng = np.random.default_rng(1234)
+    centres = rng.normal(size=(40, 32))
+    vectors = centres[rng.integers(len(centres), size=3000)] + rng.normal(
+        scale=0.6, size=(3000, 32)
+    )
+    return vectors.astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def index(clustered_vectors):
+    return IVFIndex.build(clustered_vectors, nlist=50)
+
+
+def test_probing_every_list_is_exact(index, clustered_vectors):
+    query = clustered_vectors[17] + 0.1
+    rows, similarities = index.search(query, 50, nprobe=index.nlist)
+    exact_rows, exact_similarities = exact_search(clustered_vectors, query, 50)
+
+    assert rows.tolist() == exact_rows.tolist()
+    assert similarities == pytest.approx(exact_similarities, abs=1e-5)
+    assert list(similarities) == sorted(similarities, reverse=True)
+
+
+def test_recall(index, clustered_vectors):
+    queries = clustered_vectors[:100]
+    assert recall_at_k(index, clustered_vectors, queries, nprobe=index.nlist) == 1
+    assert recall_at_k(index, clustered_vectors, queries, nprobe=8) > 0.9
+    assert recall_at_k(index, clustered_vectors, queries, nprobe=1) < recall_at_k(
+        index, clustered_vectors, queries, nprobe=8
+    )
+
+
+def test_save_and_load(index, clustered_vectors, tmp_path):
+    path = tmp_path / "definitions.ivf"
+    replace(index, fingerprint="abc123").save(path)
+    loaded = IVFIndex.load(path)
+
+    assert loaded.fingerprint == "abc123"
+    assert isinstance(loaded.vectors, np.memmap)
+    assert len(loaded) == len(clustered_vectors)
+    query = clustered_vectors[5]
+    assert loaded.search(query, 10, nprobe=4)[0].tolist() == (
+        index.search(query, 10, nprobe=4)[0].tolist()
+    )
+
+
+def test_more_lists_than_vectors():
+    vectors = np.eye(3, dtype=np.float32)
+    index = IVFIndex.build(vectors, nlist=10)
+    assert index.nlist == 3
+    assert index.search(np.array([0, 1, 0]), 5, nprobe=1)[0].tolist() == [1]
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_quantized_index(clustered_vectors, dtype, tmp_path):
+    index = IVFIndex.build(clustered_vectors, nlist=50, dtype=dtype)
+    index.save(tmp_path / "quantized.ivf")
+    loaded = IVFIndex.load(tmp_path / "quantized.ivf")
+
+    assert loaded.vectors.dtype == np.dtype(dtype)
+    assert (loaded.scales is not None) == (dtype == "int8")
+    queries = clustered_vectors[:100]
+    assert recall_at_k(loaded, clustered_vectors, queries, nprobe=loaded.nlist) > 0.95
@@ -1,13 +1,23 @@
 import random
 
+import numpy as np
 import pytest
+from django.core.management import call_command
+from gensim.models import KeyedVectors
 
-from morphodict.lexicon.models import Wordform, Definition
-from morphodict.cvd import extract_keyed_words
+from morphodict import cvd
+from morphodict.lexicon.models import Wordform, Definition, ImportStamp
+from morphodict.cvd import definition_vectors, extract_keyed_words, vector_for_keys
+from morphodict.cvd.ann import IVFIndex, ann_index_path
 from morphodict.cvd.definition_keys import (
     definition_to_cvd_key,
     cvd_key_to_wordform_query,
 )
+from morphodict.cvd.management.commands import (
+    builddefinitionvectors,
+    buildprunednewsvectors,
+)
+from morphodict.search.cvd_search import _wordforms_for_cvd_keys, wordforms_for_rows
 
 FAKE_WORD_SET = {"loose", "leaf", "paper", "news_paper", "you're", "that"}
 
@@ -66,3 +76,218 @@ def test_definition_keys(slug, expect_null_analysis, db):
         wordforms = Wordform.objects.filter(**kwargs)
         assert wordforms.count() == 1
         assert wordforms.get() == d.wordform
+
+
+def test_wordform_ids_match_cvd_keys(db, django_assert_max_num_queries):
+    """
+    The wordform ID array saved next to the definition vectors finds the same
+    wordforms as the CVD keys do, with one query besides the import stamp.
+    """
+    rows = list(range(min(50, len(definition_vectors()))))
+
+    with django_assert_max_num_queries(2):
+        wordforms = wordforms_for_rows(rows)
+
+    keys = definition_vectors().index_to_key
+    assert wordforms == _wordforms_for_cvd_keys([keys[row] for row in rows])
+    assert all(wordforms)
+
+
+def test_prune_news_vectors(db, tmp_path, monkeypatch):
+    full = KeyedVectors(vector_size=2)
+    full.add_vectors(
+        ["the", "bear", "Bear", "ice_cream", "the_bear", "zebra", "x_y"],
+        np.arange(14, dtype=np.float32).reshape(7, 2),
+    )
+    monkeypatch.setattr(buildprunednewsvectors, "full_news_vectors", lambda: full)
+
+    output_file = tmp_path / "pruned.kv"
+    call_command(
+        "buildprunednewsvectors",
+        output_file=output_file,
+        top_n=1,
+        top_n_compounds=1,
+    )
+    pruned = KeyedVectors.load(str(output_file))
+
+    # ‘bear’ occurs in definitions, ‘the’ is the most frequent word, and
+    # ‘the_bear’ is the most frequent compound of kept words.
+    assert pruned.index_to_key == ["the", "bear", "the_bear"]
+    assert (pruned["bear"] == full["bear"]).all()
+
+
+def test_sum_vectors_matches_vector_for_keys(monkeypatch):
+    rng = np.random.default_rng(1234)
+    news_vectors = KeyedVectors(vector_size=8)
+    words = [f"word{i}" for i in range(100)]
+    news_vectors.add_vectors(words, rng.normal(size=(100, 8)).astype(np.float32))
+    keys_per_row = [
+        list(rng.choice(words, size=rng.integers(1, 6), replace=False))
+        for _ in range(250)
+    ]
+    monkeypatch.setattr(builddefinitionvectors, "SUM_CHUNK_SIZE", 64)
+
+    sums = builddefinitionvectors.sum_vectors(news_vectors, keys_per_row)
+
+    for keys, vector in zip(keys_per_row, sums):
+        assert vector == pytest.approx(vector_for_keys(news_vectors, keys), abs=1e-5)
+
+
+@pytest.fixture
+def temporary_definition_vectors(tmp_path, monkeypatch):
+    """Point the definition vector functions at an empty directory"""
+    caches = [
+        cvd.definition_vectors,
+        cvd.definition_vectors_fingerprint,
+        cvd.definition_vectors_index,
+        cvd._saved_wordform_ids,
+    ]
+    path = tmp_path / "definitions.kv"
+    monkeypatch.setattr(cvd, "definition_vectors_path", lambda: path)
+    for cached in caches:
+        cached.cache_clear()
+    yield path
+    for cached in caches:
+        cached.cache_clear()
+
+
+def test_ann_index_must_match_the_vectors(temporary_definition_vectors):
+    def save_vectors(vectors):
+        keyed_vectors = KeyedVectors(vector_size=3)
+        keyed_vectors.add_vectors(["a", "b", "c", "d"], vectors)
+        keyed_vectors.save(str(temporary_definition_vectors))
+        for cached in [
+            cvd.definition_vectors,
+            cvd.definition_vectors_fingerprint,
+            cvd.definition_vectors_index,
+        ]:
+            cached.cache_clear()
+        return keyed_vectors
+
+    vectors = np.arange(12, dtype=np.float32).reshape(4, 3) + 1
+    index = IVFIndex.build(vectors, nlist=2)
+    index.fingerprint = cvd.vectors_fingerprint(save_vectors(vectors))
+    index.save(ann_index_path(temporary_definition_vectors))
+    assert cvd.definition_vectors_index() is not None
+
+    # The vectors are rebuilt with the same number of rows, but the index is
+    # left over from before
+    save_vectors(vectors[::-1])
+    assert cvd.definition_vectors_index() is None
+
+
+def test_wordform_ids_must_be_from_the_current_import(db, temporary_definition_vectors):
+    keyed_vectors = KeyedVectors(vector_size=2)
+    keyed_vectors.add_vectors(["a", "b"], np.ones((2, 2), dtype=np.float32))
+    keyed_vectors.save(str(temporary_definition_vectors))
+    ImportStamp.objects.all().delete()
+    ImportStamp.objects.create(timestamp=1.0)
+
+    cvd.save_wordform_ids(temporary_definition_vectors, [10, 11], 1.0)
+    wordform_ids = cvd.definition_wordform_ids()
+    assert isinstance(wordform_ids, np.memmap)
+    assert list(wordform_ids) == [10, 11]
+
+    # e.g., the database was restored from a backup
+    ImportStamp.objects.update(timestamp=2.0)
+    assert cvd.definition_wordform_ids() is None
+
+
+@pytest.fixture
+def small_news_vectors(monkeypatch):
+    """Build definition vectors from a few random word vectors"""
+    words = ["bear", "dog", "water", "man", "woman", "house", "eat", "see", "go"]
+    news_vectors = KeyedVectors(vector_size=4)
+    news_vectors.add_vectors(
+        words, np.random.default_rng(0).normal(size=(len(words), 4)).astype(np.float32)
+    )
+    monkeypatch.setattr(
+        builddefinitionvectors, "full_news_vectors", lambda: news_vectors
+    )
+    return news_vectors
+
+
+def test_incremental_build_reuses_unchanged_lemmas(
+    db, tmp_path, monkeypatch, small_news_vectors
+):
+    news_vectors = small_news_vectors
+    computed_tasks = []
+    extract_keys_in_parallel = builddefinitionvectors.extract_keys_in_parallel
+
+    def spy(tasks, jobs):
+        computed_tasks[:] = tasks
+        return extract_keys_in_parallel(tasks, jobs)
+
+    monkeypatch.setattr(builddefinitionvectors, "extract_keys_in_parallel", spy)
+
+    def build(**options):
+        call_command(
+            "builddefinitionvectors",
+            output_file=output_file,
+            include_analysis_in_vector=False,
+            recall_sample=0,
+            vector_dtype="float32",
+            **options,
+        )
+        return KeyedVectors.load(str(output_file))
+
+    output_file = tmp_path / "definitions.kv"
+    Wordform.objects.filter(is_lemma=True).update(import_hash="unchanged")
+    before = build()
+
+    lemma = Wordform.objects.get(slug="maskwa")
+    changed = Definition.objects.filter(
+        wordform=lemma, auto_translation_source__isnull=True
+    ).first()
+    changed.text = "dog"
+    changed.raw_semantic_definition = None
+    changed.save()
+    lemma.import_hash = "changed"
+    lemma.save()
+    after = build(incremental=True)
+
+    # Definitions of the changed lemma, and definitions that had no vector
+    # to reuse, are recomputed
+    recomputed = [
+        d.semantic_definition
+        for d in Definition.objects.filter(auto_translation_source__isnull=True)
+        if d.wordform.lemma_id == lemma.id or definition_to_cvd_key(d) not in before
+    ]
+    assert sorted(text for text, _ in computed_tasks) == sorted(recomputed)
+    changed_key = definition_to_cvd_key(changed)
+    assert after[changed_key] == pytest.approx(news_vectors["dog"])
+    assert after.index_to_key == before.index_to_key
+    for key in before.index_to_key:
+        if key != changed_key:
+            assert (after[key] == before[key]).all()
+
+
+def test_incremental_build_needs_the_same_vector_dtype(
+    db, tmp_path, small_news_vectors
+):
+    def build(output_file, vector_dtype, **options):
+        call_command(
+            "builddefinitionvectors",
+            output_file=output_file,
+            recall_sample=0,
+            vector_dtype=vector_dtype,
+            **options,
+        )
+        return KeyedVectors.load(str(output_file))
+
+    Wordform.objects.filter(is_lemma=True).update(import_hash="unchanged")
+    build(tmp_path / "definitions.kv", "float16")
+    # The float16 build saved normalized vectors, which must not be reused
+    incremental = build(tmp_path / "definitions.kv", "float32", incremental=True)
+    full = build(tmp_path / "full.kv", "float32")
+
+    assert incremental.index_to_key == full.index_to_key
+    assert (incremental.vectors == full.vectors).all()
+
+
+def test_preload_models_with_empty_news_vectors(
+    temporary_definition_vectors, monkeypatch
+):
+    monkeypatch.setattr(cvd, "google_news_vectors", lambda: KeyedVectors(vector_size=2))
+
+    cvd.preload_models()
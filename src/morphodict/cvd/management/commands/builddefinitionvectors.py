@@ -1,24 +1,39 @@
 import json
 import logging
 from argparse import ArgumentParser, BooleanOptionalAction
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
+from dataclasses import dataclass
 from os import fspath
+from pathlib import Path
+from typing import Optional
 
+import django
+import numpy as np
+from django.conf import settings
 from django.core.management import BaseCommand
 from gensim.models import KeyedVectors
 from tqdm import tqdm
 
 from morphodict.cvd import (
-    google_news_vectors,
+    full_news_vectors,
     extract_keyed_words,
-    vector_for_keys,
     definition_vectors_path,
+    save_wordform_ids,
+    vectors_fingerprint,
 )
+from morphodict.cvd.ann import IVFIndex, ann_index_path, recall_at_k
 from morphodict.cvd.definition_keys import definition_to_cvd_key
-from morphodict.lexicon.models import Definition
+from morphodict.cvd.quantize import VECTOR_DTYPES, normalize
+from morphodict.lexicon.models import Definition, ImportStamp
 
 logger = logging.getLogger(__name__)
 
+# Definitions per task sent to a worker process
+EXTRACTION_CHUNK_SIZE = 1000
+# Definitions to sum at once in sum_vectors()
+SUM_CHUNK_SIZE = 10_000
+
 
 class Command(BaseCommand):
     help = """Create a vector model from current definitions"""
@@ -27,6 +42,36 @@ class Command(BaseCommand):
         parser.add_argument("--output-file", default=definition_vectors_path())
         parser.add_argument("--debug-output-file")
 
+        parser.add_argument(
+            "--ann-lists",
+            type=int,
+            help="""
+                Number of lists in the approximate nearest-neighbour index.
+                Defaults to about the square root of the number of definitions.
+            """,
+        )
+        parser.add_argument(
+            "--recall-sample",
+            type=int,
+            default=200,
+            help="""
+                Number of definition vectors to use as queries when reporting
+                the recall@50 of the index against exact search, at the
+                configured MORPHODICT_CVD_ANN_NPROBE. 0 to skip.
+            """,
+        )
+
+        parser.add_argument(
+            "--vector-dtype",
+            choices=VECTOR_DTYPES,
+            default=settings.MORPHODICT_CVD_VECTOR_DTYPE,
+            help="""
+                How to store the vectors. With float16 or int8, the ANN index
+                stores normalized vectors of that type, and the definition
+                vectors file stores normalized float16 vectors.
+            """,
+        )
+
         parser.add_argument(
             "--include-analysis-in-vector",
             action=BooleanOptionalAction,
@@ -36,35 +81,93 @@ class Command(BaseCommand):
             """,
         )
 
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of processes to use for extracting keywords",
+        )
+        parser.add_argument(
+            "--incremental",
+            action=BooleanOptionalAction,
+            default=False,
+            help="""
+                Reuse the vectors from the last build for definitions whose
+                lemmas have the same import hash as they did then, that is,
+                whose importjson has not changed.
+            """,
+        )
+
     def handle(
-        self, output_file, debug_output_file, include_analysis_in_vector, **options
+        self,
+        output_file,
+        debug_output_file,
+        include_analysis_in_vector,
+        ann_lists,
+        recall_sample,
+        vector_dtype,
+        jobs,
+        incremental,
+        **options,
     ):
+        output_file = Path(output_file)
         logger.info("Building definition vectors")
         logger.info(output_file)
 
-        definitions = Definition.objects.filter(auto_translation_source_id__isnull=True)
-
-        count = definitions.count()
+        news_vectors = full_news_vectors()
+        previous = (
+            PreviousBuild.load(output_file, include_analysis_in_vector, vector_dtype)
+            if incremental
+            else None
+        )
 
-        news_vectors = google_news_vectors()
+        definitions = (
+            Definition.objects.filter(auto_translation_source_id__isnull=True)
+            .select_related("wordform__lemma")
+            .order_by("id")
+        )
 
-        definition_vector_keys = []
-        definition_vector_vectors = []
+        rows: list[DefinitionRow] = []
+        # (index into rows, row of the previous vectors) for reused vectors
+        reused: list[tuple[int, int]] = []
+        # (index into rows, definition) for vectors to compute
+        pending: list[tuple[int, Definition]] = []
+        for d in tqdm(definitions.iterator(chunk_size=2000), total=definitions.count()):
+            row = DefinitionRow(
+                cvd_key=definition_to_cvd_key(d),
+                wordform_id=d.wordform_id,
+                import_hash=d.wordform.lemma.import_hash,
+            )
+            if (
+                previous
+                and (
+                    previous_row := previous.reusable_row(row.cvd_key, row.import_hash)
+                )
+                is not None
+            ):
+                reused.append((len(rows), previous_row))
+            else:
+                pending.append((len(rows), d))
+            rows.append(row)
+        logger.info(
+            f"Reusing {len(reused):,} vectors, computing {len(pending):,} vectors"
+        )
 
-        unknown_words = set()
+        tasks = [
+            (
+                d.semantic_definition,
+                (
+                    d.wordform.raw_analysis[2]
+                    if d.wordform.raw_analysis and include_analysis_in_vector
+                    else []
+                ),
+            )
+            for _, d in pending
+        ]
+        keys_per_definition = extract_keys_in_parallel(tasks, jobs)
 
         with create_debug_output(debug_output_file) as debug_output:
-            for d in tqdm(definitions.iterator(chunk_size=2000), total=count):
-                keys = extract_keyed_words(
-                    d.semantic_definition,
-                    news_vectors,
-                    unknown_words,
-                    analysis=(
-                        d.wordform.raw_analysis[2]
-                        if d.wordform.raw_analysis and include_analysis_in_vector
-                        else []
-                    ),
-                )
+            for (_, d), keys in zip(pending, keys_per_definition):
                 debug_output(
                     json.dumps(
                         {
@@ -75,18 +178,195 @@ class Command(BaseCommand):
                         ensure_ascii=False,
                     )
                 )
-                if keys:
-                    vec_sum = vector_for_keys(news_vectors, keys)
 
-                    definition_vector_keys.append(definition_to_cvd_key(d))
-                    definition_vector_vectors.append(vec_sum)
+        computed = [
+            (i, keys) for (i, _), keys in zip(pending, keys_per_definition) if keys
+        ]
+        # Definitions without any keys get no vector
+        kept = sorted([i for i, _ in reused] + [i for i, _ in computed])
+        position = {row_index: n for n, row_index in enumerate(kept)}
 
-            definition_vectors = KeyedVectors(vector_size=news_vectors.vector_size)
-            definition_vectors.add_vectors(
-                definition_vector_keys, definition_vector_vectors
+        vectors = np.empty((len(kept), news_vectors.vector_size), dtype=np.float32)
+        if reused:
+            vectors[[position[i] for i, _ in reused]] = previous.vectors[
+                [previous_row for _, previous_row in reused]
+            ]
+        if computed:
+            vectors[[position[i] for i, _ in computed]] = sum_vectors(
+                news_vectors, [keys for _, keys in computed]
             )
-            output_file.parent.mkdir(exist_ok=True)
-            definition_vectors.save(fspath(output_file))
+        # The previous files are about to be overwritten
+        del previous
+
+        kept_rows = [rows[i] for i in kept]
+        definition_vectors = KeyedVectors(vector_size=news_vectors.vector_size)
+        definition_vectors.add_vectors([row.cvd_key for row in kept_rows], vectors)
+        if vector_dtype != "float32":
+            # gensim can only search plain arrays, so int8 is used for the ANN
+            # index only
+            definition_vectors.vectors = normalize(vectors).astype(np.float16)
+        output_file.parent.mkdir(exist_ok=True)
+        definition_vectors.save(fspath(output_file))
+        save_wordform_ids(
+            output_file,
+            [row.wordform_id for row in kept_rows],
+            ImportStamp.latest_timestamp(),
+        )
+        build_info_path(output_file).write_text(
+            json.dumps(
+                {
+                    "include_analysis_in_vector": include_analysis_in_vector,
+                    "vector_dtype": vector_dtype,
+                    "import_hashes": [row.import_hash for row in kept_rows],
+                }
+            )
+        )
+
+        if len(vectors):
+            build_ann_index(
+                vectors,
+                ann_index_path(output_file),
+                ann_lists,
+                recall_sample,
+                vector_dtype,
+                vectors_fingerprint(definition_vectors),
+            )
+
+
+@dataclass
+class DefinitionRow:
+    cvd_key: str
+    wordform_id: int
+    # Of the lemma, which covers the lemma entry and all its formOf entries
+    import_hash: Optional[str]
+
+
+def build_info_path(vectors_path: Path) -> Path:
+    return vectors_path.with_suffix(".build.json")
+
+
+class PreviousBuild:
+    """The vectors from the last build, for reusing in an incremental build"""
+
+    def __init__(self, keyed_vectors: KeyedVectors, import_hashes: list):
+        self._keyed_vectors = keyed_vectors
+        self._import_hashes = import_hashes
+
+    @classmethod
+    def load(cls, output_file: Path, include_analysis_in_vector, vector_dtype):
+        try:
+            info = json.loads(build_info_path(output_file).read_text())
+            keyed_vectors = KeyedVectors.load(fspath(output_file), mmap="r")
+        except FileNotFoundError:
+            logger.info("No previous build found, computing all vectors")
+            return None
+
+        if info["include_analysis_in_vector"] != include_analysis_in_vector:
+            logger.info(
+                "Previous build used different --include-analysis-in-vector, computing all vectors"
+            )
+            return None
+        # Other types are saved normalized, and cannot be mixed with float32
+        # sums, nor with each other
+        if info.get("vector_dtype") != vector_dtype:
+            logger.info(
+                "Previous build used different --vector-dtype, computing all vectors"
+            )
+            return None
+        if len(info["import_hashes"]) != len(keyed_vectors):
+            logger.warning("Previous build is inconsistent, computing all vectors")
+            return None
+        return cls(keyed_vectors, info["import_hashes"])
+
+    @property
+    def vectors(self):
+        return self._keyed_vectors.vectors
+
+    def reusable_row(self, cvd_key, import_hash) -> Optional[int]:
+        """
+        Return the previous row for this definition, if its lemma has been
+        imported from the same importjson since
+        """
+        if import_hash is None:
+            return None
+        row = self._keyed_vectors.key_to_index.get(cvd_key)
+        if row is None or self._import_hashes[row] != import_hash:
+            return None
+        return row
+
+
+def extract_keys(tasks: list[tuple[str, list]]) -> list[list[str]]:
+    """Return the news vector keys for each (semantic_definition, analysis)"""
+    news_vectors = full_news_vectors()
+    unknown_words: set[str] = set()
+    return [
+        extract_keyed_words(text, news_vectors, unknown_words, analysis=analysis)
+        for text, analysis in tasks
+    ]
+
+
+def extract_keys_in_parallel(tasks, jobs: int) -> list[list[str]]:
+    if jobs <= 1 or len(tasks) < 2 * EXTRACTION_CHUNK_SIZE:
+        return extract_keys(tasks)
+
+    chunks = [
+        tasks[i : i + EXTRACTION_CHUNK_SIZE]
+        for i in range(0, len(tasks), EXTRACTION_CHUNK_SIZE)
+    ]
+    # django.setup() so that workers can also be started by spawning
+    with ProcessPoolExecutor(jobs, initializer=django.setup) as pool:
+        return [
+            keys
+            for chunk_keys in tqdm(pool.map(extract_keys, chunks), total=len(chunks))
+            for keys in chunk_keys
+        ]
+
+
+def sum_vectors(keyed_vectors: KeyedVectors, keys_per_row: list[list[str]]):
+    """
+    Return vector_for_keys(keyed_vectors, keys) for every list of keys
+
+    Instead of summing each list separately, the vectors for all keys are
+    gathered into one array, and then summed by segment, a chunk of rows at a
+    time to limit memory use.
+    """
+    ret = np.empty((len(keys_per_row), keyed_vectors.vector_size), dtype=np.float32)
+    for start in range(0, len(keys_per_row), SUM_CHUNK_SIZE):
+        chunk = keys_per_row[start : start + SUM_CHUNK_SIZE]
+        lengths = np.array([len(keys) for keys in chunk])
+        if not lengths.all():
+            raise ValueError("keys cannot be empty")
+        indices = [keyed_vectors.key_to_index[key] for keys in chunk for key in keys]
+        offsets = np.concatenate(([0], np.cumsum(lengths[:-1])))
+        ret[start : start + len(chunk)] = np.add.reduceat(
+            keyed_vectors.vectors[indices], offsets, axis=0, dtype=np.float32
+        )
+    return ret
+
+
+def build_ann_index(
+    vectors: np.ndarray, path, nlist, recall_sample, dtype, fingerprint: str
+):
+    logger.info("Building ANN index")
+    index = IVFIndex.build(vectors, nlist, dtype=dtype)
+    index.fingerprint = fingerprint
+    index.save(path)
+    logger.info(f"Saved {dtype} ANN index with {index.nlist} lists to {path}")
+
+    nprobe = settings.MORPHODICT_CVD_ANN_NPROBE
+    if recall_sample and nprobe:
+        rng = np.random.default_rng(0)
+        sample = rng.choice(
+            len(vectors), size=min(recall_sample, len(vectors)), replace=False
+        )
+        recall = recall_at_k(
+            index,
+            vectors,
+            vectors[sample],
+            k=50,
+            nprobe=nprobe,
+        )
+        logger.info(f"ANN recall@50 with nprobe={nprobe}: {recall:.3f}")
 
 
 @contextmanager
@@ -0,0 +1,115 @@
+import logging
+from argparse import ArgumentParser
+from os import fspath
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.management import BaseCommand
+from gensim.models import KeyedVectors
+from tqdm import tqdm
+
+from morphodict.cvd import candidate_keys, full_news_vectors, pruned_news_vectors_path
+from morphodict.cvd.quantize import VECTOR_DTYPES
+from morphodict.lexicon.models import Definition
+from morphodict.relabelling import LABELS
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+        Create a news vector model with only the words that searches can use
+
+        The full Google News model has about three million keys, but only words
+        that occur in definitions or in plausible queries are ever looked up.
+        The pruned model is a small fraction of the size, so it loads faster
+        and uses much less memory. Point MORPHODICT_NEWS_VECTORS_PATH at it to
+        use it.
+    """
+
+    def add_arguments(self, parser: ArgumentParser):
+        parser.add_argument(
+            "--output-file",
+            type=Path,
+            default=getattr(settings, "MORPHODICT_NEWS_VECTORS_PATH", None)
+            or pruned_news_vectors_path(),
+        )
+        parser.add_argument(
+            "--vector-dtype",
+            choices=VECTOR_DTYPES,
+            default=settings.MORPHODICT_CVD_VECTOR_DTYPE,
+            help="""
+                How to store the vectors. Query vectors are sums of word
+                vectors, so word vectors cannot be normalized, and both float16
+                and int8 store float16.
+            """,
+        )
+        parser.add_argument(
+            "--top-n",
+            type=int,
+            default=100_000,
+            help="""
+                Also keep this many of the most frequent single words, so that
+                query words that don’t occur in any definition still work.
+                The news vectors are sorted by frequency.
+            """,
+        )
+        parser.add_argument(
+            "--top-n-compounds",
+            type=int,
+            default=20_000,
+            help="""
+                Also keep this many of the most frequent phrase compounds,
+                like ‘ice_cream’, that are made of kept words.
+            """,
+        )
+
+    def handle(self, output_file, vector_dtype, top_n, top_n_compounds, **options):
+        news_vectors = full_news_vectors()
+
+        words = set()
+        for text, raw_semantic_definition in tqdm(
+            Definition.objects.values_list("text", "raw_semantic_definition").iterator(
+                chunk_size=2000
+            ),
+            total=Definition.objects.count(),
+        ):
+            words |= candidate_keys(text)
+            if raw_semantic_definition:
+                words |= candidate_keys(raw_semantic_definition)
+        for label in LABELS.linguistic_short.labels():
+            words |= candidate_keys(label)
+        keys = {word for word in words if word in news_vectors.key_to_index}
+        logger.info(f"{len(keys):,} keys from definitions and labels")
+
+        single_words = 0
+        compounds = 0
+        for key in news_vectors.index_to_key:
+            if single_words >= top_n and compounds >= top_n_compounds:
+                break
+            if key != key.lower():
+                # Queries are lowercased before looking up words
+                continue
+            if "_" not in key:
+                if single_words < top_n:
+                    keys.add(key)
+                    single_words += 1
+            elif compounds < top_n_compounds and all(
+                piece in keys for piece in key.split("_")
+            ):
+                keys.add(key)
+                compounds += 1
+
+        # Keep the frequency order of the full model
+        ordered_keys = sorted(keys, key=news_vectors.key_to_index.__getitem__)
+        pruned = KeyedVectors(vector_size=news_vectors.vector_size)
+        pruned.add_vectors(ordered_keys, news_vectors[ordered_keys])
+        if vector_dtype != "float32":
+            pruned.vectors = pruned.vectors.astype(np.float16)
+
+        output_file.parent.mkdir(exist_ok=True)
+        pruned.save(fspath(output_file))
+        logger.info(
+            f"Saved {len(pruned):,} of {len(news_vectors):,} news vectors to {output_file}"
+        )
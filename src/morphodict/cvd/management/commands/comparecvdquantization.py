@@ -0,0 +1,89 @@
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+import numpy as np
+from django.core.management import BaseCommand, CommandError
+
+from morphodict.cvd import (
+    definition_vectors,
+    extract_keyed_words,
+    google_news_vectors,
+    vector_for_keys,
+)
+from morphodict.cvd.quantize import VECTOR_DTYPES, dot, quantize
+from morphodict.search_quality import DEFAULT_SAMPLE_FILE
+from morphodict.search_quality.sample import load_sample_definition
+
+TOP_N = 50
+
+
+class Command(BaseCommand):
+    help = """
+        Report how much quantized vectors change CVD results
+
+        For every English query in the search quality sample, compare the
+        top 50 definitions found with float32 vectors to those found when both
+        the definition vectors and the query’s word vectors are quantized.
+        Requires float32 definition vectors, as the baseline.
+    """
+
+    def add_arguments(self, parser: ArgumentParser):
+        parser.add_argument("--sample-file", type=Path, default=DEFAULT_SAMPLE_FILE)
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Scan this many times per query when timing",
+        )
+
+    def handle(self, sample_file, repeat, **options):
+        vectors = definition_vectors().vectors
+        if vectors.dtype != np.float32:
+            raise CommandError(
+                f"Definition vectors are {vectors.dtype}, not float32; run `manage.py builddefinitionvectors --vector-dtype float32` first"
+            )
+        news_vectors = google_news_vectors()
+
+        queries = []
+        for entry in load_sample_definition(sample_file):
+            if keys := extract_keyed_words(entry["Query"], news_vectors):
+                queries.append(keys)
+        if not queries:
+            raise CommandError(f"No query in {sample_file} has news vector keys")
+        self.stdout.write(
+            f"{len(queries):,} sample queries with keys, {len(vectors):,} definition vectors"
+        )
+
+        stored = {dtype: quantize(vectors, dtype) for dtype in VECTOR_DTYPES}
+        baseline = {}
+        for dtype, (data, scales) in stored.items():
+            overlaps = []
+            elapsed = 0.0
+            for keys in queries:
+                if dtype == "float32":
+                    query_vector = vector_for_keys(news_vectors, keys)
+                else:
+                    query_vector = (
+                        news_vectors[keys]
+                        .astype(np.float16)
+                        .sum(axis=0, dtype=np.float32)
+                    )
+
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    scores = dot(data, scales, query_vector)
+                elapsed += (time.perf_counter() - start) / repeat
+                top = set(np.argsort(-scores, kind="stable")[:TOP_N].tolist())
+
+                if dtype == "float32":
+                    baseline[tuple(keys)] = top
+                overlaps.append(len(top & baseline[tuple(keys)]) / len(top))
+
+            size = data.nbytes + (scales.nbytes if scales is not None else 0)
+            self.stdout.write(
+                f"{dtype:>8}: {size / 2**20:8.1f} MiB,"
+                f" {1000 * elapsed / len(queries):6.2f} ms per scan,"
+                f" top-{TOP_N} overlap mean {np.mean(overlaps):.3f}"
+                f" min {np.min(overlaps):.3f}"
+            )
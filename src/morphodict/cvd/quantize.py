@@ -0,0 +1,89 @@
+"""
+Quantized storage for normalized vectors
+
+Cosine similarity only needs the direction of each vector, so vectors can be
+normalized and then stored with less precision:
+
+  - "float16" halves the size, with a relative error of about 1e-3.
+  - "int8" quarters it. Each vector is scaled so that its largest component
+    becomes ±127, and the scale is stored alongside as one float32.
+
+Smaller vectors mean smaller files and less memory mapped into every server
+process. numpy can only multiply float32 quickly, though, so scanning has to
+widen the vectors first. int8 is widened about as fast as float32 can be
+scanned; float16 conversion is several times slower, so prefer int8 unless
+its small loss of precision matters.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+# How many vectors to widen to float32 at a time when scoring
+_CHUNK_SIZE = 512
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    # All-zero vectors stay zero instead of becoming NaN
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+def quantize(
+    vectors: np.ndarray, dtype: str
+) -> tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Return (data, scales) storing the normalized vectors as dtype
+
+    scales is None except for int8, where row i is approximately
+    data[i] * scales[i].
+
+    >>> data, scales = quantize(np.array([[3.0, -4.0]]), "int8")
+    >>> data.tolist(), round(float(scales[0]) * 127, 5)
+    ([[95, -127]], 0.8)
+    """
+    normalized = normalize(vectors)
+    if dtype == "float32":
+        return normalized, None
+    if dtype == "float16":
+        return normalized.astype(np.float16), None
+    if dtype == "int8":
+        largest = np.abs(normalized).max(axis=1)
+        scales = np.where(largest > 0, largest / 127, 1).astype(np.float32)
+        data = np.rint(normalized / scales[:, np.newaxis]).astype(np.int8)
+        return data, scales
+    raise ValueError(f"unknown vector dtype {dtype!r}, expected one of {VECTOR_DTYPES}")
+
+
+def dequantize(data: np.ndarray, scales: Optional[np.ndarray]) -> np.ndarray:
+    vectors = data.astype(np.float32)
+    if scales is not None:
+        vectors *= scales[:, np.newaxis]
+    return vectors
+
+
+def dot(
+    data: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray
+) -> np.ndarray:
+    """
+    Return the float32 dot product of every stored vector with query
+
+    numpy has no fast int8 or float16 matrix multiplication, so the data is
+    widened to float32 a chunk at a time, which stays in the CPU cache.
+    """
+    query = np.asarray(query, dtype=np.float32)
+    if data.dtype == np.float32:
+        scores = data @ query
+    else:
+        scores = np.empty(len(data), dtype=np.float32)
+        for start in range(0, len(data), _CHUNK_SIZE):
+            chunk = data[start : start + _CHUNK_SIZE]
+            scores[start : start + _CHUNK_SIZE] = chunk.astype(np.float32) @ query
+    if scales is not None:
+        scores *= scales
+    return scores
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from morphodict.cvd.quantize import dequantize, dot, normalize, quantize
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return np.random.default_rng(1234).normal(size=(1000, 300)).astype(np.float32)
+
+
+@pytest.mark.parametrize(("dtype", "tolerance"), [("float16", 1e-3), ("int8", 1e-2)])
+def test_quantized_vectors_keep_their_direction(vectors, dtype, tolerance):
+    data, scales = quantize(vectors, dtype)
+    assert data.dtype == np.dtype(dtype)
+
+    restored = dequantize(data, scales)
+    cosines = (normalize(restored) * normalize(vectors)).sum(axis=1)
+    assert cosines.min() > 1 - tolerance
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_dot_matches_float32(vectors, dtype):
+    query = vectors[0] + vectors[1]
+    data, scales = quantize(vectors, dtype)
+
+    scores = dot(data, scales, query)
+
+    assert scores.dtype == np.float32
+    assert scores == pytest.approx(normalize(vectors) @ query, abs=0.05)
+    assert np.argmax(scores) in (0, 1)
+
+
+def test_zero_vector():
+    data, scales = quantize(np.zeros((1, 3)), "int8")
+    assert data.tolist() == [[0, 0, 0]]
+    assert dot(data, scales, np.ones(3)).tolist() == [0]
+
+
+def test_unknown_dtype():
+    with pytest.raises(ValueError):
+        quantize(np.ones((1, 3)), "int4")
@@ -3,11 +3,11 @@ from __future__ import annotations
 import json
 import logging
 
-from typing import Any, Dict, Literal
+from typing import Any, Dict, Literal, Optional
 
 from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import redirect, render
 
 import morphodict.analysis
@@ -18,6 +18,7 @@ from morphodict.paradigm.views import paradigm_context_for_lemma
 from morphodict.phrase_translate.fst import (
     fst_analyses as phrase_translate_fst_analyses,
 )
+from morphodict.phrase_translate.to_target import engine as phrase_translation_engine
 from morphodict.paradigm.preferences import DisplayMode
 from crkeng.app.preferences import AnimateEmoji, ShowEmoji
 from morphodict.lexicon.models import Wordform
@@ -190,6 +191,10 @@ def search_results(request, query_string: str):  # pragma: no cover
     returns rendered boxes of search results according to user query
     """
     dict_source = get_dict_source(request)  # type: ignore
+    try:
+        limit, offset = get_page_params(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
     include_auto_definitions = should_include_auto_definitions(request)
     inflect_english_phrases = should_inflect_phrases(request)
     if should_attempt_semantic_search(request, query_string):
@@ -230,6 +235,8 @@ def search_results(request, query_string: str):  # pragma: no cover
         animate_emoji=AnimateEmoji.current_value_from_request(request),  # type: ignore
         show_emoji=ShowEmoji.current_value_from_request(request),  # type: ignore
         dict_source=dict_source,
+        limit=limit,
+        offset=offset,
     )
 
     return render(
@@ -317,6 +324,9 @@ def fst_tool(request):
         }
         context["analyses"].update(phrase_translate_fst_analyses(text))
 
+    context["transducer_cache_stats"] = morphodict.analysis.transducer_cache_stats()
+    context["phrase_translation_stats"] = phrase_translation_engine.stats()
+
     return render(request, "morphodict/fst-tool.html", context)
 
 
@@ -387,6 +397,26 @@ def should_attempt_semantic_search(request, query):
     return True if request.COOKIES.get("attempt_semantic_search") == "yes" else False
 
 
+def get_page_params(request) -> tuple[Optional[int], int]:
+    """
+    Return the (limit, offset) requested with the limit and offset query params
+
+    If limit is not given, all results are wanted. Raises ValueError if either
+    param is given but is not a number in the allowed range.
+    """
+    limit = request.GET.get("limit")
+    offset = request.GET.get("offset")
+
+    limit = int(limit) if limit not in (None, "") else None
+    offset = int(offset) if offset not in (None, "") else 0
+
+    if limit is not None and limit < 1:
+        raise ValueError(f"limit must be positive, not {limit}")
+    if offset < 0:
+        raise ValueError(f"offset must not be negative, not {offset}")
+    return limit, offset
+
+
 def get_dict_source(request):
     if dictionary_source := request.COOKIES.get("dictionary_source"):
         if dictionary_source:
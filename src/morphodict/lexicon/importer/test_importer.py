@@ -1,12 +1,16 @@
+import json
 from pathlib import Path
 
 import pytest
 from django.core.management import call_command
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from pytest_django.fixtures import _django_db_helper
 from pytest_django.plugin import DjangoDbBlocker
 
+from morphodict.lexicon.management.commands import importjsondict
 from morphodict.lexicon.models import (
+    Definition,
+    RapidWords,
     Wordform,
     TargetLanguageKeyword,
     SourceLanguageKeyword,
@@ -130,6 +134,78 @@ def test_import_lemma_without_auto_translation(db, translate_wordforms, reimport
     assert SourceLanguageKeyword.objects.count() == 0
 
 
+def test_parallel_import_matches_serial_import(db, monkeypatch):
+    def contents():
+        return (
+            list(Wordform.objects.order_by("id").values_list("id", "text", "lemma")),
+            list(
+                Definition.objects.order_by("id").values_list(
+                    "id", "wordform", "text", "auto_translation_source"
+                )
+            ),
+            sorted(TargetLanguageKeyword.objects.values_list("wordform", "text")),
+            sorted(SourceLanguageKeyword.objects.values_list("wordform", "text")),
+        )
+
+    import_test_file("items-needing-source-language-keywords.importjson")
+    serial = contents()
+    Wordform.objects.all().delete()
+
+    # Small enough chunks that even a test file is split between workers
+    monkeypatch.setattr(importjsondict, "EXPANSION_CHUNK_SIZE", 1)
+    import_test_file("items-needing-source-language-keywords.importjson", jobs=2)
+
+    assert contents() == serial
+
+
+def test_import_rebuilds_dropped_indexes(db):
+    def indexes():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index'")
+            return sorted(cursor.fetchall())
+
+    before = indexes()
+    import_test_file("two-words.importjson", tune_sqlite=True, atomic=True)
+    assert Wordform.objects.filter(is_lemma=True).count() == 2
+    assert indexes() == before
+
+
+def test_invalid_entry_deletes_nothing(db, tmp_path):
+    import_test_file("two-words.importjson")
+    entries = json.loads((TESTDATA_DIR / "two-words.importjson").read_text())
+    entries[1]["senses"] = []
+    invalid_file = tmp_path / "invalid.importjson"
+    invalid_file.write_text(json.dumps(entries))
+
+    with pytest.raises(Exception, match="no senses for slug maskwa"):
+        import_test_file(invalid_file, atomic=False)
+
+    # Entries are all checked before any lemma is replaced
+    amisk = Wordform.objects.get(slug="amisk")
+    assert definitions_match(amisk.definitions.all(), [["beaver", ["MD", "CW"]]])
+    assert Wordform.objects.filter(is_lemma=True).count() == 2
+
+
+def test_rapidwords_index(db):
+    RapidWords.objects.bulk_create(
+        [
+            RapidWords(index="1.2", domain="Sky"),
+            RapidWords(index="1.2.3", domain="Sun"),
+            RapidWords(index="5", domain="Food"),
+        ]
+    )
+    index = importjsondict.RapidWordsIndex()
+
+    assert index.resolve("1.2.3", []) == "1.2.3"
+    # Falls back to the parent
+    assert index.resolve("1.2.3.4", []) == "1.2.3"
+    # Falls back to the longest prefix in one of the annotated domains
+    assert index.resolve("1.2.3.4.5", ["sky"]) == "1.2"
+    assert index.resolve("1.2.3.4.5", ["Sky", "SUN"]) == "1.2.3"
+    assert index.resolve("1.2.3.4.5", []) is None
+    assert index.resolve("6", ["Food"]) is None
+
+
 def debug(wf):
     print(repr(wf))
     for d in wf.definitions.all():
@@ -213,6 +289,7 @@ class TestSourceLanguageKeywordPopulation:
 
         kw2 = TargetLanguageKeyword.objects.get(wordform=wf)
         assert kw2.text == "bear"
+        assert kw2.normalized_text == "bear"
 
     def test_indexing_of_fst_lemma(self):
         wf = Wordform.objects.get(slug="kôkom_")
@@ -0,0 +1,247 @@
+"""
+Reading, writing and sorting importjson files a few entries at a time
+
+An importjson file is a JSON array of entries. Full dictionaries can be
+hundreds of megabytes, and many times that once parsed, so the functions here
+never hold a whole dictionary in memory: entries are read and written one by
+one, and sorted with an external merge sort.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import tempfile
+from contextlib import ExitStack
+from itertools import groupby, islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+from unicodedata import normalize
+
+if TYPE_CHECKING:
+    from _typeshed import SupportsRichComparison
+
+# How many characters to read at a time
+READ_SIZE = 1 << 20
+
+# How many entries to sort in memory at a time; longer inputs are sorted in
+# runs of this many entries, written to temporary files, and then merged.
+SORT_CHUNK_SIZE = 50_000
+
+_WHITESPACE = " \t\n\r"
+
+
+class ImportJsonFile:
+    """
+    An importjson file that can be iterated over, entry by entry, any number of
+    times
+    """
+
+    def __init__(self, path: os.PathLike | str):
+        self.path = Path(path)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter_importjson(self.path)
+
+    def __repr__(self):
+        return f"{type(self).__qualname__}({os.fspath(self.path)!r})"
+
+
+def iter_importjson(path: os.PathLike | str) -> Iterator[dict]:
+    """
+    Yield the entries of an importjson file one at a time
+
+    Only the entry being decoded, and at most READ_SIZE characters after it,
+    are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="UTF-8") as f:
+        buffer = ""
+        position = 0
+        eof = False
+
+        def skip_whitespace():
+            """Move past whitespace, reading more as needed; False at EOF"""
+            nonlocal buffer, position, eof
+            while True:
+                while position < len(buffer) and buffer[position] in _WHITESPACE:
+                    position += 1
+                if position < len(buffer):
+                    return True
+                if eof:
+                    return False
+                buffer = f.read(READ_SIZE)
+                position = 0
+                eof = not buffer
+
+        if not skip_whitespace() or buffer[position] != "[":
+            raise ValueError(f"{path} does not contain a JSON array")
+        position += 1
+
+        first = True
+        while True:
+            if not skip_whitespace():
+                raise ValueError(f"{path} ends in the middle of the array")
+            if buffer[position] == "]":
+                return
+            if not first:
+                if buffer[position] != ",":
+                    raise ValueError(
+                        f"{path}: expected ',' between entries, not {buffer[position]!r}"
+                    )
+                position += 1
+                if not skip_whitespace():
+                    raise ValueError(f"{path} ends in the middle of the array")
+            first = False
+
+            while True:
+                try:
+                    entry, end = decoder.raw_decode(buffer, position)
+                    # Something must follow a complete entry, so an entry that
+                    # runs to the end of what has been read may be cut short
+                    if end < len(buffer) or eof:
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                more = f.read(READ_SIZE)
+                buffer = buffer[position:] + more
+                position = 0
+                eof = not more
+            position = end
+            yield entry
+
+
+def write_importjson(
+    path: os.PathLike | str, entries: Iterable[dict], indent: int = 2
+) -> None:
+    """
+    Write entries to path as an importjson file, one entry at a time
+
+    The file is written next to path, and only moved into place once complete,
+    so path may also be the file that the entries are being read from.
+    """
+    path = Path(path)
+    with tempfile.NamedTemporaryFile(
+        "w",
+        encoding="UTF-8",
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        delete=False,
+    ) as f:
+        try:
+            f.write("[")
+            for i, entry in enumerate(entries):
+                f.write(",\n" if i else "\n")
+                f.write(
+                    json.dumps(entry, ensure_ascii=False, indent=indent, sort_keys=True)
+                )
+            f.write("\n]\n")
+        except BaseException:
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+def sort_entries(
+    entries: Iterable[dict],
+    key: Callable[[dict], SupportsRichComparison],
+    chunk_size: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Yield entries sorted by key, like sorted(), but in bounded memory
+
+    The sort is stable. At most chunk_size entries, by default SORT_CHUNK_SIZE,
+    are sorted in memory at a time.
+
+    >>> list(sort_entries([{"n": 3}, {"n": 1}, {"n": 2}], lambda e: e["n"], 2))
+    [{'n': 1}, {'n': 2}, {'n': 3}]
+    """
+    chunk_size = chunk_size or SORT_CHUNK_SIZE
+    entries = iter(entries)
+    chunk = sorted(islice(entries, chunk_size), key=key)
+    next_chunk = list(islice(entries, chunk_size))
+    if not next_chunk:
+        yield from chunk
+        return
+
+    with tempfile.TemporaryDirectory() as directory, ExitStack() as stack:
+        runs: list[Path] = []
+        while chunk:
+            run = Path(directory) / f"{len(runs)}.jsonl"
+            with open(run, "w", encoding="UTF-8") as f:
+                for entry in chunk:
+                    # json.dumps escapes newlines, so each entry is one line
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            runs.append(run)
+            chunk = sorted(next_chunk, key=key)
+            next_chunk = list(islice(entries, chunk_size))
+
+        # heapq.merge() takes equal items from earlier runs first, so the
+        # merge is stable too
+        yield from heapq.merge(
+            *(
+                map(json.loads, stack.enter_context(open(run, encoding="UTF-8")))
+                for run in runs
+            ),
+            key=key,
+        )
+
+
+# If you change how this sort works, you should change the matching
+# entryKeyBySlugThenText function written in JavaScript as well.
+def entry_sort_key(entry):
+    """
+    - Sort lemmas by slug
+    - Sort non-lemma wordforms by head, immediately after slug
+    """
+    is_lemma = "slug" in entry
+    if is_lemma:
+        slug = entry["slug"]
+        # Empty string will sort first, before any non-lemma wordforms
+        form = ""
+    else:
+        slug = entry["formOf"]
+        form = entry["head"]
+
+    # This isn’t quite right, but by decomposing characters, at least ‘a’s will
+    # sort near each other
+    slug = normalize("NFD", slug)
+    form = normalize("NFD", form)
+
+    return (slug, form)
+
+
+def entry_slug(entry) -> str:
+    """The slug of the lemma an entry belongs to"""
+    if "slug" in entry:
+        return entry["slug"]
+    elif "formOf" in entry:
+        return entry["formOf"]
+    raise Exception(f"Encountered entry without 'slug' or 'formOf' fields: {entry!r}")
+
+
+def group_by_slug(entries: Iterable[dict]) -> Iterator[tuple[str, list[dict]]]:
+    """
+    Yield (slug, entries) for each lemma, with the lemma and its formOf entries
+    sorted by entry_sort_key
+
+    >>> for slug, group in group_by_slug([
+    ...     {"formOf": "b", "head": "bs"},
+    ...     {"slug": "a", "head": "a"},
+    ...     {"slug": "b", "head": "b"},
+    ... ]):
+    ...     print(slug, [e["head"] for e in group])
+    a ['a']
+    b ['b', 'bs']
+    """
+    # The slug goes first in the key so that lemmas whose slugs only differ
+    # in normalization do not get interleaved
+    return (
+        (slug, list(group))
+        for slug, group in groupby(
+            sort_entries(entries, key=lambda e: (entry_slug(e), entry_sort_key(e))),
+            key=entry_slug,
+        )
+    )
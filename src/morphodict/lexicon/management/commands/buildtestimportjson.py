@@ -5,10 +5,9 @@ from argparse import (
     ArgumentParser,
     ArgumentDefaultsHelpFormatter,
 )
-from collections import defaultdict
 from pathlib import Path
 from subprocess import check_call
-from unicodedata import normalize
+from typing import Iterable
 
 from django.core.management import BaseCommand
 
@@ -16,6 +15,7 @@ from morphodict.lexicon import (
     DEFAULT_FULL_IMPORTJSON_FILE,
     DEFAULT_TEST_IMPORTJSON_FILE,
 )
+from morphodict.lexicon.importjson import ImportJsonFile, entry_sort_key
 from morphodict.lexicon.test_db import TEST_DB_TXT_FILE, get_test_words
 
 logger = logging.getLogger(__name__)
@@ -48,7 +48,7 @@ class Command(BaseCommand):
         test_importjson = Path(test_importjson)
         test_db_words_file = Path(test_db_words_file)
 
-        full_dictionary = json.loads(full_importjson.read_text())
+        full_dictionary = ImportJsonFile(full_importjson)
 
         words = get_test_words(test_db_words_file)
 
@@ -72,89 +72,55 @@ class Command(BaseCommand):
         )
 
 
-# If you change how this sort works, you should change the matching
-# entryKeyBySlugThenText function written in JavaScript as well.
-def entry_sort_key(entry):
-    """
-    - Sort lemmas by slug
-    - Sort non-lemma wordforms by head, immediately after slug
+class TestDictionary:
     """
-    is_lemma = "slug" in entry
-    if is_lemma:
-        slug = entry["slug"]
-        # Empty string will sort first, before any non-lemma wordforms
-        form = ""
-    else:
-        slug = entry["formOf"]
-        form = entry["head"]
-
-    # This isn’t quite right, but by decomposing characters, at least ‘a’s will
-    # sort near each other
-    slug = normalize("NFD", slug)
-    form = normalize("NFD", form)
-
-    return (slug, form)
+    The entries of full_dictionary belonging to the same lemmas as words
 
+    full_dictionary is read twice, so must be re-iterable, e.g., an
+    ImportJsonFile; it is never held in memory all at once.
+    """
 
-class TestDictionary:
-    def __init__(self, full_dictionary, words):
+    def __init__(self, full_dictionary: Iterable[dict], words):
         self._full_dictionary = full_dictionary
         self._test_words = words
 
-        # List of entries
-        self._entries = []
-        # set of IDs to avoid duplicates
-        self._added_entries = set()
-
         # Track which words we haven’t yet seen
         self._unused_words = set(self._test_words)
 
-        self._group_by_slug()
+        self._find_slugs()
         self._extract()
 
-    def _group_by_slug(self):
-        """Create _by_slug dict mapping slugs to list of lemma and all wordforms"""
-        self._by_slug = defaultdict(list)
-        for entry in self._full_dictionary:
-            if "slug" in entry:
-                assert "formOf" not in entry
-                self._by_slug[entry["slug"]].append(entry)
-            elif "formOf" in entry:
-                assert "slug" not in entry
-                self._by_slug[entry["formOf"]].append(entry)
-            else:
-                raise AssertionError("Entry must contain either formOf or slug")
-
-    def _add_entry(self, entry):
-        """Add an entry from the full dictionary to the test one."""
-
-        if id(entry) in self._added_entries:
-            return
-
-        head = entry["head"]
-        self._unused_words.discard(head)
-        self._entries.append(entry)
-        self._added_entries.add(id(entry))
-
-    def _extract(self):
+    def _find_slugs(self):
         # An entry will be picked up if any of these apply:
         #   - It is a lemma whose head text is listed in test_db_words
         #   - It is a wordform whose head text is listed in test_db_words
         #   - It is a lemma or wordform from the same lexeme as one of the above
-
+        self._slugs = set()
         for entry in self._full_dictionary:
             if entry["head"] in self._test_words:
-                self._add_entry(entry)
-
-        for entry in self._entries[:]:
-            slug = entry["slug"] if "slug" in entry else entry["formOf"]
-            for form in self._by_slug[slug]:
-                self._add_entry(form)
+                self._slugs.add(self._slug(entry))
+                self._unused_words.discard(entry["head"])
 
         if self._unused_words:
             raise Exception(
                 f"Some words from test_db_words were not extracted: {self._unused_words!r}"
             )
 
+    def _extract(self):
+        self._entries = [
+            entry for entry in self._full_dictionary if self._slug(entry) in self._slugs
+        ]
+
+    @staticmethod
+    def _slug(entry):
+        if "slug" in entry:
+            assert "formOf" not in entry
+            return entry["slug"]
+        elif "formOf" in entry:
+            assert "slug" not in entry
+            return entry["formOf"]
+        else:
+            raise AssertionError("Entry must contain either formOf or slug")
+
     def entries(self):
         return sorted(self._entries, key=entry_sort_key)
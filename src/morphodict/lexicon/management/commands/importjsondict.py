@@ -9,12 +9,17 @@ from argparse import (
     ArgumentDefaultsHelpFormatter,
 )
 from collections import defaultdict
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Iterable, NamedTuple, Optional, cast
 
+import django
 from django.conf import settings
 from django.core.management import BaseCommand, call_command
-from django.db import transaction
-from django.db.models import Max, Q
+from django.db import OperationalError, connection, models, transaction
+from django.db.models import Max
+from more_itertools import chunked, spy
 from tqdm import tqdm
 
 from morphodict.paradigm.generation import default_paradigm_manager
@@ -25,7 +30,7 @@ from morphodict.phrase_translate.to_source import (
 from morphodict.utils.english_keyword_extraction import stem_keywords
 from morphodict.analysis import RichAnalysis, strict_generator
 from morphodict.lexicon import DEFAULT_IMPORTJSON_FILE
-from morphodict.lexicon.management.commands.buildtestimportjson import entry_sort_key
+from morphodict.lexicon.importjson import ImportJsonFile, group_by_slug
 from morphodict.search.types import WordnetEntry
 from morphodict.lexicon.models import (
     Wordform,
@@ -37,10 +42,33 @@ from morphodict.lexicon.models import (
     RapidWords,
     WordNetSynset,
 )
-from morphodict.lexicon.util import to_source_language_keyword
+from morphodict.lexicon.util import (
+    to_source_language_keyword,
+    to_target_language_keyword,
+)
 
 logger = logging.getLogger(__name__)
 
+# How many lemma entries to send to a worker process at a time with --jobs
+EXPANSION_CHUNK_SIZE = 50
+
+# How many lemma entries to expand, or formOf entries to import, at a time, so
+# that memory use does not grow with the size of the dictionary
+IMPORT_CHUNK_SIZE = 5000
+
+# Settings that make bulk writes to SQLite faster, applied only while
+# importing. In WAL mode, synchronous=NORMAL can lose the last few commits on
+# power loss, but cannot corrupt the database. A negative cache_size is in KiB.
+IMPORT_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -256 * 1024,
+}
+
+# How many values to look up at a time with `__in` queries, to stay well
+# under SQLite’s limit on query parameters
+QUERY_CHUNK_SIZE = 500
+
 
 class DictionarySourceCache:
     """
@@ -178,12 +206,13 @@ class FreshnessCheck:
     fresh.
     """
 
-    def __init__(self, new_data):
+    def __init__(self, new_data: Iterable[dict]):
         """
         Create a new FreshnessCheck that will compare the DB to `new_data`.
 
-        `new_data` should be a Python list of importjsondata; it could be loaded
-        with `json.loads(importjsonfile.read())`
+        `new_data` is an iterable of importjson entries, such as a list or an
+        ImportJsonFile. Entries are grouped by slug with an external sort, so
+        only the hashes are kept in memory.
         """
         self._db_hashes_by_slug = {
             slug: hash
@@ -192,22 +221,9 @@ class FreshnessCheck:
             ).values_list("slug", "import_hash")
         }
 
-        entries_by_slug = defaultdict(list)
-        for entry in new_data:
-            if "slug" in entry:
-                slug = entry["slug"]
-            elif "formOf" in entry:
-                slug = entry["formOf"]
-            else:
-                raise Exception(
-                    f"Encountered entry without 'slug' or 'formOf' fields: {entry!r}"
-                )
-            entries_by_slug[slug].append(entry)
-
         importjson_hashes_by_slug = {}
-        for slug, entries in entries_by_slug.items():
-            # Same sort order as what sortimportjson uses
-            entries.sort(key=entry_sort_key)
+        # Entries come sorted in the same order as what sortimportjson uses
+        for slug, entries in group_by_slug(new_data):
             # sort_keys is important
             entry_list_as_json = json.dumps(
                 entries, ensure_ascii=False, indent=0, sort_keys=True
@@ -219,6 +235,9 @@ class FreshnessCheck:
     def db_hash_for_slug(self, slug):
         return self._db_hashes_by_slug.get(slug)
 
+    def importjson_slugs(self):
+        return self._importjson_hash_for_slug.keys()
+
     def importjson_hash_for_slug(self, slug):
         return self._importjson_hash_for_slug[slug]
 
@@ -230,21 +249,337 @@ class FreshnessCheck:
         return db_hash == importjson_hash
 
 
+class WordformRow(NamedTuple):
+    text: str
+    raw_analysis: Optional[tuple]
+
+
+class DefinitionRow(NamedTuple):
+    # Index of the wordform in LemmaRows.wordforms
+    wordform: int
+    text: str
+    sources: tuple[str, ...]
+    raw_semantic_definition: Optional[str] = None
+    raw_core_definition: Optional[str] = None
+    # Index in LemmaRows.definitions of the definition this one was
+    # auto-translated from
+    auto_translation_source: Optional[int] = None
+
+
+class KeywordRow(NamedTuple):
+    # Index of the wordform in LemmaRows.wordforms
+    wordform: int
+    text: str
+
+
+@dataclass
+class LemmaRows:
+    """
+    The rows to insert for one lemma entry, as plain values
+
+    Rows refer to wordforms and definitions by their index in these lists,
+    not by ID, so that they can be worked out in another process. The first
+    wordform is the lemma itself.
+    """
+
+    wordforms: list[WordformRow] = field(default_factory=list)
+    definitions: list[DefinitionRow] = field(default_factory=list)
+    target_language_keywords: list[KeywordRow] = field(default_factory=list)
+    source_language_keywords: list[KeywordRow] = field(default_factory=list)
+
+
+def lemma_wordform(entry, import_hash=None) -> Wordform:
+    """Return an unsaved Wordform for the lemma of an importjson entry"""
+    fst_lemma = None
+    if "fstLemma" in entry:
+        fst_lemma = entry["fstLemma"]
+    elif (analysis := entry.get("analysis")) is not None:
+        fst_lemma = analysis[1]
+
+    return Wordform(
+        text=entry["head"],
+        raw_analysis=entry.get("analysis", None),
+        fst_lemma=fst_lemma,
+        paradigm=entry.get("paradigm", None),
+        slug=entry["slug"],
+        is_lemma=True,
+        linguist_info=entry.get("linguistInfo", {}),
+        translation_templates=entry.get("translationTemplates", []),
+        import_hash=import_hash,
+    )
+
+
+class LemmaExpander:
+    """
+    Works out the rows for lemma entries, without touching the database
+
+    Most of an import is spent here, generating inflected forms with the FST
+    and translating definitions with the phrase FSTs, so with --jobs this runs
+    in worker processes.
+    """
+
+    def __init__(self, translate_wordforms: bool):
+        self.translate_wordforms = translate_wordforms
+        self.paradigm_manager = default_paradigm_manager()
+
+    def expand(self, entry, translation_stats: TranslationStats) -> LemmaRows:
+        wf = lemma_wordform(entry)
+        rows = LemmaRows(wordforms=[WordformRow(wf.text, wf.raw_analysis)])
+
+        self.populate_wordform_definitions(rows, wf, entry["senses"], translation_stats)
+
+        # Avoid dupes for this wordform
+        seen_source_language_keywords: set[str] = set()
+
+        slug_base = wf.slug.split("@")[0] if wf.slug else None
+        if wf.text != slug_base and slug_base:
+            self.add_source_language_keyword(
+                rows, slug_base, seen_source_language_keywords
+            )
+        if wf.fst_lemma and wf.text != wf.fst_lemma:
+            self.add_source_language_keyword(
+                rows, wf.fst_lemma, seen_source_language_keywords
+            )
+        if wf.raw_analysis is None:
+            self.index_unanalyzed_form(rows, wf, seen_source_language_keywords)
+
+        return rows
+
+    def populate_wordform_definitions(
+        self, rows: LemmaRows, wf, senses, translation_stats: TranslationStats
+    ):
+        should_do_translation = self.translate_wordforms
+
+        if should_do_translation:
+            has_analysis_and_paradigm = (
+                (wf.analysis and wf.paradigm)
+                if not settings.MORPHODICT_ENABLE_FST_LEMMA_SUPPORT
+                else (wf.fst_lemma and wf.paradigm)
+            )
+
+            if not has_analysis_and_paradigm:
+                should_do_translation = False
+
+        lemma_definitions = self.add_senses(rows, 0, senses)
+
+        if not should_do_translation:
+            return
+
+        lemma_text = (
+            wf.text
+            if not settings.MORPHODICT_ENABLE_FST_LEMMA_SUPPORT
+            else wf.fst_lemma
+        )
+
+        # Inflecting the translation templates is the same work for every
+        # form of the lemma, so do it once
+        translation_plan = self.paradigm_manager.translation_plan(
+            wf.paradigm, wf.extract_translation_templates()
+        )
+
+        for (
+            prefix_tags,
+            suffix_tags,
+        ) in self.paradigm_manager.all_analysis_template_tags(wf.paradigm):
+            analysis = RichAnalysis((prefix_tags, lemma_text, suffix_tags))
+            for generated in strict_generator().lookup(analysis.smushed()):
+                inflected_wordform = Wordform(
+                    # For now, leaving paradigm and linguist_info empty;
+                    # code can get that info from the lemma instead.
+                    text=generated,
+                    raw_analysis=analysis.tuple,
+                    is_lemma=False,
+                )
+                # Only forms that get definitions are saved
+                inflected_index = None
+
+                def add_inflected_definition(text, sources, auto_translation_source):
+                    nonlocal inflected_index
+                    if inflected_index is None:
+                        rows.wordforms.append(
+                            WordformRow(generated, inflected_wordform.raw_analysis)
+                        )
+                        inflected_index = len(rows.wordforms) - 1
+                    rows.definitions.append(
+                        DefinitionRow(
+                            inflected_index,
+                            text,
+                            tuple("🤖" + source for source in sources),
+                            auto_translation_source=auto_translation_source,
+                        )
+                    )
+
+                # Collect definitions from template usage as well
+                tags = "".join(prefix_tags) + "".join(suffix_tags)
+                if template_candidates := translation_plan.get(tags):
+                    candidate = min(template_candidates)
+                    alternative_sources = {
+                        source
+                        for x in wf.translation_templates
+                        if x["name"] == candidate
+                        for source in x["sources"]
+                    }
+                    for translation in template_candidates[candidate]:
+                        add_inflected_definition(translation, alternative_sources, None)
+
+                    continue
+
+                # Skip re-instantiating lemma
+                if analysis == wf.analysis:
+                    continue
+
+                for d in lemma_definitions:
+                    definition = rows.definitions[d]
+                    translation = translate_single_definition(
+                        inflected_wordform, definition.text, translation_stats
+                    )
+                    if translation is None:
+                        continue
+
+                    add_inflected_definition(translation, definition.sources, d)
+
+    def add_senses(self, rows: LemmaRows, wordform: int, senses) -> list[int]:
+        """
+        Add definition and keyword rows for the senses of a wordform, returning
+        the indices of the new definitions
+        """
+        added = []
+        keywords = set()
+
+        for sense in senses:
+            row = DefinitionRow(
+                wordform,
+                sense["definition"],
+                tuple(sense["sources"]),
+                raw_semantic_definition=sense.get("semanticDefinition"),
+                raw_core_definition=sense.get("coreDefinition"),
+            )
+            added.append(len(rows.definitions))
+            rows.definitions.append(row)
+
+            semantic_definition = Definition(
+                text=row.text, raw_semantic_definition=row.raw_semantic_definition
+            ).semantic_definition
+            keywords.update(stem_keywords(semantic_definition))
+
+        # Sorted, so that the keyword rows come out in the same order in every
+        # process, whatever its hash seed
+        rows.target_language_keywords.extend(
+            KeywordRow(wordform, kw) for kw in sorted(keywords)
+        )
+        return added
+
+    def index_unanalyzed_form(self, rows: LemmaRows, wordform, seen):
+        """Index unanalyzed forms such as phrases, Cree preverbs
+
+        These get put into the SourceLanguageKeyword table.
+        """
+        keywords = set(
+            to_source_language_keyword(piece) for piece in wordform.text.split()
+        )
+
+        for kw in sorted(keywords):
+            self.add_source_language_keyword(rows, kw, seen)
+
+    def add_source_language_keyword(self, rows: LemmaRows, keyword: str, seen):
+        if keyword in seen:
+            return
+
+        rows.source_language_keywords.append(KeywordRow(0, keyword))
+        seen.add(keyword)
+
+
+# The LemmaExpander of a worker process
+_worker_expander: Optional[LemmaExpander] = None
+
+
+def _start_expansion_worker(translate_wordforms: bool):
+    global _worker_expander
+    # django.setup() so that workers can also be started by spawning
+    django.setup()
+    _worker_expander = LemmaExpander(translate_wordforms)
+
+
+def _expand_in_worker(entry) -> tuple[LemmaRows, TranslationStats]:
+    assert _worker_expander is not None
+    translation_stats = TranslationStats()
+    return _worker_expander.expand(entry, translation_stats), translation_stats
+
+
+class RapidWordsIndex:
+    """
+    All RapidWords, for resolving the indices that entries are annotated with
+    """
+
+    def __init__(self):
+        self._by_index = {rw.index: rw for rw in RapidWords.objects.all()}
+
+    def resolve(self, index: str, domains: list[str]) -> Optional[str]:
+        """
+        Return the RapidWords index to link to for an annotated index, or None
+
+        An unknown index falls back to its parent, and then to the longest
+        index, in one of the given domains, that the annotation starts with.
+        """
+        if index in self._by_index:
+            return index
+        parent = ".".join(index.split(".")[:-1])
+        if parent in self._by_index:
+            return parent
+
+        lowercase_domains = {domain.lower() for domain in domains}
+        for length in range(len(index), 0, -1):
+            candidate = self._by_index.get(index[:length])
+            if candidate is not None and candidate.domain.lower() in lowercase_domains:
+                return candidate.index
+        return None
+
+
+def normalize_synset_name(name: str) -> Optional[str]:
+    """Return the canonical name of an annotated WordNet synset, or None
+
+    An annotation may not be found because it uses a non-canonical POS tag
+    (should be "a", "s", "r", "n", "v", which stand for ADJ, ADJ_SAT, ADV,
+    NOUN, VERB), or a non-canonical lemma. Use the canonical lemma appearing
+    in "name" in our wordnet instance site.
+    """
+    try:
+        return str(WordnetEntry(name))
+    except Exception:
+        return None
+
+
 class Import:
     def __init__(
         self,
-        importjson: list,
+        importjson: Iterable[dict],
         translate_wordforms: bool,
         purge: bool,
         incremental: bool,
         atomic=True,
         skip_building_vectors_because_testing=False,
+        jobs=1,
+        tune_sqlite=False,
     ):
         """
         Create an Import process.
 
+        importjson is read several times over, so it must be re-iterable: a
+        list, or an ImportJsonFile to stream a large file in bounded memory.
+
         If atomic is False, this will use batch processing that still works when
         not in a transaction.
+
+        With jobs > 1, lemma entries are expanded into rows by that many worker
+        processes. This process still writes all the rows, in entry order, so
+        the result is the same as with a single job.
+
+        With tune_sqlite, when the import is atomic and writes at least as many
+        lemmas as the database already has, the secondary indexes of the tables
+        being filled are dropped and rebuilt once the lemmas are in, instead of
+        being updated row by row. Outside a transaction, other processes would
+        see the tables without their indexes. Afterwards, SQLite’s query planner
+        statistics are refreshed.
         """
         self.dictionary_source_cache = DictionarySourceCache()
         self.data = importjson
@@ -257,7 +592,10 @@ class Import:
 
         self._has_run = False
 
-        self.paradigm_manager = default_paradigm_manager()
+        self.jobs = jobs
+        self.atomic = atomic
+        self.tune_sqlite = tune_sqlite and connection.vendor == "sqlite"
+        self.expander = LemmaExpander(translate_wordforms)
         self.translation_stats = TranslationStats()
 
         trigger_deps = not atomic
@@ -296,178 +634,92 @@ class Import:
 
         freshness_check = FreshnessCheck(self.data)
 
-        seen_slugs = set()
+        imported_slugs = set()
         if self.purge:
             existing_slugs = self.gather_slugs()
 
-        form_definitions = []
+        # Before anything is deleted, so that an invalid entry cannot leave the
+        # lemmas before it deleted and not replaced
+        seen_slugs = self.validate_lemma_entries()
 
-        for entry in tqdm(self.data, smoothing=0):
-            if "formOf" in entry:
-                form_definitions.append(entry)
-                continue
+        def lemma_entries():
+            for entry in self.data:
+                if "formOf" in entry:
+                    continue
+                if self.incremental and freshness_check.is_fresh(entry["slug"]):
+                    continue
 
-            if len(entry["senses"]) == 0:
-                raise Exception(f'Error: no senses for slug {entry["slug"]}')
-            for sense in entry["senses"]:
-                if "definition" not in sense:
-                    raise Exception(
-                        f'Error: no "definition" in sense {sense!r} of slug {entry["slug"]}'
+                imported_slugs.add(entry["slug"])
+                yield entry
+
+        stale_slugs = [
+            slug
+            for slug in freshness_check.importjson_slugs()
+            if not (self.incremental and freshness_check.is_fresh(slug))
+        ]
+        rebuild_indexes = (
+            self.tune_sqlite
+            and self.atomic
+            and len(stale_slugs) >= Wordform.objects.filter(is_lemma=True).count()
+        )
+        if rebuild_indexes:
+            # The deletes need the indexes that are about to be dropped. Inside
+            # the transaction, they are undone anyway if the import fails.
+            self.delete_lemmas(stale_slugs)
+
+        with (
+            secondary_indexes_dropped(BULK_INSERT_MODELS)
+            if rebuild_indexes
+            else nullcontext()
+        ):
+            for chunk in chunked(
+                tqdm(
+                    self.expand_lemmas(lemma_entries()),
+                    total=len(stale_slugs),
+                    smoothing=0,
+                ),
+                IMPORT_CHUNK_SIZE,
+            ):
+                if not rebuild_indexes:
+                    # Outside a transaction, a failed import loses at most the
+                    # chunk being written
+                    self.delete_lemmas([entry["slug"] for entry, _ in chunk])
+
+                for entry, rows in chunk:
+                    wf = lemma_wordform(
+                        entry,
+                        import_hash=freshness_check.importjson_hash_for_slug(
+                            entry["slug"]
+                        ),
                     )
+                    self.wordform_buffer.add(wf)
+                    assert wf.id is not None
 
-            seen_slugs.add(validate_slug_format(entry["slug"]))
+                    wf.lemma_id = wf.id
 
-            if self.incremental and freshness_check.is_fresh(entry["slug"]):
-                continue
+                    self.add_rows(rows, [wf])
 
-            if existing := Wordform.objects.filter(slug=entry["slug"]).first():
-                # Cascade should take care of all related objects.
-                existing.delete()
-
-            fst_lemma = None
-            if "fstLemma" in entry:
-                fst_lemma = entry["fstLemma"]
-            elif (analysis := entry.get("analysis")) is not None:
-                fst_lemma = analysis[1]
-
-            wf = Wordform(
-                text=entry["head"],
-                raw_analysis=entry.get("analysis", None),
-                fst_lemma=fst_lemma,
-                paradigm=entry.get("paradigm", None),
-                slug=entry["slug"],
-                is_lemma=True,
-                linguist_info=entry.get("linguistInfo", {}),
-                translation_templates=entry.get("translationTemplates", []),
-                import_hash=freshness_check.importjson_hash_for_slug(entry["slug"]),
-            )
-            self.wordform_buffer.add(wf)
-            assert wf.id is not None
-
-            wf.lemma_id = wf.id
-
-            if "senses" not in entry:
-                raise Exception(
-                    f"Invalid importjson: no senses for lemma text={wf.text} slug={wf.slug}"
-                )
+            # Make sure everything is saved for upcoming formOf queries
+            self.flush_insert_buffers()
 
-            self.populate_wordform_definitions(wf, entry["senses"])
+        self.link_semantic_domains(imported_slugs)
 
-            # Avoid dupes for this wordform
-            seen_source_language_keywords: set[str] = set()
-
-            slug_base = wf.slug.split("@")[0] if wf.slug else None
-            if wf.text != slug_base and slug_base:
-                self.add_source_language_keyword(
-                    wf, slug_base, seen_source_language_keywords
-                )
-            if wf.fst_lemma and wf.text != wf.fst_lemma:
-                self.add_source_language_keyword(
-                    wf, wf.fst_lemma, seen_source_language_keywords
-                )
-            if wf.raw_analysis is None:
-                self.index_unanalyzed_form(wf, seen_source_language_keywords)
-
-        # Make sure everything is saved for upcoming formOf queries
-        self.flush_insert_buffers()
-
-        wordforms = Wordform.objects.all()
-        for wf in tqdm(wordforms.iterator(chunk_size=2000), total=wordforms.count()):
-            if not wf.linguist_info:
-                continue
-
-            if "rw_indices" in wf.linguist_info:
-                rapidwords = {
-                    rw for l in wf.linguist_info["rw_indices"].values() for rw in l
-                }
-                for rw in rapidwords:
-                    index = rw.strip()
-                    try:
-                        rapidword = RapidWords.objects.get(index=index)
-                    except RapidWords.DoesNotExist:
-                        # Try flexible search
-                        try:
-                            try:
-                                candidates = [
-                                    RapidWords.objects.get(
-                                        index=".".join(index.split(".")[:-1])
-                                    )
-                                ]
-                            except RapidWords.DoesNotExist:
-                                query = Q(
-                                    domain__iexact=wf.linguist_info["rw_domains"][0]
-                                )
-                                for domain in wf.linguist_info["rw_domains"][1:]:
-                                    query |= Q(domain__iexact=domain)
-                                universe = RapidWords.objects.filter(query)
-                                candidates = [
-                                    x for x in universe if index.startswith(x.index)
-                                ]
-                        except:
-                            candidates = []
-                        if len(candidates) > 0:
-                            candidates.sort(key=lambda x: len(x.index), reverse=True)
-                            rapidword = candidates[0]
-                        else:
-                            print(
-                                f"WARNING: ImportJSON error: Slug {wf.slug} is annotated with nonexistent {index} RW index"
-                            )
-                    if rapidword:
-                        wf.rapidwords.add(rapidword)
-
-            if "wn_domains" in wf.linguist_info:
-                for wn in wf.linguist_info["wn_domains"]:
-                    try:
-                        normalized_name = str(WordnetEntry(wn.strip()))
-                    except:
-                        # This means that the annotated wordnet does not actually live in the dataset.
-                        # Most likely issue is that entry has a different canonical name, either because:
-                        # - canonical POS tag is different (should be "a", "s", "r", "n", "v",
-                        #   which stand for ADJ, ADJ_SAT, ADV, NOUN, VERB)
-                        # - entry annotated with a non-canonical lemma.  Use the canonical lemma appearing in
-                        #   "name" in our wordnet instance site.
-                        print(
-                            f"WARNING: ImportJSON error: Slug {wf.slug} is annotated with nonexistent {wn.strip()} WN domain"
-                        )
-                    if normalized_name:
-                        synset, _ = WordNetSynset.objects.get_or_create(
-                            name=normalized_name
-                        )
-                        wf.synsets.add(synset)
-
-        for entry in form_definitions:
-            if self.incremental and freshness_check.is_fresh(entry["formOf"]):
-                continue
-
-            try:
-                lemma = Wordform.objects.get(slug=entry["formOf"])
-            except Wordform.DoesNotExist:
-                raise Exception(
-                    f"Encountered wordform with formOf for unknown slug={entry['formOf']!r}"
-                )
-
-            # If translate_wordforms is enabled, a Wordform for this inflection
-            # may already have been created.
-            wf = Wordform.objects.get_or_create(
-                lemma=lemma,
-                text=entry["head"],
-                raw_analysis=entry.get("analysis", None),
-            )[0]
-
-            # Because we are inserting new definitions, there is a risk of duplicates.
-            # To avoid it, remember the old ones so that they are _not_ added.
-            # Use the InsertBuffer to make sure the set is full
-            self.create_definitions(wf, entry["senses"], True)
-
-        self.flush_insert_buffers()
+        form_definitions = (
+            entry
+            for entry in self.data
+            if "formOf" in entry
+            and not (self.incremental and freshness_check.is_fresh(entry["formOf"]))
+        )
+        for chunk in chunked(form_definitions, IMPORT_CHUNK_SIZE):
+            self.import_form_definitions(chunk)
+            # Later chunks look up the wordforms this one created
+            self.flush_insert_buffers()
 
         if self.translate_wordforms:
             logger.info("Translation stats: %s", self.translation_stats)
 
         if self.purge:
-            rows, breakdown = Wordform.objects.filter(
-                slug__in=existing_slugs - seen_slugs
-            ).delete()
+            rows, breakdown = self.delete_lemmas(existing_slugs - seen_slugs)
             if rows:
                 logger.warning(
                     f"Purged {rows:,} rows from database for existing entries not found in import file: %r",
@@ -482,104 +734,115 @@ class Import:
             stamp.timestamp = time.time()
             stamp.save()
 
+        if self.tune_sqlite:
+            with connection.cursor() as cursor:
+                if rebuild_indexes:
+                    for model in BULK_INSERT_MODELS:
+                        cursor.execute(f"ANALYZE {model._meta.db_table}")
+                else:
+                    cursor.execute("PRAGMA optimize")
+
         if not self.skip_building_vectors_because_testing:
             # Don’t overwrite the normal test_db definition vectors when doing a
             # test import with only a word or two
-            call_command("builddefinitionvectors")
-
-    def populate_wordform_definitions(self, wf, senses):
-        should_do_translation = self.translate_wordforms
-
-        if should_do_translation:
-            has_analysis_and_paradigm = (
-                (wf.analysis and wf.paradigm)
-                if not settings.MORPHODICT_ENABLE_FST_LEMMA_SUPPORT
-                else (wf.fst_lemma and wf.paradigm)
-            )
-
-            if not has_analysis_and_paradigm:
-                should_do_translation = False
+            call_command("builddefinitionvectors", incremental=self.incremental)
+            if settings.MORPHODICT_NEWS_VECTORS_PATH:
+                # New definitions may use words the pruned model lacks
+                call_command("buildprunednewsvectors")
+
+    def validate_lemma_entries(self) -> set[str]:
+        """Check every lemma entry, returning the set of their slugs"""
+        slugs = set()
+        for entry in self.data:
+            if "formOf" in entry:
+                continue
 
-        definitions_and_sources = self.create_definitions(wf, senses)
+            if len(entry["senses"]) == 0:
+                raise Exception(f'Error: no senses for slug {entry["slug"]}')
+            for sense in entry["senses"]:
+                if "definition" not in sense:
+                    raise Exception(
+                        f'Error: no "definition" in sense {sense!r} of slug {entry["slug"]}'
+                    )
 
-        if not should_do_translation:
+            slugs.add(validate_slug_format(entry["slug"]))
+        return slugs
+
+    def expand_lemmas(
+        self, entries: Iterable[dict]
+    ) -> Iterable[tuple[dict, LemmaRows]]:
+        """Yield each of the lemma entries with its rows, in order"""
+        head, entries = spy(entries, 2 * EXPANSION_CHUNK_SIZE)
+        if self.jobs <= 1 or len(head) < 2 * EXPANSION_CHUNK_SIZE:
+            for entry in entries:
+                yield entry, self.expander.expand(entry, self.translation_stats)
             return
 
-        lemma_text = (
-            wf.text
-            if not settings.MORPHODICT_ENABLE_FST_LEMMA_SUPPORT
-            else wf.fst_lemma
-        )
-
-        for (
-            prefix_tags,
-            suffix_tags,
-        ) in self.paradigm_manager.all_analysis_template_tags(wf.paradigm):
-            analysis = RichAnalysis((prefix_tags, lemma_text, suffix_tags))
-            for generated in strict_generator().lookup(analysis.smushed()):
-                inflected_wordform = Wordform(
-                    # For now, leaving paradigm and linguist_info empty;
-                    # code can get that info from the lemma instead.
-                    text=generated,
-                    raw_analysis=analysis.tuple,
-                    lemma=wf,
-                    is_lemma=False,
+        # Executor.map() submits all of its input at once, so entries are
+        # handed to it IMPORT_CHUNK_SIZE at a time
+        with ProcessPoolExecutor(
+            self.jobs,
+            initializer=_start_expansion_worker,
+            initargs=(self.translate_wordforms,),
+        ) as pool:
+            for chunk in chunked(entries, IMPORT_CHUNK_SIZE):
+                for entry, (rows, translation_stats) in zip(
+                    chunk,
+                    pool.map(_expand_in_worker, chunk, chunksize=EXPANSION_CHUNK_SIZE),
+                ):
+                    self.translation_stats.merge(translation_stats)
+                    yield entry, rows
+
+    def add_rows(self, rows: LemmaRows, wordforms: list[Wordform]):
+        """Add rows to the insert buffers
+
+        `wordforms` holds the Wordform objects for the first wordform rows,
+        which must already have IDs. The remaining wordform rows are created
+        as inflections of the first.
+        """
+        wordforms = list(wordforms)
+        for wordform_row in rows.wordforms[len(wordforms) :]:
+            wordform = Wordform(
+                text=wordform_row.text,
+                raw_analysis=wordform_row.raw_analysis,
+                lemma=wordforms[0],
+                is_lemma=False,
+            )
+            self.wordform_buffer.add(wordform)
+            wordforms.append(wordform)
+
+        definitions: list[Definition] = []
+        for definition_row in rows.definitions:
+            definitions.append(
+                self._add_definition(
+                    wordforms[definition_row.wordform],
+                    definition_row.text,
+                    list(definition_row.sources),
+                    raw_semantic_definition=definition_row.raw_semantic_definition,
+                    raw_core_definition=definition_row.raw_core_definition,
+                    auto_translation_source=(
+                        definitions[definition_row.auto_translation_source]
+                        if definition_row.auto_translation_source is not None
+                        else None
+                    ),
                 )
+            )
 
-                # Collect definitions from template usage as well
-                tags = "".join(prefix_tags) + "".join(suffix_tags)
-                template_candidates = (
-                    self.paradigm_manager.translation_templates_used_for_tags(
-                        wf.paradigm, wf.extract_translation_templates(), tags
-                    )
+        for keyword_row in rows.target_language_keywords:
+            self.target_language_keyword_buffer.add(
+                TargetLanguageKeyword(
+                    text=keyword_row.text,
+                    normalized_text=to_target_language_keyword(keyword_row.text),
+                    wordform=wordforms[keyword_row.wordform],
                 )
-                if template_candidates:
-                    candidate = template_candidates.pop()
-                    alternative_sources = {
-                        source
-                        for x in wf.translation_templates
-                        if x["name"] == candidate
-                        for source in x["sources"]
-                    }
-                    translations = self.paradigm_manager.all_translations(
-                        wf.paradigm, wf.extract_translation_templates()
-                    )[f"T({candidate},{tags})"]
-
-                    is_inflected_wordform_unsaved = inflected_wordform.id is None
-                    if is_inflected_wordform_unsaved:
-                        self.wordform_buffer.add(inflected_wordform)
-
-                    for translation in translations:
-                        self._add_definition(
-                            inflected_wordform,
-                            translation,
-                            ["🤖" + source for source in alternative_sources],
-                            auto_translation_source=None,
-                        )
-
-                    continue
-
-                # Skip re-instantiating lemma
-                if analysis == wf.analysis:
-                    continue
-
-                for d, sources in definitions_and_sources:
-                    translation = translate_single_definition(
-                        inflected_wordform, d.text, self.translation_stats
-                    )
-                    if translation is None:
-                        continue
-
-                    is_inflected_wordform_unsaved = inflected_wordform.id is None
-                    if is_inflected_wordform_unsaved:
-                        self.wordform_buffer.add(inflected_wordform)
+            )
 
-                    self._add_definition(
-                        inflected_wordform,
-                        translation,
-                        ["🤖" + source for source in sources],
-                        auto_translation_source=d,
-                    )
+        for keyword_row in rows.source_language_keywords:
+            self.source_language_keyword_buffer.add(
+                SourceLanguageKeyword(
+                    wordform=wordforms[keyword_row.wordform], text=keyword_row.text
+                )
+            )
 
     def _add_definition(self, wordform, text, sources: list[str], **kwargs):
         """Lower-level method to add a definition.
@@ -600,48 +863,201 @@ class Import:
             )
         return d
 
-    def create_definitions(self, wordform, senses, check_uniqueness=False):
-        """Create definition objects for the given wordform and senses."""
+    def import_form_definitions(self, entries: list[dict]):
+        """Add the definitions of formOf entries to their wordforms
 
-        # Normally definition.citations.all() would tell you the sources, but to
-        # allow batching of inserts we have to work with objects that have not
-        # yet been inserted. And we can’t query relations using the Django API
-        # on those.
-        definitions_and_sources = []
+        Lemmas are looked up by slug, and existing wordforms by (lemma, text,
+        analysis), in bulk. Wordforms that do not exist yet are created.
+        """
+        slugs = {entry["formOf"] for entry in entries}
+        lemma_ids: dict[str, int] = {}
+        for chunk in chunked(slugs, QUERY_CHUNK_SIZE):
+            # Filtering by slug leaves out the wordforms without one
+            lemma_ids.update(
+                cast(
+                    Iterable[tuple[str, int]],
+                    Wordform.objects.filter(slug__in=chunk).values_list("slug", "id"),
+                )
+            )
 
-        keywords = set()
+        # If translate_wordforms is enabled, a Wordform for an inflection may
+        # already have been created.
+        wordforms = {}
+        keywords = defaultdict(set)
+        for chunk in chunked(set(lemma_ids.values()), QUERY_CHUNK_SIZE):
+            for wordform in (
+                Wordform.objects.filter(lemma_id__in=chunk)
+                .only("id", "lemma_id", "text", "raw_analysis")
+                .order_by("-id")
+            ):
+                key = (wordform.lemma_id, wordform.text, _freeze(wordform.raw_analysis))
+                wordforms[key] = wordform
+            for wordform_id, text in TargetLanguageKeyword.objects.filter(
+                wordform__lemma_id__in=chunk
+            ).values_list("wordform_id", "text"):
+                keywords[wordform_id].add(text)
+
+        for entry in entries:
+            if (lemma_id := lemma_ids.get(entry["formOf"])) is None:
+                raise Exception(
+                    f"Encountered wordform with formOf for unknown slug={entry['formOf']!r}"
+                )
 
-        for sense in senses:
-            kwargs = {}
-            if "semanticDefinition" in sense:
-                kwargs["raw_semantic_definition"] = sense["semanticDefinition"]
-            if "coreDefinition" in sense:
-                kwargs["raw_core_definition"] = sense["coreDefinition"]
-
-            new_definition = self._add_definition(
-                wordform, sense["definition"], sense["sources"], **kwargs
-            )
-            definitions_and_sources.append((new_definition, sense["sources"]))
-
-            keywords.update(stem_keywords(new_definition.semantic_definition))
-
-        if check_uniqueness:
-            keywords -= {
-                kw.text
-                for kw in TargetLanguageKeyword.objects.filter(wordform=wordform)
-            }
-            keywords -= {
-                kw.text
-                for kw in self.target_language_keyword_buffer._buffer
-                if kw.wordform == wordform
-            }
-
-        for kw in keywords:
-            self.target_language_keyword_buffer.add(
-                TargetLanguageKeyword(text=kw, wordform=wordform)
-            )
+            raw_analysis = entry.get("analysis", None)
+            key = (lemma_id, entry["head"], _freeze(raw_analysis))
+            if (wf := wordforms.get(key)) is None:
+                wf = Wordform(
+                    lemma_id=lemma_id, text=entry["head"], raw_analysis=raw_analysis
+                )
+                self.wordform_buffer.add(wf)
+                wordforms[key] = wf
+
+            # Because we are inserting new definitions, there is a risk of
+            # duplicate keywords. To avoid it, skip the ones the wordform
+            # already has.
+            self.create_definitions(wf, entry["senses"], keywords[wf.id])
+
+    def create_definitions(self, wordform, senses, existing_keywords=None):
+        """Create definition objects for the given wordform and senses.
+
+        If given, existing_keywords is the set of keywords the wordform
+        already has, which are not added again. It is updated with the new
+        keywords.
+        """
+        rows = LemmaRows()
+        self.expander.add_senses(rows, 0, senses)
+
+        if existing_keywords is not None:
+            rows.target_language_keywords = [
+                row
+                for row in rows.target_language_keywords
+                if row.text not in existing_keywords
+            ]
+            existing_keywords.update(row.text for row in rows.target_language_keywords)
+
+        self.add_rows(rows, [wordform])
+
+    def link_semantic_domains(self, slugs: set[str]):
+        """Link the lemmas with the given slugs to their annotated semantic domains
+
+        Only lemmas imported in this run need linking: the links of fresh
+        lemmas survive from the import that created them.
+        """
+        rapidwords_index = RapidWordsIndex()
+        known_synsets = set(WordNetSynset.objects.values_list("name", flat=True))
+        synset_names: dict[str, Optional[str]] = {}
+
+        rapidwords_buffer = InsertBuffer(Wordform.rapidwords.through.objects)
+        new_synsets_buffer = InsertBuffer(WordNetSynset.objects)
+        synsets_buffer = InsertBuffer(
+            Wordform.synsets.through.objects,
+            trigger_deps=True,
+            deps=[new_synsets_buffer],
+        )
+
+        lemmas = (
+            lemma
+            for chunk in chunked(sorted(slugs), QUERY_CHUNK_SIZE)
+            for lemma in Wordform.objects.filter(
+                is_lemma=True, slug__in=chunk
+            ).values_list("id", "slug", "linguist_info")
+        )
+        for wordform_id, slug, linguist_info in tqdm(lemmas, total=len(slugs)):
+            if not linguist_info:
+                continue
 
-        return definitions_and_sources
+            if "rw_indices" in linguist_info:
+                indices = {
+                    rw.strip() for l in linguist_info["rw_indices"].values() for rw in l
+                }
+                rapidwords = set()
+                for index in sorted(indices):
+                    rapidword = rapidwords_index.resolve(
+                        index, linguist_info.get("rw_domains") or []
+                    )
+                    if rapidword is None:
+                        print(
+                            f"WARNING: ImportJSON error: Slug {slug} is annotated with nonexistent {index} RW index"
+                        )
+                    else:
+                        rapidwords.add(rapidword)
+                for rapidword in sorted(rapidwords):
+                    rapidwords_buffer.add(
+                        Wordform.rapidwords.through(
+                            wordform_id=wordform_id, rapidwords_id=rapidword
+                        )
+                    )
+
+            if "wn_domains" in linguist_info:
+                names = set()
+                for wn in linguist_info["wn_domains"]:
+                    wn = wn.strip()
+                    if wn not in synset_names:
+                        synset_names[wn] = normalize_synset_name(wn)
+                    if (name := synset_names[wn]) is None:
+                        print(
+                            f"WARNING: ImportJSON error: Slug {slug} is annotated with nonexistent {wn} WN domain"
+                        )
+                    else:
+                        names.add(name)
+                for name in sorted(names):
+                    if name not in known_synsets:
+                        known_synsets.add(name)
+                        new_synsets_buffer.add(WordNetSynset(name=name))
+                    synsets_buffer.add(
+                        Wordform.synsets.through(
+                            wordform_id=wordform_id, wordnetsynset_id=name
+                        )
+                    )
+
+        rapidwords_buffer.save()
+        new_synsets_buffer.save()
+        synsets_buffer.save()
+
+    def delete_lemmas(self, slugs: Iterable[str]) -> tuple[int, dict[str, int]]:
+        """Delete the lemmas with the given slugs, and everything belonging to them
+
+        Returns the number of rows deleted, in total and by model, like
+        QuerySet.delete().
+
+        QuerySet.delete() fetches every related object into Python to emulate
+        ON DELETE CASCADE. This instead deletes straight from each table, a
+        chunk of lemmas at a time. Auto-translated definitions are taken to
+        belong to the same lemma as the definitions they were translated
+        from, as they always do when created by this importer.
+        """
+        wordform_table = Wordform._meta.db_table
+        breakdown: dict[str, int] = defaultdict(int)
+
+        # Each statement repeats the slugs twice, so the chunks are half the
+        # usual size to stay under the query parameter limit
+        for chunk in chunked(slugs, QUERY_CHUNK_SIZE // 2):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            lemmas = f"SELECT id FROM {wordform_table} WHERE slug IN ({placeholders})"
+            wordforms = f"SELECT id FROM {wordform_table} WHERE id IN ({lemmas}) OR lemma_id IN ({lemmas})"
+            definitions = f"SELECT id FROM {Definition._meta.db_table} WHERE wordform_id IN ({wordforms})"
+
+            # (model, column, subquery for the IDs to delete); the order
+            # matters due to foreign keys
+            deletes: list[tuple[type[models.Model], str, str]] = [
+                (Definition.citations.through, "definition_id", definitions),
+                (TargetLanguageKeyword, "wordform_id", wordforms),
+                (SourceLanguageKeyword, "wordform_id", wordforms),
+                (Wordform.rapidwords.through, "wordform_id", wordforms),
+                (Wordform.synsets.through, "wordform_id", wordforms),
+                (Definition, "wordform_id", wordforms),
+                (Wordform, "id", wordforms),
+            ]
+            with connection.cursor() as cursor:
+                for model, column, ids in deletes:
+                    cursor.execute(
+                        f"DELETE FROM {model._meta.db_table} WHERE {column} IN ({ids})",
+                        chunk * 2,
+                    )
+                    if cursor.rowcount > 0:
+                        breakdown[model._meta.label] += cursor.rowcount
+
+        return sum(breakdown.values()), dict(breakdown)
 
     def gather_slugs(self):
         # For purging, this is used to track what existed initially
@@ -657,29 +1073,6 @@ class Import:
         self.source_language_keyword_buffer.save()
         self.target_language_keyword_buffer.save()
 
-    def index_unanalyzed_form(self, wordform, seen):
-        """Index unanalyzed forms such as phrases, Cree preverbs
-
-        These get put into the SourceLanguageKeyword table.
-        """
-        keywords = set(
-            to_source_language_keyword(piece) for piece in wordform.text.split()
-        )
-
-        for kw in keywords:
-            self.add_source_language_keyword(wordform, kw, seen)
-
-    def add_source_language_keyword(
-        self, wordform: Wordform, keyword: str, seen: set[str]
-    ):
-        if keyword in seen:
-            return
-
-        self.source_language_keyword_buffer.add(
-            SourceLanguageKeyword(wordform=wordform, text=keyword)
-        )
-        seen.add(keyword)
-
 
 class Command(BaseCommand):
     help = """Update the database from an importjson file
@@ -735,6 +1128,27 @@ class Command(BaseCommand):
                 the last import.
             """,
         )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="""
+                Generate inflected forms and their translations in this many
+                worker processes. The database is still written to by a single
+                process, so the result is the same as with one job.
+            """,
+        )
+        parser.add_argument(
+            "--tune-sqlite",
+            action=BooleanOptionalAction,
+            default=True,
+            help="""
+                On SQLite, switch to write-ahead logging with relaxed syncing
+                and a larger page cache for the duration of the import, and
+                rebuild indexes after large bulk inserts instead of updating
+                them row by row.
+            """,
+        )
         parser.add_argument(
             "--skip-building-vectors-because-testing",
             default=False,
@@ -755,25 +1169,117 @@ class Command(BaseCommand):
         translate_wordforms,
         incremental=False,
         skip_building_vectors_because_testing=False,
+        jobs=1,
+        tune_sqlite=True,
         **options,
     ):
         logger.info(f"Importing {json_file}")
-        data = json.loads(Path(json_file).read_text())
-
         imp = Import(
-            importjson=data,
+            importjson=ImportJsonFile(json_file),
             purge=purge,
             atomic=atomic,
             translate_wordforms=translate_wordforms,
             incremental=incremental,
             skip_building_vectors_because_testing=skip_building_vectors_because_testing,
+            jobs=jobs,
+            tune_sqlite=tune_sqlite,
         )
 
-        if atomic:
-            with transaction.atomic():
+        with sqlite_import_pragmas() if tune_sqlite else nullcontext():
+            if atomic:
+                with transaction.atomic():
+                    imp.run()
+            else:
                 imp.run()
-        else:
-            imp.run()
+
+
+# The tables that Import.run() bulk-inserts lemmas into
+BULK_INSERT_MODELS: list[type[models.Model]] = [
+    Wordform,
+    Definition,
+    Definition.citations.through,
+    TargetLanguageKeyword,
+    SourceLanguageKeyword,
+]
+
+
+@contextmanager
+def sqlite_import_pragmas():
+    """Apply IMPORT_SQLITE_PRAGMAS for the duration of the block
+
+    The previous settings are restored afterwards. SQLite cannot change the
+    journal mode or sync level inside a transaction, so inside one, or on other
+    databases, this does nothing. A pragma that cannot be applied is skipped
+    with a warning, as the import works without it.
+    """
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        yield
+        return
+
+    previous = {}
+    try:
+        with connection.cursor() as cursor:
+            for pragma, value in IMPORT_SQLITE_PRAGMAS.items():
+                try:
+                    cursor.execute(f"PRAGMA {pragma}")
+                    old_value = cursor.fetchone()[0]
+                    cursor.execute(f"PRAGMA {pragma} = {value}")
+                except OperationalError as e:
+                    # e.g., entering WAL mode while the server has the
+                    # database locked
+                    logger.warning(f"Could not set {pragma}={value}: {e}")
+                    continue
+                previous[pragma] = old_value
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for pragma, value in previous.items():
+                try:
+                    cursor.execute(f"PRAGMA {pragma} = {value}")
+                except OperationalError as e:
+                    # e.g., leaving WAL mode while another process is reading
+                    logger.warning(f"Could not restore {pragma}={value}: {e}")
+
+
+@contextmanager
+def secondary_indexes_dropped(models):
+    """Drop the non-unique indexes on the models’ tables until the block ends
+
+    Building an index once over all rows is much faster than updating it for
+    every inserted row. Unique indexes are kept, because they enforce
+    constraints. The indexes are re-created even if the block fails.
+    """
+    tables = [model._meta.db_table for model in models]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND sql IS NOT NULL
+                AND sql NOT LIKE 'CREATE UNIQUE %%'
+                AND tbl_name IN ({", ".join(["%s"] * len(tables))})
+            """,
+            tables,
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+
+
+def _freeze(value):
+    """Turn a JSON value into something hashable, for use in keys
+
+    >>> _freeze([[], "maskwa", ["+N", "+A", "+Sg"]])
+    ((), 'maskwa', ('+N', '+A', '+Sg'))
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
 
 
 def validate_slug_format(proposed_slug):
@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 import random
@@ -15,7 +14,12 @@ from morphodict import morphodict_language_pair
 from morphodict.lexicon import (
     DEFAULT_FULL_IMPORTJSON_FILE,
 )
-from morphodict.lexicon.management.commands.buildtestimportjson import entry_sort_key
+from morphodict.lexicon.importjson import (
+    entry_sort_key,
+    iter_importjson,
+    sort_entries,
+    write_importjson,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -48,32 +52,28 @@ class Command(BaseCommand):
     def handle(self, full_importjson, output_importjson, percentage, **options):
         fraction = percentage / 100
 
-        full_importjson = Path(full_importjson)
-
-        full_dictionary = json.loads(full_importjson.read_text())
-        full_dictionary.sort(key=entry_sort_key)
-
-        new_entries = []
+        full_dictionary = sort_entries(
+            iter_importjson(Path(full_importjson)), key=entry_sort_key
+        )
 
-        # formOf entries are kept iff the parent was kept. The sort order of
-        # entry_sort_key ensures that all non-lemma wordforms are seen as a
-        # group immediately after their corresponding lemmas.
-        kept_previous = None
-        for entry in full_dictionary:
-            if "formOf" in entry:
-                if kept_previous:
-                    new_entries.append(entry)
-            else:
-                should_keep = random.random() <= fraction
-                if should_keep:
-                    new_entries.append(entry)
+        def new_entries():
+            # formOf entries are kept iff the parent was kept. The sort order of
+            # entry_sort_key ensures that all non-lemma wordforms are seen as a
+            # group immediately after their corresponding lemmas.
+            kept_previous = None
+            for entry in full_dictionary:
+                if "formOf" in entry:
+                    if kept_previous:
+                        yield entry
+                else:
+                    should_keep = random.random() <= fraction
+                    if should_keep:
+                        yield entry
 
-                kept_previous = should_keep
+                    kept_previous = should_keep
 
         output_importjson = Path(output_importjson)
-        output_importjson.write_text(
-            json.dumps(new_entries, ensure_ascii=False, indent=True, sort_keys=True)
-        )
+        write_importjson(output_importjson, new_entries(), indent=1)
 
         check_call(
             [
@@ -1,4 +1,4 @@
-import json
+import os
 import subprocess
 from argparse import (
     ArgumentParser,
@@ -10,7 +10,12 @@ from subprocess import check_call
 from django.core.management import BaseCommand
 
 from morphodict.lexicon import DEFAULT_IMPORTJSON_FILE
-from morphodict.lexicon.management.commands.buildtestimportjson import entry_sort_key
+from morphodict.lexicon.importjson import (
+    entry_sort_key,
+    iter_importjson,
+    sort_entries,
+    write_importjson,
+)
 
 
 class Command(BaseCommand):
@@ -68,19 +73,18 @@ class Command(BaseCommand):
 
         output_files = []
         for json_file in json_files:
-            with open(json_file, "r") as f:
-                data = json.load(f)
+            json_file = os.fsdecode(json_file)
+            data = iter_importjson(json_file)
 
             if crkeng_cleanup:
-                self.crkeng_cleanup(data)
-
-            data.sort(key=entry_sort_key)
+                data = self.crkeng_cleanup(data)
 
             if not has_output_file:
                 output_file = json_file
 
-            with open(output_file, "w") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+            # The output is only moved into place once complete, so it is fine
+            # for it to be the file still being read
+            write_importjson(output_file, sort_entries(data, key=entry_sort_key))
 
             output_files.append(output_file)
 
@@ -104,3 +108,5 @@ class Command(BaseCommand):
                 ]:
                     if unused_key in linguistInfo:
                         del linguistInfo[unused_key]
+
+            yield entry
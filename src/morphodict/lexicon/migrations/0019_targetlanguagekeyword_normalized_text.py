@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+BATCH_SIZE = 5000
+
+
+def populate_normalized_text(apps, schema_editor):
+    # Kept in sync with morphodict.lexicon.util.to_target_language_keyword by
+    # hand, since migrations should not depend on code that may change.
+    TargetLanguageKeyword = apps.get_model("lexicon", "TargetLanguageKeyword")
+    batch = []
+    for kw in TargetLanguageKeyword.objects.only("id", "text").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        kw.normalized_text = kw.text.lower()
+        batch.append(kw)
+        if len(batch) >= BATCH_SIZE:
+            TargetLanguageKeyword.objects.bulk_update(batch, ["normalized_text"])
+            batch = []
+    if batch:
+        TargetLanguageKeyword.objects.bulk_update(batch, ["normalized_text"])
+
+
+def noop(apps, schema_editor):
+    """Empty operation to allow this migration to be reversed"""
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lexicon", "0018_wordform_translation_templates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="targetlanguagekeyword",
+            name="normalized_text",
+            field=models.CharField(
+                default="",
+                help_text="\n            The lowercased keyword text, used for case-insensitive lookups that\n            can use an index. Filled in from text on save().\n        ",
+                max_length=60,
+            ),
+        ),
+        migrations.RunPython(populate_normalized_text, noop),
+        migrations.AddIndex(
+            model_name="targetlanguagekeyword",
+            index=models.Index(
+                fields=["normalized_text"], name="lexicon_tar_normali_1e9eee_idx"
+            ),
+        ),
+    ]
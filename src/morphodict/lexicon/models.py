@@ -1,19 +1,15 @@
 from __future__ import annotations
 
 import logging
-from pathlib import Path
-from typing import Dict, Literal, Union, Any
+from typing import Literal, Mapping, Union, Any
 
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.urls import reverse
-from django.utils.functional import cached_property
 
 from morphodict.utils.serializer import SerializedDefinition
-from morphodict.utils import (
-    shared_res_dir,
-)
 from morphodict.analysis import RichAnalysis
+from morphodict.lexicon.util import to_target_language_keyword
 
 # How long a wordform or dictionary head can be. Not actually enforced in SQLite.
 MAX_WORDFORM_LENGTH = 60
@@ -302,6 +298,7 @@ class Definition(models.Model):
     auto_translation_source = models.ForeignKey(
         "self", on_delete=models.CASCADE, null=True
     )
+    auto_translation_source_id: int | None
 
     # Why this property exists:
     # because DictionarySource should be its own model, but most code only
@@ -321,7 +318,8 @@ class Definition(models.Model):
         return {
             "text": self.text,
             "source_ids": self.source_ids,
-            "is_auto_translation": self.auto_translation_source is not None,
+            # Checking the id avoids a query to fetch the source definition
+            "is_auto_translation": self.auto_translation_source_id is not None,
         }
 
     def __str__(self):
@@ -333,6 +331,15 @@ class TargetLanguageKeyword(models.Model):
 
     text = models.CharField(max_length=MAX_WORDFORM_LENGTH)
 
+    normalized_text = models.CharField(
+        max_length=MAX_WORDFORM_LENGTH,
+        default="",
+        help_text="""
+            The lowercased keyword text, used for case-insensitive lookups that
+            can use an index. Filled in from text on save().
+        """,
+    )
+
     wordform = models.ForeignKey(
         Wordform, on_delete=models.CASCADE, related_name="target_language_keyword"
     )
@@ -343,7 +350,16 @@ class TargetLanguageKeyword(models.Model):
                 fields=["text", "wordform_id"], name="target_kw_text_and_wordform"
             )
         ]
-        indexes = [models.Index(fields=["text"])]
+        indexes = [
+            models.Index(fields=["text"]),
+            models.Index(fields=["normalized_text"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Code that inserts keywords with bulk_create(), like the importer,
+        # has to set normalized_text itself.
+        self.normalized_text = to_target_language_keyword(self.text)
+        super().save(*args, **kwargs)
 
     def __repr__(self) -> str:
         return f"<TargetLanguageKeyword(text={self.text!r} of {self.wordform!r} ({self.id})>"
@@ -390,30 +406,25 @@ class ImportStamp(models.Model):
 
     timestamp = models.FloatField(help_text="epoch time of import")
 
+    @classmethod
+    def latest_timestamp(cls) -> float | None:
+        """The time of the last import, or None if nothing was ever imported
+
+        Caches of database contents compare this to know when to rebuild.
+        """
+        return cls.objects.values_list("timestamp", flat=True).first()
+
 
 class _WordformCache:
-    @cached_property
-    def MORPHEME_RANKINGS(self) -> Dict[str, float]:
-        logger.debug("reading morpheme rankings")
-        ret = {}
-
-        lines = (
-            Path(shared_res_dir / "CW_aggregate_morpheme_log_freqs.txt")
-            .read_text()
-            .splitlines()
-        )
-        max = 65.04136
-        for line in lines:
-            cells = line.split("\t")
-            # todo: use the third row
-            if len(cells) >= 2:
-                freq, morpheme, *_ = cells
-                # normalize the morpheme ranking
-                ret[morpheme] = float(freq) / max
-        return ret
+    @property
+    def MORPHEME_RANKINGS(self) -> Mapping[str, float]:
+        # Imported here because the search package imports this module
+        from morphodict.search.frequency import tables
+
+        return tables.morpheme_ranking.mapping()
 
     def preload(self):
-        # Accessing these cached properties will preload them
+        # Accessing these properties will preload them
         self.MORPHEME_RANKINGS
 
 
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from morphodict.lexicon import importjson
+from morphodict.lexicon.importjson import (
+    ImportJsonFile,
+    entry_sort_key,
+    group_by_slug,
+    iter_importjson,
+    sort_entries,
+    write_importjson,
+)
+
+ENTRIES = [
+    {"head": "nîpiy", "slug": "nîpiy", "senses": [{"definition": "leaf"}]},
+    {"head": "nîpiya", "formOf": "nîpiy", "senses": [{"definition": "leaves"}]},
+    {"head": "atim", "slug": "atim", "senses": [{"definition": 'dog, "horse"'}]},
+    {"head": "[]", "slug": "brackets", "senses": [], "n": [1, 2.5, None, True]},
+]
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 1 << 20])
+def test_iter_importjson(tmp_path, monkeypatch, read_size):
+    monkeypatch.setattr(importjson, "READ_SIZE", read_size)
+    path = tmp_path / "test.importjson"
+    path.write_text(json.dumps(ENTRIES, indent=2, ensure_ascii=False))
+
+    assert list(iter_importjson(path)) == ENTRIES
+    # And can be read again
+    assert list(ImportJsonFile(path)) == ENTRIES
+
+
+@pytest.mark.parametrize("text", ["[]", " [\n ] \n"])
+def test_iter_empty_importjson(tmp_path, text):
+    path = tmp_path / "test.importjson"
+    path.write_text(text)
+
+    assert list(iter_importjson(path)) == []
+
+
+@pytest.mark.parametrize(
+    "text", ["", "{}", '[{"head": "a"}', '[{"head": "a"} {"head": "b"}]', "[{"]
+)
+def test_iter_invalid_importjson(tmp_path, text):
+    path = tmp_path / "test.importjson"
+    path.write_text(text)
+
+    with pytest.raises(ValueError):
+        list(iter_importjson(path))
+
+
+def test_write_importjson_round_trips(tmp_path):
+    path = tmp_path / "test.importjson"
+    write_importjson(path, iter(ENTRIES))
+
+    assert json.loads(path.read_text()) == ENTRIES
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_write_importjson_over_its_input(tmp_path):
+    path = tmp_path / "test.importjson"
+    write_importjson(path, ENTRIES)
+
+    write_importjson(path, sort_entries(iter_importjson(path), key=entry_sort_key))
+
+    assert json.loads(path.read_text()) == sorted(ENTRIES, key=entry_sort_key)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_sort_entries_is_stable(chunk_size):
+    entries = [{"key": i % 3, "order": i} for i in range(10)]
+
+    assert list(
+        sort_entries(entries, key=lambda e: e["key"], chunk_size=chunk_size)
+    ) == sorted(entries, key=lambda e: e["key"])
+
+
+def test_group_by_slug(monkeypatch):
+    monkeypatch.setattr(importjson, "SORT_CHUNK_SIZE", 1)
+
+    assert [
+        (slug, [e["head"] for e in group]) for slug, group in group_by_slug(ENTRIES)
+    ] == [
+        ("atim", ["atim"]),
+        ("brackets", ["[]"]),
+        ("nîpiy", ["nîpiy", "nîpiya"]),
+    ]
+
+
+def test_entries_need_a_slug():
+    with pytest.raises(Exception, match="without 'slug' or 'formOf'"):
+        list(group_by_slug([{"head": "atim"}]))
@@ -19,3 +19,15 @@ def to_source_language_keyword(s: str) -> str:
         .translate(EXTRA_REPLACEMENTS)
         .strip("-")
     )
+
+
+def to_target_language_keyword(s: str) -> str:
+    """Convert a target-language keyword to the form it is indexed under
+
+    Target-language keywords are matched case-insensitively, so they are
+    stored lowercased, which lets lookups use a plain index.
+
+    >>> to_target_language_keyword("Bear")
+    'bear'
+    """
+    return s.lower()
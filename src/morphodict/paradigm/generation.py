@@ -6,6 +6,7 @@ from django.conf import settings
 
 
 import morphodict.analysis
+from morphodict.lexicon.models import ImportStamp
 from morphodict.paradigm.manager import (
     ParadigmManager,
     ParadigmManagerWithExplicitSizes,
@@ -21,6 +22,10 @@ def default_paradigm_manager() -> ParadigmManager:
 
     Affected by:
       - MORPHODICT_PARADIGM_SIZE_ORDER
+      - MORPHODICT_PARADIGM_CACHE_SIZE
+
+    Filled paradigms are cached until the next import. With
+    DEBUG_PARADIGM_TABLES, every call reloads the layouts, with an empty cache.
     """
 
     layout_dir = settings.BASE_DIR / ".." / "morphodict" / "paradigm" / "layouts"
@@ -36,6 +41,13 @@ def default_paradigm_manager() -> ParadigmManager:
             layout_dir,
             generator,
             ordered_sizes=settings.MORPHODICT_PARADIGM_SIZES,
+            cache_size=settings.MORPHODICT_PARADIGM_CACHE_SIZE,
+            cache_stamp=ImportStamp.latest_timestamp,
         )
     else:
-        return ParadigmManager(layout_dir, generator)
+        return ParadigmManager(
+            layout_dir,
+            generator,
+            cache_size=settings.MORPHODICT_PARADIGM_CACHE_SIZE,
+            cache_stamp=ImportStamp.latest_timestamp,
+        )
@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import logging
 import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import cache
 from pathlib import Path
-from typing import Collection, Iterable, Optional, Protocol
+from typing import Callable, Collection, Hashable, Iterable, Optional, Protocol
 
 from django.conf import settings
 
 from morphodict.paradigm.panes import Paradigm, ParadigmLayout, translation_string_re
-from morphodict.phrase_translate.to_target import inflect_target_language_phrase
+from morphodict.phrase_translate.to_target import inflect_target_language_phrases
 
 # I would *like* a singleton for this, but, currently, it interacts poorly with mypy :/
 ONLY_SIZE = "<only-size>"
@@ -23,21 +26,51 @@ class ParadigmDoesNotExistError(Exception):
     """
 
 
+@dataclass
+class ParadigmCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
 class ParadigmManager:
     """
     Mediates access to paradigms layouts.
 
     Loads layouts from the filesystem and can fill the layout with results from a
     (normative/strict) generator FST.
+
+    The most recently filled paradigms are cached, up to cache_size of them.
+    Every call to cache_stamp(), if given, returns a value that changes when
+    cached paradigms may have gone stale, e.g., the time of the last import.
     """
 
     # Mappings of paradigm name => sizes available => the layout
     _name_to_layout: dict[str, dict[str, ParadigmLayout]]
 
-    def __init__(self, layout_directory: Path, generation_fst: Transducer):
+    def __init__(
+        self,
+        layout_directory: Path,
+        generation_fst: Transducer,
+        *,
+        cache_size: int = 0,
+        cache_stamp: Optional[Callable[[], Hashable]] = None,
+    ):
+        if cache_size < 0:
+            raise ValueError(f"cache size must not be negative, not {cache_size}")
         self._generator = generation_fst
         self._name_to_layout = {}
 
+        self._cache_size = cache_size
+        self._cache_stamp = cache_stamp
+        self._stamp: Hashable = None
+        self._paradigms: OrderedDict[tuple, Paradigm] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
         self._load_layouts_from(layout_directory)
 
     def paradigm_for(
@@ -46,10 +79,16 @@ class ParadigmManager:
         lemma: Optional[str],
         translation_templates: dict[str, str],
         size: Optional[str] = None,
+        *,
+        morphemes: bool = False,
     ) -> Paradigm:
         """
         Returns a paradigm for the given paradigm name. If a lemma is given, this is
-        substituted into the dynamic paradigm.
+        substituted into the dynamic paradigm. If morphemes is true, its wordforms
+        are segmented into morphemes too; only ask for that when they are shown.
+
+        The paradigm returned is the caller’s own: it may add recordings to it.
+        Its panes, however, are shared with the cache, and must not be modified.
 
         :raises ParadigmDoesNotExistError: when the paradigm name cannot be found.
         """
@@ -61,10 +100,59 @@ class ParadigmManager:
             raise ParadigmDoesNotExistError(f"size {size!r} for {paradigm_name}")
         layout = layout_sizes[size]
 
-        if lemma is not None:
-            return self._inflect(layout, lemma, translation_templates)
-        else:
-            return layout.as_static_paradigm()
+        key = (
+            paradigm_name,
+            lemma,
+            size,
+            frozenset(translation_templates.items()),
+            morphemes,
+        )
+        if (paradigm := self._cached_paradigm(key)) is None:
+            if lemma is not None:
+                paradigm = self._inflect(layout, lemma, translation_templates)
+            else:
+                paradigm = layout.as_static_paradigm()
+            if morphemes:
+                paradigm.add_morphemes(lemma)
+            self._cache_paradigm(key, paradigm)
+        return paradigm.copy()
+
+    def _cached_paradigm(self, key: tuple) -> Optional[Paradigm]:
+        stamp = self._cache_stamp() if self._cache_stamp else None
+        with self._lock:
+            if stamp != self._stamp:
+                self._paradigms.clear()
+                self._stamp = stamp
+            paradigm = self._paradigms.get(key)
+            if paradigm is not None:
+                self._paradigms.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+            return paradigm
+
+    def _cache_paradigm(self, key: tuple, paradigm: Paradigm):
+        if not self._cache_size:
+            return
+        with self._lock:
+            self._paradigms[key] = paradigm
+            self._paradigms.move_to_end(key)
+            while len(self._paradigms) > self._cache_size:
+                self._paradigms.popitem(last=False)
+                self._evictions += 1
+
+    def clear_cache(self):
+        with self._lock:
+            self._paradigms.clear()
+
+    def cache_stats(self) -> ParadigmCacheStats:
+        with self._lock:
+            return ParadigmCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._paradigms),
+            )
 
     def sizes_of(self, paradigm_name: str) -> Collection[str]:
         """
@@ -168,19 +256,31 @@ class ParadigmManager:
             data.update(layout.generate_translation_templates(translation_templates))
         return bulk_inflect_target_language_phrases(data)
 
+    def translation_plan(
+        self, paradigm_name, translation_templates
+    ) -> dict[str, dict[str, set[str]]]:
+        """
+        Returns {tags: {template name: translations}} for every translation
+        template of the paradigm that produced translations.
+
+        The phrase FST runs once for the whole paradigm, so callers working
+        through every form of a lemma should get its plan once, and consult it
+        for each form.
+        """
+        plan: dict[str, dict[str, set[str]]] = {}
+        for key, translations in self.all_translations(
+            paradigm_name, translation_templates
+        ).items():
+            if match := translation_string_re.match(key):
+                plan.setdefault(match["tags"], {})[match["name"]] = translations
+        return plan
+
     def translation_templates_used_for_tags(
         self, paradigm_name, translation_templates, tags
     ) -> set[str]:
-        candidates = [
-            translation_string_re.match(key)
-            for key in self.all_translations(
-                paradigm_name, translation_templates
-            ).keys()
-            if translation_string_re.match(key)
-        ]
-
-        successfull_candidates = [x.groupdict() for x in candidates if x]
-        return {x["name"] for x in successfull_candidates if tags == x["tags"]}
+        return set(
+            self.translation_plan(paradigm_name, translation_templates).get(tags, ())
+        )
 
     def _inflect(
         self, layout: ParadigmLayout, lemma: str, translation_templates: dict[str, str]
@@ -233,8 +333,9 @@ class ParadigmManagerWithExplicitSizes(ParadigmManager):
         generation_fst: Transducer,
         *,
         ordered_sizes: list[str],
+        **kwargs,
     ):
-        super().__init__(layout_directory, generation_fst)
+        super().__init__(layout_directory, generation_fst, **kwargs)
         self._size_to_order = {
             element: index for index, element in enumerate(ordered_sizes)
         }
@@ -322,15 +423,13 @@ class Transducer(Protocol):
 def bulk_inflect_target_language_phrases(
     collection: Iterable[tuple[str, str, str]],
 ) -> dict[str, set[str]]:
-    candidates = [
-        (
-            (name, tags),
-            inflect_target_language_phrase(
-                ((), "", (f"+{tag}" for tag in tags.split("+") if tag)), phrase
-            ),
-        )
+    collection = list(collection)
+    inflected = inflect_target_language_phrases(
+        (((), "", tuple(f"+{tag}" for tag in tags.split("+") if tag)), phrase)
         for (name, phrase, tags) in collection
-    ]
+    )
     return {
-        f"T({name},{tags})": {value} for ((name, tags), value) in candidates if value
+        f"T({name},{tags})": {value}
+        for ((name, phrase, tags), value) in zip(collection, inflected)
+        if value
     }
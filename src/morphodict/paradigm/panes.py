@@ -14,7 +14,7 @@ from typing import Collection, Iterable, Mapping, Optional, Sequence, TextIO
 
 from more_itertools import ilen, one
 
-from morphodict.analysis import rich_analyze_strict
+from morphodict.analysis import bulk_segment_analyses, rich_analyze_strict
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +75,47 @@ class Paradigm:
         """
         return any(pane.contains_translation(translation) for pane in self.panes)
 
+    def copy(self) -> Paradigm:
+        """
+        Returns a paradigm with the same panes, but its own recordings.
+        """
+        paradigm = Paradigm(self._panes)
+        paradigm.recordings = set(self.recordings)
+        paradigm.speechdb_sources = list(self.speechdb_sources)
+        return paradigm
+
+    def add_morphemes(self, lemma: Optional[str] = None):
+        """
+        Segments the wordforms of all cells into morphemes, for display.
+
+        Cells filled from an inflection template have their analysis substituted
+        with the given lemma; the others, e.g., those of static paradigms, are
+        analyzed. All cells are then segmented with a single bulk lookup.
+        """
+        cell_analyses = []
+        for pane in self.panes:
+            for row in pane.tr_rows:
+                if row.is_header:
+                    continue
+                for cell in row.cells:
+                    if not isinstance(cell, WordformCell) or cell.is_translation:
+                        continue
+                    if lemma is not None and cell.analysis_template is not None:
+                        analysis = string.Template(cell.analysis_template).substitute(
+                            lemma=lemma
+                        )
+                    elif analyses := rich_analyze_strict(cell.inflection):
+                        analysis = analyses[0].smushed()
+                    else:
+                        continue
+                    cell_analyses.append((cell, analysis))
+
+        segmented = bulk_segment_analyses(
+            (analysis, cell.inflection) for cell, analysis in cell_analyses
+        )
+        for cell, analysis in cell_analyses:
+            cell.morphemes = segmented[analysis, cell.inflection]
+
     def add_recordings(self, recordings: list[str]):
         self.recordings.update(recordings)
 
@@ -603,12 +644,14 @@ class WordformCell(Cell):
 
     is_inflection = True
 
-    def __init__(self, inflection: str):
+    def __init__(self, inflection: str, analysis_template: Optional[str] = None):
         self.inflection = inflection
+        # The template this cell was filled from, e.g., ${lemma}+N+Sg, if any
+        self.analysis_template = analysis_template
         self.recording = None
         self.recording_speaker = None
-        self.morphemes = None
-        self.add_morphemes()
+        # Filled in by Paradigm.add_morphemes()
+        self.morphemes: Optional[list[str]] = None
 
     def contains_wordform(self, wordform: str) -> bool:
         return self.inflection == wordform
@@ -620,12 +663,6 @@ class WordformCell(Cell):
         self.recording = recording_object["recording_url"]
         self.recording_speaker = recording_object["speaker"]
 
-    def add_morphemes(self):
-        analysis = rich_analyze_strict(self.inflection)
-        if analysis:
-            analysis = analysis[0]
-            self.morphemes = analysis.generate_with_morphemes(self.inflection)
-
     def fill(self, forms: Mapping[str, Collection[str]]) -> tuple[Cell, ...]:
         # No need to fill a cell that already has contents!
         return (self,)
@@ -710,7 +747,7 @@ class InflectionTemplate(Cell):
             # See: https://en.wikipedia.org/wiki/Accidental_gap#Morphological_gaps
             return (MissingForm(),)
 
-        return tuple(WordformCell(form) for form in cell_forms)
+        return tuple(WordformCell(form, self.analysis_template) for form in cell_forms)
 
 
 class TranslationCell(WordformCell):
@@ -720,9 +757,6 @@ class TranslationCell(WordformCell):
 
     is_translation = True
 
-    def add_morphemes(self):
-        pass
-
     def contains_wordform(self, wordform: str) -> bool:
         return False
 
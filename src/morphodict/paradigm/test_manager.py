@@ -7,6 +7,7 @@ from typing import Iterable
 import pytest
 from more_itertools import first
 
+import morphodict.paradigm.manager
 from morphodict.paradigm.manager import (
     ONLY_SIZE,
     ParadigmDoesNotExistError,
@@ -132,6 +133,67 @@ def test_paradigm_for_raises_does_not_exist_error(paradigm_manager: ParadigmMana
     assert bad_paradigm_name in str(error)
 
 
+def test_filled_paradigms_are_cached(coffee_layout_dir):
+    transducer = CountingTransducer()
+    manager = ParadigmManager(coffee_layout_dir, transducer, cache_size=10)
+
+    first = manager.paradigm_for("has-only-one-size", "bagel", {})
+    second = manager.paradigm_for("has-only-one-size", "bagel", {})
+    manager.paradigm_for("has-only-one-size", "bun", {})
+
+    assert transducer.calls == 2
+    assert second.contains_wordform("buttered bagel")
+    stats = manager.cache_stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 2, 2)
+
+    # Each caller gets a paradigm of its own to add recordings to
+    first.add_recordings(["bagel"])
+    assert second.recordings == set()
+
+
+def test_paradigm_cache_is_cleared_when_stamp_changes(coffee_layout_dir):
+    transducer = CountingTransducer()
+    stamp = 1
+    manager = ParadigmManager(
+        coffee_layout_dir, transducer, cache_size=10, cache_stamp=lambda: stamp
+    )
+
+    manager.paradigm_for("has-only-one-size", "bagel", {})
+    manager.paradigm_for("has-only-one-size", "bagel", {})
+    stamp = 2
+    manager.paradigm_for("has-only-one-size", "bagel", {})
+
+    assert transducer.calls == 2
+
+
+def test_translation_plan(tmp_path, identity_transducer, monkeypatch):
+    (tmp_path / "translated.tsv").write_text(
+        "_ Sg\tT(noun,N+Sg)\tT(noun,N+Pl)\n_ Verb\tT(verb,N+Sg)\tT(missing,V)\n"
+    )
+    calls = []
+
+    def inflect(requests):
+        requests = list(requests)
+        calls.append(requests)
+        return [
+            f"{phrase}{''.join(tags[2])}" if phrase else None
+            for tags, phrase in requests
+        ]
+
+    monkeypatch.setattr(
+        morphodict.paradigm.manager, "inflect_target_language_phrases", inflect
+    )
+    manager = ParadigmManager(tmp_path, identity_transducer)
+
+    plan = manager.translation_plan("translated", {"noun": "dog", "verb": "bark"})
+
+    assert plan == {
+        "N+Sg": {"noun": {"dog+N+Sg"}, "verb": {"bark+N+Sg"}},
+        "N+Pl": {"noun": {"dog+N+Pl"}},
+    }
+    assert len(calls) == 1
+
+
 @pytest.fixture
 def paradigm_manager(coffee_layout_dir: Path, identity_transducer):
     return ParadigmManager(coffee_layout_dir, identity_transducer)
@@ -178,6 +240,17 @@ class IdentityTransducer(Transducer):
         return analysis
 
 
+class CountingTransducer(IdentityTransducer):
+    """Counts calls to .bulk_lookup()"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def bulk_lookup(self, strings: Iterable[str]) -> dict[str, set[str]]:
+        self.calls += 1
+        return super().bulk_lookup(strings)
+
+
 def distinct_permutation(sequence):
     """
     Returns a permutation of the given sequence that is guaranteed to not be the same
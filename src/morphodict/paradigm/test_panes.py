@@ -5,11 +5,13 @@ Unit tests for the paradigm pane module.
 import pytest
 from more_itertools import first, ilen, last, one
 
+import morphodict.paradigm.panes
 from morphodict.paradigm.panes import (
     CompoundRow,
     EmptyCell,
     MissingForm,
     Pane,
+    Paradigm,
     RowLabel,
     SuppressOutputCell,
     WordformCell,
@@ -48,6 +50,33 @@ def test_compound_rows():
     assert last_form.inflection == multiple_forms[-1]
 
 
+def test_add_morphemes_uses_the_known_analyses(monkeypatch):
+    requests = []
+
+    def segment(pairs):
+        pairs = set(pairs)
+        requests.append(pairs)
+        return {(analysis, form): form.split("-") for analysis, form in pairs}
+
+    monkeypatch.setattr(morphodict.paradigm.panes, "bulk_segment_analyses", segment)
+    monkeypatch.setattr(
+        morphodict.paradigm.panes,
+        "rich_analyze_strict",
+        lambda text: pytest.fail(f"{text!r} should not need analyzing"),
+    )
+
+    pane = Pane.parse("_ Tag\t${lemma}+N+Sg\n")
+    paradigm = Paradigm([pane.fill({"${lemma}+N+Sg": ("form", "longer-form")})])
+    paradigm.add_morphemes("x")
+
+    assert requests == [{("x+N+Sg", "form"), ("x+N+Sg", "longer-form")}]
+    cells = [cell for row in one(paradigm.panes).tr_rows for cell in row.cells]
+    assert [c.morphemes for c in cells if isinstance(c, WordformCell)] == [
+        ["form"],
+        ["longer", "form"],
+    ]
+
+
 def test_pane_iterate_tr_rows():
     pane = Pane.parse("_ Tag\t${lemma}\n")
     multiple_forms = ("form", "longer-form")
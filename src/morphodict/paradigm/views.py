@@ -53,8 +53,11 @@ def paradigm_internal(request):
         return HttpResponseNotFound("specified lemma-id is not found in the database")
     # end guards
 
+    show_morphemes = request.COOKIES.get("show_morphemes")
     try:
-        paradigm = paradigm_for(lemma, paradigm_size)
+        paradigm = paradigm_for(
+            lemma, paradigm_size, morphemes=shows_paradigm_morphemes(show_morphemes)
+        )
         paradigm = get_recordings_from_paradigm(paradigm, **recordings_info(request))
     except ParadigmDoesNotExistError:
         return HttpResponseBadRequest("paradigm does not exist")
@@ -65,7 +68,7 @@ def paradigm_internal(request):
             "lemma": lemma,
             "paradigm_size": paradigm_size,
             "paradigm": paradigm,
-            "show_morphemes": request.COOKIES.get("show_morphemes"),
+            "show_morphemes": show_morphemes,
         },
     )
 
@@ -95,7 +98,15 @@ def paradigm_for_lemma(request):
     manager = default_paradigm_manager()
 
     try:
-        if not (paradigm := manager.paradigm_for(layout, lemma, {}, paradigm_size)):
+        if not (
+            paradigm := manager.paradigm_for(
+                layout,
+                lemma,
+                {},
+                paradigm_size,
+                morphemes=shows_paradigm_morphemes(show_morphemes),
+            )
+        ):
             return HttpResponseBadRequest("paradigm does not exist")
     except ParadigmDoesNotExistError:
         return HttpResponseBadRequest("paradigm does not exist")
@@ -137,7 +148,15 @@ def json_paradigm_for_lemma(request):
     manager = default_paradigm_manager()
 
     try:
-        if not (paradigm := manager.paradigm_for(layout, lemma, paradigm_size)):
+        if not (
+            paradigm := manager.paradigm_for(
+                layout,
+                lemma,
+                {},
+                paradigm_size,
+                morphemes=shows_paradigm_morphemes(show_morphemes),
+            )
+        ):
             return HttpResponseBadRequest("paradigm does not exist")
     except ParadigmDoesNotExistError:
         return HttpResponseBadRequest("paradigm does not exist")
@@ -204,9 +223,12 @@ def json_paradigm_for_lemma(request):
     return json_response
 
 
-def paradigm_for(wordform: Wordform, paradigm_size: str) -> Optional[Paradigm]:
+def paradigm_for(
+    wordform: Wordform, paradigm_size: str, *, morphemes: bool = False
+) -> Optional[Paradigm]:
     """
-    Returns a paradigm for the given wordform at the desired size.
+    Returns a paradigm for the given wordform at the desired size, segmented into
+    morphemes if asked to.
 
     If a paradigm cannot be found, None is returned
     """
@@ -226,6 +248,7 @@ def paradigm_for(wordform: Wordform, paradigm_size: str) -> Optional[Paradigm]:
             fst_lemma,
             wordform.extract_translation_templates(),
             paradigm_size,
+            morphemes=morphemes,
         ):
             return paradigm
         logger.warning(
@@ -257,7 +280,14 @@ def paradigm_context_for_lemma(lemma: Wordform, request) -> dict[str, Any]:
                 size = default_size
 
         paradigm = get_recordings_from_paradigm(
-            paradigm_for(lemma, size), **recordings_info(request)
+            paradigm_for(
+                lemma,
+                size,
+                morphemes=shows_paradigm_morphemes(
+                    request.COOKIES.get("show_morphemes")
+                ),
+            ),
+            **recordings_info(request),
         )
 
         return {"paradigm": paradigm, "paradigm_size": size, "paradigm_sizes": sizes}
@@ -265,6 +295,18 @@ def paradigm_context_for_lemma(lemma: Wordform, request) -> dict[str, Any]:
     return {}
 
 
+def shows_paradigm_morphemes(show_morphemes: Optional[str]) -> bool:
+    """
+    Whether paradigm tables show morpheme boundaries with this preference.
+
+    >>> shows_paradigm_morphemes("paradigm")
+    True
+    >>> shows_paradigm_morphemes("headers")
+    False
+    """
+    return show_morphemes in ("everywhere", "paradigm")
+
+
 def recordings_info(request) -> dict:
     if source := request.COOKIES.get("audio_source"):
         if source != "both":
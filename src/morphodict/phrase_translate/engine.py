@@ -0,0 +1,166 @@
+"""
+Cached, batched phrase translation
+
+Applying the phrase FSTs is expensive, and the same (tags, definition) pairs
+come up again and again: every rendering of a paradigm inflects the same
+translation templates, and ESPT and WordNet searches inflect the same
+definitions for popular queries. PhraseTranslationEngine remembers recent
+results in a bounded LRU cache, and its batch API looks up each distinct
+pair only once.
+
+It also times the FSTs, so that their cost can be monitored.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from morphodict.analysis.tag_map import UnknownTagError
+from morphodict.phrase_translate.fst import FomaLookupException
+
+# Failures that are a property of the input, so that looking the same input up
+# again would fail again. Their types and arguments are cached, and a new error
+# is raised on every hit.
+DETERMINISTIC_ERRORS = (FomaLookupException, UnknownTagError)
+
+PhraseKey = tuple[tuple[str, ...], str, bool, tuple]
+CachedError = tuple[type[Exception], tuple]
+
+
+@dataclass
+class FstTimings:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class PhraseCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    fst_timings: dict[str, FstTimings]
+
+
+class PhraseTranslationEngine:
+    def __init__(
+        self,
+        inflect: Callable[[tuple[str, ...], str, bool, dict], Optional[str]],
+        maxsize: int,
+    ):
+        """
+        Cache the results of inflect(tags, definition, use_fst, extra_args)
+
+        Up to maxsize results are kept; 0 turns caching off.
+        """
+        if maxsize < 0:
+            raise ValueError(f"cache size must not be negative, not {maxsize}")
+        self._inflect = inflect
+        self._maxsize = maxsize
+        # Values are (result, error), exactly one of which is set
+        self._entries: OrderedDict[
+            PhraseKey, tuple[Optional[str], Optional[CachedError]]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._timings: dict[str, FstTimings] = {}
+
+    def inflect(
+        self,
+        tags: tuple[str, ...],
+        definition: str,
+        use_fst: bool,
+        extra_args: Optional[dict] = None,
+    ) -> Optional[str]:
+        extra_args = extra_args or {}
+        key = (tags, definition, use_fst, tuple(sorted(extra_args.items())))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        if entry is None:
+            try:
+                result = self._inflect(tags, definition, use_fst, extra_args)
+            except DETERMINISTIC_ERRORS as e:
+                self._store(key, (None, (type(e), e.args)))
+                raise
+            self._store(key, (result, None))
+            return result
+
+        result, error = entry
+        if error is not None:
+            error_type, args = error
+            # Raising the same instance again would add to its traceback each
+            # time. __init__() is skipped, as subclasses like
+            # FomaLookupNotFoundException format their arguments into args.
+            raise error_type.__new__(error_type, *args)
+        return result
+
+    def bulk_inflect(
+        self,
+        requests: Iterable[tuple[tuple[str, ...], str]],
+        use_fst: bool,
+        extra_args: Optional[dict] = None,
+    ) -> dict[tuple[tuple[str, ...], str], Optional[str]]:
+        """
+        Inflect every (tags, definition) pair, looking up duplicates once
+
+        Raises the first error in the order of requests, as calling inflect()
+        on each of them would.
+        """
+        return {
+            request: self.inflect(*request, use_fst, extra_args)
+            for request in dict.fromkeys(requests)
+        }
+
+    def _store(self, key, entry):
+        if not self._maxsize:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    @contextmanager
+    def timed(self, fst_name: str):
+        """Count the time spent in the block as a call to the named FST"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                timings = self._timings.setdefault(fst_name, FstTimings())
+                timings.calls += 1
+                timings.seconds += elapsed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> PhraseCacheStats:
+        with self._lock:
+            return PhraseCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                fst_timings={
+                    name: FstTimings(t.calls, t.seconds)
+                    for name, t in self._timings.items()
+                },
+            )
@@ -0,0 +1,79 @@
+import traceback
+from collections import Counter
+
+import pytest
+
+from morphodict.phrase_translate.engine import PhraseTranslationEngine
+from morphodict.phrase_translate.fst import FomaLookupNotFoundException
+
+
+class FakeInflector:
+    """Upper-cases definitions, failing on ‘???’, counting calls"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.engine = None
+
+    def __call__(self, tags, definition, use_fst, extra_args):
+        self.calls[(tags, definition)] += 1
+        with self.engine.timed("fake-fst"):
+            if definition == "???":
+                raise FomaLookupNotFoundException(definition)
+            return " ".join(tags) + " " + definition.upper()
+
+
+@pytest.fixture
+def inflector():
+    inflector = FakeInflector()
+    inflector.engine = PhraseTranslationEngine(inflector, maxsize=10)
+    return inflector
+
+
+def test_repeated_phrases_are_cached(inflector):
+    engine = inflector.engine
+
+    assert engine.inflect(("+Pl",), "dog", True) == "+Pl DOG"
+    assert engine.inflect(("+Pl",), "dog", True) == "+Pl DOG"
+    assert engine.inflect(("+Sg",), "dog", True) == "+Sg DOG"
+
+    assert inflector.calls == {(("+Pl",), "dog"): 1, (("+Sg",), "dog"): 1}
+    stats = engine.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 2, 2)
+    assert stats.fst_timings["fake-fst"].calls == 2
+
+
+def test_bulk_inflect_deduplicates(inflector):
+    requests = [(("+Pl",), "dog"), (("+Pl",), "cat"), (("+Pl",), "dog")]
+
+    assert inflector.engine.bulk_inflect(requests, True) == {
+        (("+Pl",), "dog"): "+Pl DOG",
+        (("+Pl",), "cat"): "+Pl CAT",
+    }
+    assert inflector.calls == {(("+Pl",), "dog"): 1, (("+Pl",), "cat"): 1}
+
+
+def test_failures_are_cached(inflector):
+    errors = []
+    for _ in range(3):
+        with pytest.raises(FomaLookupNotFoundException) as exc_info:
+            inflector.engine.inflect(("+Pl",), "???", True)
+        errors.append(exc_info.value)
+    assert inflector.calls[(("+Pl",), "???")] == 1
+
+    # Each hit raises a new error with the same message, so that tracebacks
+    # do not pile up on a single cached instance
+    assert len({id(e) for e in errors}) == 3
+    assert {str(e) for e in errors} == {"'???' not found in FST"}
+    assert len(traceback.extract_tb(errors[1].__traceback__)) == len(
+        traceback.extract_tb(errors[2].__traceback__)
+    )
+
+
+def test_options_are_part_of_the_key(inflector):
+    engine = inflector.engine
+
+    engine.inflect(("+V",), "ask", False, {"adjust_tense": "event"})
+    engine.inflect(("+V",), "ask", False, {"adjust_tense": "state"})
+    engine.inflect(("+V",), "ask", True)
+
+    assert inflector.calls[(("+V",), "ask")] == 3
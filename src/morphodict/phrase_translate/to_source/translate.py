@@ -12,7 +12,7 @@ from argparse import (
 )
 from argparse import BooleanOptionalAction
 from collections import Counter
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, fields
 from pathlib import Path
 from typing import Iterable
 
@@ -102,6 +102,16 @@ class TranslationStats:
 
         return "\n".join(ret)
 
+    def merge(self, other: TranslationStats):
+        """Add the counts of other, e.g., from another process, to these"""
+        for f in fields(self):
+            if f.name == "unknown_tags_during_auto_translation":
+                self.unknown_tags_during_auto_translation.update(
+                    other.unknown_tags_during_auto_translation
+                )
+            else:
+                setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
 
 def translate_single_definition(
     inflected_wordform, lemma_definition, stats: TranslationStats
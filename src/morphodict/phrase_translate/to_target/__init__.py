@@ -12,6 +12,7 @@ from morphodict.phrase_translate.fst import (
     inflect_target_noun_phrase,
     inflect_target_verb_phrase,
 )
+from morphodict.phrase_translate.engine import PhraseTranslationEngine
 from morphodict.phrase_translate.tpt import tsuutina_inflect_target_phrase
 
 logger = logging.getLogger(__name__)
@@ -25,28 +26,77 @@ def inflect_target_language_phrase(
 ) -> str | None:
     if isinstance(analysis, tuple):
         analysis = RichAnalysis(analysis)
-    wordform_tag_list = (
-        analysis.prefix_tags
-        + analysis.suffix_tags
-        + settings.DEFAULT_TARGET_LANGUAGE_PHRASE_TAGS
+    if use_fst is None:
+        use_fst = settings.USE_FST_PHRASE_TRANSLATE
+
+    return engine.inflect(
+        _wordform_tags(analysis), lemma_definition, use_fst, extra_args
     )
+
+
+def inflect_target_language_phrases(
+    requests: Iterable[tuple[tuple | RichAnalysis, str]],
+    use_fst: bool | None = None,
+    extra_args: dict = {},
+) -> list[str | None]:
+    """
+    Call inflect_target_language_phrase() on every (analysis, lemma_definition)
+    pair, applying the FSTs only once for each distinct input
+
+    Results are in the same order as the requests.
+    """
     if use_fst is None:
         use_fst = settings.USE_FST_PHRASE_TRANSLATE
 
-    if not use_fst:
-        phrase = tsuutina_inflect_target_phrase(
-            wordform_tag_list, lemma_definition, extra_args
+    keys = [
+        (
+            _wordform_tags(
+                RichAnalysis(analysis) if isinstance(analysis, tuple) else analysis
+            ),
+            definition,
         )
+        for analysis, definition in requests
+    ]
+    inflected = engine.bulk_inflect(keys, use_fst, extra_args)
+    return [inflected[key] for key in keys]
+
+
+def _wordform_tags(analysis: RichAnalysis) -> tuple[str, ...]:
+    return tuple(
+        analysis.prefix_tags
+        + analysis.suffix_tags
+        + tuple(settings.DEFAULT_TARGET_LANGUAGE_PHRASE_TAGS or ())
+    )
+
+
+def _inflect_uncached(
+    wordform_tag_list: tuple[str, ...],
+    lemma_definition: str,
+    use_fst: bool,
+    extra_args: dict,
+) -> str | None:
+    if not use_fst:
+        with engine.timed("tsuutina_english_generator"):
+            phrase = tsuutina_inflect_target_phrase(
+                list(wordform_tag_list), lemma_definition, extra_args
+            )
         return phrase.strip()
 
     if "+N" in wordform_tag_list:
-        tags_for_phrase = noun_wordform_to_phrase.map_tags(wordform_tag_list)
-        phrase = inflect_target_noun_phrase(tags_for_phrase, lemma_definition)
+        tags_for_phrase = noun_wordform_to_phrase.map_tags(list(wordform_tag_list))
+        with engine.timed("eng_noun_entry2inflected-phrase"):
+            phrase = inflect_target_noun_phrase(tags_for_phrase, lemma_definition)
         return phrase.strip()
 
     elif "+V" in wordform_tag_list:
-        tags_for_phrase = verb_wordform_to_phrase.map_tags(wordform_tag_list)
-        phrase = inflect_target_verb_phrase(tags_for_phrase, lemma_definition)
+        tags_for_phrase = verb_wordform_to_phrase.map_tags(list(wordform_tag_list))
+        with engine.timed("eng_verb_entry2inflected-phrase"):
+            phrase = inflect_target_verb_phrase(tags_for_phrase, lemma_definition)
         return phrase.strip()
 
     return None
+
+
+engine = PhraseTranslationEngine(
+    _inflect_uncached, getattr(settings, "MORPHODICT_PHRASE_CACHE_SIZE", 10_000)
+)
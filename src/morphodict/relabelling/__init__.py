@@ -123,6 +123,16 @@ class _RelabelFetcher:
         """
         return self._data.get((key,), {}).get(self._friendliness, default)
 
+    def labels(self) -> list[Label]:
+        """
+        Return every label of this friendliness, for any tags.
+        """
+        return [
+            label
+            for entry in self._data.values()
+            if (label := entry[self._friendliness]) is not None
+        ]
+
     def get_longest(self, tags: Iterable[FSTTag]) -> Optional[Label]:
         """
         Get a relabelling for the longest prefix of the given tags.
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from .runner import is_almost_certainly_cree, search, wordnet_search as wordnet_runner
 from .core import SearchResults, Result
 from .presentation import SerializedPresentationResult
@@ -25,12 +27,18 @@ def search_with_affixes(
 
 
 def api_search(
-    query: str, include_auto_definitions=False, inflect_english_phrases=False
+    query: str,
+    include_auto_definitions=False,
+    inflect_english_phrases=False,
+    limit: Optional[int] = None,
+    offset: int = 0,
 ) -> list[SerializedPresentationResult]:
     """
     Search, trying to match full wordforms or keywords within definitions.
 
     Does NOT try to match affixes!
+
+    Pass limit and offset to get only one page of the results.
     """
 
     return search(
@@ -38,7 +46,7 @@ def api_search(
         include_affixes=False,
         include_auto_definitions=include_auto_definitions,
         inflect_english_phrases=inflect_english_phrases,
-    ).serialized_presentation_results()
+    ).serialized_presentation_results(limit=limit, offset=offset)
 
 
 def wordnet_search(query: str) -> list[tuple[WordnetEntry, str, SearchResults]] | None:
@@ -11,15 +11,16 @@ also returns results for ‘snowmobile’
 
 from collections import defaultdict
 from functools import cached_property
-from itertools import chain
-from typing import Dict, Iterable, List, NewType, Tuple
+from typing import Dict, Iterable, List, NewType, Optional, Tuple
 
 import dawg
 from django.conf import settings
 
 from morphodict.lexicon.models import Wordform, TargetLanguageKeyword
-from morphodict.utils import get_modified_distance
-from morphodict.utils.cree_lev_dist import remove_cree_diacritics
+from morphodict.utils.cree_lev_dist import (
+    get_modified_distances,
+    remove_cree_diacritics,
+)
 from morphodict.lexicon.util import to_source_language_keyword
 from .types import (
     InternalForm,
@@ -30,10 +31,25 @@ from . import core
 # A simplified form intended to be used within the affix search trie.
 SimplifiedForm = NewType("SimplifiedForm", str)
 
+# Older SQLite versions allow at most 999 parameters in a query
+AFFIX_FETCH_CHUNK_SIZE = 500
+
+
+# Keys in the tries start with a character encoding the length of the word,
+# so that completions can be enumerated shortest first.
+_LENGTH_MARKER_BASE = 0x100
+
+
+def _length_keyed(text: SimplifiedForm) -> str:
+    return chr(_LENGTH_MARKER_BASE + len(text)) + text
+
 
 class AffixSearcher:
     """
     Enables prefix and suffix searches given a list of words and their wordform IDs.
+
+    Matches are returned shortest completion first, so when a search is
+    capped with a limit, the closest matches are the ones that are kept.
     """
 
     def __init__(self, words: Iterable[Tuple[str, int]]):
@@ -48,31 +64,42 @@ class AffixSearcher:
         for text, wordform_id in words_marked_for_indexing:
             self.text_to_ids[self.to_simplified_form(text)].append(wordform_id)
 
+        self._max_length = max(
+            (len(text) for text, _ in words_marked_for_indexing), default=0
+        )
+
         if settings.MORPHODICT_ENABLE_AFFIX_SEARCH:
             self._prefixes = dawg.CompletionDAWG(
-                [text for text, _ in words_marked_for_indexing]
+                [_length_keyed(text) for text, _ in words_marked_for_indexing]
             )
             self._suffixes = dawg.CompletionDAWG(
-                [_reverse(text) for text, _ in words_marked_for_indexing]
+                [_length_keyed(_reverse(text)) for text, _ in words_marked_for_indexing]
             )
 
-    def search_by_prefix(self, prefix: str) -> Iterable[int]:
+    def search_by_prefix(self, prefix: str, limit: Optional[int] = None) -> List[int]:
         """
-        :return: an iterable of Wordform IDs that match the prefix
+        :return: up to limit Wordform IDs that match the prefix, best first
         """
         term = self.to_simplified_form(prefix)
-        matched_words = self._prefixes.keys(term)
-        return chain.from_iterable(self.text_to_ids[t] for t in matched_words)
+        return self._search(self._prefixes, term, limit, _identity)
 
-    def search_by_suffix(self, suffix: str) -> Iterable[int]:
+    def search_by_suffix(self, suffix: str, limit: Optional[int] = None) -> List[int]:
         """
-        :return: an iterable of Wordform IDs that match the suffix
+        :return: up to limit Wordform IDs that match the suffix, best first
         """
         term = self.to_simplified_form(suffix)
-        matched_reversed_words = self._suffixes.keys(_reverse(term))
-        return chain.from_iterable(
-            self.text_to_ids[_reverse(t)] for t in matched_reversed_words
-        )
+        return self._search(self._suffixes, _reverse(term), limit, _reverse)
+
+    def _search(self, trie, term, limit, to_text) -> List[int]:
+        ids: List[int] = []
+        # One trie lookup per possible length, each of which only enumerates
+        # completions of exactly that length, until there are enough.
+        for length in range(len(term), self._max_length + 1):
+            for key in trie.iterkeys(chr(_LENGTH_MARKER_BASE + length) + term):
+                ids.extend(self.text_to_ids[to_text(key[1:])])
+                if limit is not None and len(ids) >= limit:
+                    return ids[:limit]
+        return ids
 
     @staticmethod
     def to_simplified_form(query: str) -> SimplifiedForm:
@@ -88,13 +115,35 @@ def _reverse(text: SimplifiedForm) -> SimplifiedForm:
     return SimplifiedForm(text[::-1])
 
 
-def do_affix_search(query: InternalForm, affixes: AffixSearcher) -> Iterable[Wordform]:
+def _identity(text: SimplifiedForm) -> SimplifiedForm:
+    return text
+
+
+def do_affix_search(query: InternalForm, affixes: AffixSearcher) -> List[Wordform]:
     """
     Augments the given set with results from performing both a suffix and prefix search on the wordforms.
+
+    At most settings.AFFIX_SEARCH_MAX_MATCHES wordforms are found in each
+    direction, preferring the shortest completions.
+    """
+    limit = settings.AFFIX_SEARCH_MAX_MATCHES
+    # dict, to remove duplicates while keeping the ranking order
+    matched_ids = dict.fromkeys(affixes.search_by_prefix(query, limit))
+    matched_ids.update(dict.fromkeys(affixes.search_by_suffix(query, limit)))
+    return fetch_wordforms_in_chunks(list(matched_ids))
+
+
+def fetch_wordforms_in_chunks(ids: List[int]) -> List[Wordform]:
+    """
+    Fetch wordforms by ID, in the order given
+
+    Keeps the number of query parameters bounded, whatever the number of IDs.
     """
-    matched_ids = set(affixes.search_by_prefix(query))
-    matched_ids |= set(affixes.search_by_suffix(query))
-    return Wordform.objects.filter(id__in=matched_ids)
+    by_id: Dict[int, Wordform] = {}
+    for start in range(0, len(ids), AFFIX_FETCH_CHUNK_SIZE):
+        chunk = ids[start : start + AFFIX_FETCH_CHUNK_SIZE]
+        by_id.update((wf.id, wf) for wf in Wordform.objects.filter(id__in=chunk))
+    return [by_id[i] for i in ids if i in by_id]
 
 
 def do_target_language_affix_search(
@@ -115,14 +164,15 @@ def do_source_language_affix_search(
         query.query_string,
         cache.source_language_affix_searcher,
     )
-    for word in matching_words:
+    distances = get_modified_distances(
+        [word.text for word in matching_words], query.query_string
+    )
+    for word, distance in zip(matching_words, distances):
         search_results.add_result(
             Result(
                 word,
                 source_language_affix_match=True,
-                query_wordform_edit_distance=get_modified_distance(
-                    word.text, query.query_string
-                ),
+                query_wordform_edit_distance=distance,
             )
         )
 
@@ -0,0 +1,31 @@
+from morphodict.search.affix import AffixSearcher
+
+WORDS = [
+    ("wâpamêw", 1),
+    ("wâpahtam", 2),
+    ("wâpiw", 3),
+    ("wâpamiwêw", 4),
+    ("asawâpamêw", 5),
+    ("wâpamêw", 6),
+    ("nipâw", 7),
+]
+
+
+def test_prefix_search_returns_shortest_completions_first():
+    searcher = AffixSearcher(WORDS)
+
+    assert searcher.search_by_prefix("wap") == [3, 1, 6, 2, 4]
+
+
+def test_suffix_search_returns_shortest_completions_first():
+    searcher = AffixSearcher(WORDS)
+
+    assert searcher.search_by_suffix("amew") == [1, 6, 5]
+
+
+def test_affix_search_is_capped():
+    searcher = AffixSearcher(WORDS)
+
+    assert searcher.search_by_prefix("wap", limit=2) == [3, 1]
+    assert searcher.search_by_prefix("wapamew", limit=1) == [1]
+    assert searcher.search_by_prefix("zzz", limit=2) == []
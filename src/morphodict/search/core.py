@@ -1,6 +1,6 @@
-from typing import Iterable, Callable, Any, Optional
-
-from django.db.models import prefetch_related_objects
+import heapq
+from itertools import count, islice
+from typing import Iterable, Iterator, Callable, Any, Optional
 
 from morphodict.paradigm.preferences import DisplayMode
 from crkeng.app.preferences import (
@@ -59,17 +59,48 @@ class SearchResults:
     def unsorted_results(self) -> Iterable[types.Result]:
         return self._results.values()
 
-    def sorted_results(self) -> list[types.Result]:
-        results = list(self._results.values())
-        for r in results:
-            r.assign_default_relevance_score()
+    def sorted_results(
+        self, limit: Optional[int] = None, offset: int = 0
+    ) -> list[types.Result]:
+        """
+        Return the results in ranked order.
 
-        # sort based on cvd
+        With a limit, only the page of results between offset and
+        offset + limit is selected, with a heap instead of a full sort.
+        """
+        if limit is None:
+            results = list(self._results.values())
+            for r in results:
+                r.assign_default_relevance_score()
+            results.sort(key=self._sort_key())
+            return results[offset:]
+
+        return list(islice(self._ranked(), offset, offset + limit))
+
+    def _sort_key(self) -> Callable[[Result], Any]:
         if self.sort_function is not None:
-            results.sort(key=self.sort_function)
-        else:
-            results.sort(key=lambda x: cvd(x), reverse=True)
-        return results
+            return self.sort_function
+        # Best first, the same as sorting by cvd with reverse=True.
+        return lambda r: -cvd(r)
+
+    def _ranked(self) -> Iterator[types.Result]:
+        """Lazily yield the results in ranked order
+
+        Building the heap is linear in the number of results, and every
+        result taken off it is logarithmic, so taking a small page from a
+        large result set is much cheaper than sorting everything.
+        """
+        key = self._sort_key()
+        # The counter keeps equal keys in insertion order, like the stable
+        # full sort does, and means Result objects are never compared.
+        tiebreak = count()
+        heap = []
+        for r in self._results.values():
+            r.assign_default_relevance_score()
+            heap.append((key(r), next(tiebreak), r))
+        heapq.heapify(heap)
+        while heap:
+            yield heapq.heappop(heap)[-1]
 
     def presentation_results(
         self,
@@ -77,21 +108,27 @@ class SearchResults:
         animate_emoji=AnimateEmoji.default,
         show_emoji=ShowEmoji.default,
         dict_source=None,
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> list[presentation.PresentationResult]:
-        results = self.sorted_results()
-        prefetch_related_objects(
-            [r.wordform for r in results if not r.wordform._state.adding],
-            "lemma__definitions__citations",
-            "definitions__citations",
+        return self._present(
+            self.sorted_results(limit=limit, offset=offset),
+            display_mode=display_mode,
+            animate_emoji=animate_emoji,
+            show_emoji=show_emoji,
+            dict_source=dict_source,
         )
+
+    def _present(
+        self, results: list[types.Result], **presentation_options
+    ) -> list[presentation.PresentationResult]:
+        batch = presentation.PresentationBatch.for_results(results)
         return [
             presentation.PresentationResult(
                 r,
                 search_results=self,
-                display_mode=display_mode,
-                animate_emoji=animate_emoji,
-                show_emoji=show_emoji,
-                dict_source=dict_source,
+                batch=batch,
+                **presentation_options,
             )
             for r in results
         ]
@@ -102,27 +139,42 @@ class SearchResults:
         animate_emoji=AnimateEmoji.default,
         show_emoji=ShowEmoji.default,
         dict_source=None,
+        limit: Optional[int] = None,
+        offset: int = 0,
     ):
-        results = self.presentation_results(
+        """
+        Serialize the results that have something to show.
+
+        Results without any definitions are dropped, and limit and offset
+        count only the results that are kept. With a limit, results are
+        presented in ranked batches until the page is full, so the work done
+        depends on the page, not on the total number of results.
+        """
+        presentation_options = dict(
             display_mode=display_mode,
             animate_emoji=animate_emoji,
             show_emoji=show_emoji,
             dict_source=dict_source,
         )
-        serialized = [r.serialize() for r in results]
-
-        def has_definition(r):
-            # does the entry itself have a definition?
-            if r["definitions"]:
-                return True
-            # is it a form of a word that has a definition?
-            if "lemma_wordform" in r:
-                if "definitions" in r["lemma_wordform"]:
-                    if r["lemma_wordform"]["definitions"]:
-                        return True
-            return False
 
-        return [r for r in serialized if has_definition(r)]
+        if limit is None:
+            serialized = [
+                r.serialize()
+                for r in self._present(self.sorted_results(), **presentation_options)
+            ]
+            return [r for r in serialized if has_definition(r)][offset:]
+
+        kept: list = []
+        ranked = self._ranked()
+        while len(kept) < offset + limit:
+            batch = list(islice(ranked, offset + limit - len(kept)))
+            if not batch:
+                break
+            for presented in self._present(batch, **presentation_options):
+                result = presented.serialize()
+                if has_definition(result):
+                    kept.append(result)
+        return kept[offset : offset + limit]
 
     def add_verbose_message(self, message: Optional[str] = None, **messages):
         """
@@ -155,5 +207,17 @@ class SearchResults:
         return f"SearchResults<query={self.query!r}>"
 
 
+def has_definition(r) -> bool:
+    # does the entry itself have a definition?
+    if r["definitions"]:
+        return True
+    # is it a form of a word that has a definition?
+    if "lemma_wordform" in r:
+        if "definitions" in r["lemma_wordform"]:
+            if r["lemma_wordform"]["definitions"]:
+                return True
+    return False
+
+
 def cvd(val):
     return val.relevance_score or 0.0
@@ -0,0 +1,45 @@
+import pytest
+
+from morphodict.lexicon.models import Wordform
+from morphodict.search.core import SearchResults
+from morphodict.search.types import Result
+
+
+def make_results(edit_distances):
+    search_results = SearchResults()
+    for i, distance in enumerate(edit_distances):
+        wf = Wordform(text=f"wordform{i}", is_lemma=True)
+        wf.lemma = wf
+        search_results.add_result(
+            Result(
+                wf,
+                source_language_match=wf.text,
+                query_wordform_edit_distance=distance,
+                morpheme_ranking=1,
+            )
+        )
+    return search_results
+
+
+@pytest.mark.parametrize(
+    ("limit", "offset"), [(1, 0), (3, 0), (3, 2), (4, 5), (100, 0), (2, 100)]
+)
+def test_paged_results_match_full_sort(limit, offset):
+    # includes ties, to check that paging keeps the full sort’s order for them
+    search_results = make_results([3, 1, 2, 1, 0, 2, 5, 1, 4])
+
+    everything = search_results.sorted_results()
+    page = search_results.sorted_results(limit=limit, offset=offset)
+
+    assert [r.wordform.text for r in page] == [
+        r.wordform.text for r in everything[offset : offset + limit]
+    ]
+
+
+def test_paging_uses_custom_sort_function():
+    search_results = make_results([3, 1, 2])
+    search_results.sort_function = lambda r: r.query_wordform_edit_distance
+
+    page = search_results.sorted_results(limit=2)
+
+    assert [r.query_wordform_edit_distance for r in page] == [1, 2]
@@ -1,10 +1,11 @@
-import itertools
 import logging
 
 from morphodict.search.core import SearchResults, Query
 from morphodict.search.types import Result
 from morphodict.cvd import (
+    closest_definitions,
     definition_vectors,
+    definition_wordform_ids,
     google_news_vectors,
     extract_keyed_words,
     vector_for_keys,
@@ -33,44 +34,74 @@ def do_cvd_search(query: Query, search_results: SearchResults):
     query_vector = vector_for_keys(google_news_vectors(), keys)
 
     try:
-        closest = definition_vectors().similar_by_vector(query_vector, 50)
+        closest = closest_definitions(query_vector, 50)
     except DefinitionVectorsNotFoundException:
         logger.exception("Definition Vectors Not Found")
         return
 
-    wordform_queries = [
-        cvd_key_to_wordform_query(similarity) for similarity, weight in closest
-    ]
-    similarities = [similarity for cvd_key, similarity in closest]
-
-    # Get all possible wordforms in one big query. We will select more than we
-    # need, then filter it down later, but this will have to do until we get
-    # better homonym handling.
-    wordform_results = Wordform.objects.filter(
-        text__in=set(wf["text"] for wf in wordform_queries)
-    )
-
-    # Now match back up
-    wordforms_by_text = {
-        text: list(wordforms)
-        for text, wordforms in itertools.groupby(wordform_results, key=lambda x: x.text)
-    }
-
-    for similarity, wordform_query in zip(similarities, wordform_queries):
+    wordforms = wordforms_for_rows([row for row, similarity in closest])
+    for (row, similarity), homonyms in zip(closest, wordforms):
         # gensim uses the terminology, similarity = 1 - distance. Its
         # similarity is a number from 0 to 1, with more similar items having
         # similarity closer to 1. A distance should be small for things that
         # are close together.
         distance = 1 - similarity
+        for wordform in homonyms:
+            search_results.add_result(Result(wordform, cosine_vector_distance=distance))
+
+
+def wordforms_for_rows(rows: list[int]) -> list[list[Wordform]]:
+    """Return the wordforms defined by each definition vector row
+
+    Rows are mapped to wordform IDs through the array that
+    builddefinitionvectors saves next to the vectors, and fetched in one
+    primary-key query. builddefinitionvectors runs after every import, so the
+    IDs usually match the database. Rows whose wordform has gone anyway, or
+    all rows if the array is missing or from another import, are looked up by
+    their CVD keys instead; a CVD key can match several homonyms.
+    """
+    wordforms: list[list[Wordform]] = [[] for _ in rows]
+
+    wordform_ids = definition_wordform_ids()
+    if wordform_ids is not None:
+        ids = [int(wordform_ids[row]) for row in rows]
+        wordforms_by_id = Wordform.objects.in_bulk(set(ids))
+        wordforms = [
+            [wordforms_by_id[wordform_id]] if wordform_id in wordforms_by_id else []
+            for wordform_id in ids
+        ]
+
+    missing = [i for i, homonyms in enumerate(wordforms) if not homonyms]
+    if missing:
+        keys = definition_vectors().index_to_key
+        found = _wordforms_for_cvd_keys([keys[rows[i]] for i in missing])
+        for i, wordform in zip(missing, found):
+            wordforms[i] = wordform
+    return wordforms
+
+
+def _wordforms_for_cvd_keys(cvd_keys: list[str]) -> list[list[Wordform]]:
+    wordform_queries = [cvd_key_to_wordform_query(key) for key in cvd_keys]
+
+    # Get all possible wordforms in one big query. We will select more than we
+    # need, then filter it down later, but this will have to do until we get
+    # better homonym handling.
+    wordforms_by_text: dict[str, list[Wordform]] = {}
+    for wf in Wordform.objects.filter(
+        text__in=set(wf["text"] for wf in wordform_queries)
+    ).select_related("lemma"):
+        wordforms_by_text.setdefault(wf.text, []).append(wf)
 
-        wordforms_for_query = wordforms_by_text.get(wordform_query["text"], None)
-        if wordforms_for_query is None:
+    ret: list[list[Wordform]] = []
+    for wordform_query in wordform_queries:
+        matches = [
+            wf
+            for wf in wordforms_by_text.get(wordform_query["text"], [])
+            if wordform_query_matches(wordform_query, wf)
+        ]
+        if not matches:
             logger.warning(
                 f"Wordform {wordform_query['text']} not found in CVD; mismatch between definition vector model file and definitions in database?"
             )
-        else:
-            for wf in wordforms_for_query:
-                if wordform_query_matches(wordform_query, wf):
-                    search_results.add_result(
-                        Result(wf, cosine_vector_distance=distance)
-                    )
+        ret.append(matches)
+    return ret
@@ -0,0 +1,172 @@
+"""
+Frequency tables used to annotate search results
+
+Every search annotates its results with a lemma frequency, a glossary count,
+and a morpheme ranking. Those numbers come from tab-separated resource files
+that are far too slow to re-read on every query, so each file is parsed once
+into an immutable mapping. The mapping is only rebuilt when the modification
+time of the file on disk changes, which is checked at most every
+CHECK_INTERVAL seconds, since results look up the tables one by one.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Iterable, Mapping, Optional
+
+from morphodict.utils import shared_res_dir
+
+logger = logging.getLogger(__name__)
+
+# The values in the glossary and morpheme files are normalized by dividing by
+# these maxima.
+GLOSSARY_COUNT_MAX = 3
+MORPHEME_RANKING_MAX = 65.04136
+
+# How often, in seconds, to check whether a table file has changed
+CHECK_INTERVAL = 1.0
+
+
+def parse_lemma_frequencies(lines: Iterable[str]) -> dict[str, int]:
+    """
+    Parse lemma_frequency.txt. The first listed frequency for a lemma wins.
+
+    >>> parse_lemma_frequencies(["10\\tnipâw\\t12\\tnipâw\\t\\t\\t\\t", "3\\tshort"])
+    {'nipâw': 12}
+    """
+    ret: dict[str, int] = {}
+    for line in lines:
+        cells = line.split("\t")
+        if len(cells) >= 4:
+            _a_freq, _a, l_freq, l, *_ = cells
+            if l not in ret:
+                ret[l] = int(l_freq)
+    return ret
+
+
+def parse_glossary_counts(lines: Iterable[str]) -> dict[str, float]:
+    """
+    Parse crk_glossaries_aggregate_vocab.txt
+
+    >>> parse_glossary_counts(["3\\tatim", "1\\tminôs\\textra"])
+    {'atim': 1.0, 'minôs': 0.3333333333333333}
+    """
+    ret: dict[str, float] = {}
+    for line in lines:
+        cells = line.split("\t")
+        if len(cells) >= 2:
+            freq, morpheme, *_ = cells
+            ret[morpheme] = int(freq) / GLOSSARY_COUNT_MAX
+    return ret
+
+
+def parse_morpheme_rankings(lines: Iterable[str]) -> dict[str, float]:
+    """
+    Parse CW_aggregate_morpheme_log_freqs.txt
+    """
+    ret: dict[str, float] = {}
+    for line in lines:
+        cells = line.split("\t")
+        # todo: use the third row
+        if len(cells) >= 2:
+            freq, morpheme, *_ = cells
+            ret[morpheme] = float(freq) / MORPHEME_RANKING_MAX
+    return ret
+
+
+class FrequencyTable:
+    """
+    An immutable text → number mapping loaded from a resource file.
+
+    The file is read lazily on first access, and re-read whenever its
+    modification time changes. The modification time is checked at most every
+    CHECK_INTERVAL seconds.
+    """
+
+    def __init__(
+        self, path: Path, parse: Callable[[Iterable[str]], Mapping[str, float]]
+    ):
+        self._path = path
+        self._parse = parse
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self._mapping: Mapping[str, float] = MappingProxyType({})
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def mapping(self) -> Mapping[str, float]:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < CHECK_INTERVAL:
+            return self._mapping
+
+        mtime = self._path.stat().st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                # Another thread may have reloaded while we were waiting.
+                if mtime != self._mtime:
+                    self._load(mtime)
+        self._checked_at = now
+        return self._mapping
+
+    def get(self, text: str, default=None):
+        return self.mapping().get(text, default)
+
+    def _load(self, mtime: int):
+        logger.debug("reading frequency table %s", self._path)
+        lines = self._path.read_text().splitlines()
+        self._mapping = MappingProxyType(self._parse(lines))
+        self._mtime = mtime
+
+
+class _FrequencyTables:
+    """Holder for the frequency tables, so they can be preloaded together"""
+
+    def __init__(self):
+        self.lemma_frequency = FrequencyTable(
+            shared_res_dir / "lemma_frequency.txt", parse_lemma_frequencies
+        )
+        self.glossary_count = FrequencyTable(
+            shared_res_dir / "crk_glossaries_aggregate_vocab.txt",
+            parse_glossary_counts,
+        )
+        self.morpheme_ranking = FrequencyTable(
+            shared_res_dir / "CW_aggregate_morpheme_log_freqs.txt",
+            parse_morpheme_rankings,
+        )
+
+    def preload(self):
+        """Load all tables
+
+        To be called on production server startup.
+        """
+        self.lemma_frequency.mapping()
+        self.glossary_count.mapping()
+        self.morpheme_ranking.mapping()
+
+
+tables = _FrequencyTables()
+
+
+def annotate_frequencies(results: Iterable, *, lemma_freq=True, glossary_count=True):
+    """
+    Set lemma_freq and glossary_count on every result in a single pass.
+
+    The tables are fetched once up front, so the per-result work is only
+    dictionary lookups.
+    """
+    lemma_frequencies = tables.lemma_frequency.mapping() if lemma_freq else None
+    glossary_counts = tables.glossary_count.mapping() if glossary_count else None
+
+    for result in results:
+        text = result.lemma_wordform.text
+        if lemma_frequencies is not None:
+            result.lemma_freq = lemma_frequencies.get(text, 0)
+        if glossary_counts is not None:
+            result.glossary_count = glossary_counts.get(text, 0)
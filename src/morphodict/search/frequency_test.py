@@ -0,0 +1,54 @@
+import os
+
+from morphodict.lexicon.models import Wordform
+from morphodict.search import frequency
+from morphodict.search.frequency import (
+    FrequencyTable,
+    annotate_frequencies,
+    parse_glossary_counts,
+    tables,
+)
+from morphodict.search.types import Result
+
+
+def test_table_is_only_reloaded_when_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(frequency, "CHECK_INTERVAL", 0)
+    path = tmp_path / "glossary.txt"
+    path.write_text("3\tatim\n")
+    table = FrequencyTable(path, parse_glossary_counts)
+
+    first = table.mapping()
+    assert first == {"atim": 1.0}
+    assert table.mapping() is first
+
+    path.write_text("3\tatim\n1\tminôs\n")
+    # Make sure the mtime visibly changes, even on coarse-grained filesystems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = table.mapping()
+    assert second is not first
+    assert second["minôs"] == 1 / 3
+
+
+def test_file_is_checked_at_most_every_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(frequency, "CHECK_INTERVAL", 3600)
+    path = tmp_path / "glossary.txt"
+    path.write_text("3\tatim\n")
+    table = FrequencyTable(path, parse_glossary_counts)
+    first = table.mapping()
+
+    path.unlink()
+
+    assert table.mapping() is first
+
+
+def test_annotate_frequencies_sets_both_features():
+    wf = Wordform(text="a-word-that-is-in-no-frequency-file", is_lemma=True)
+    wf.lemma = wf
+    result = Result(wf, target_language_keyword_match=["x"])
+
+    annotate_frequencies([result])
+
+    assert result.lemma_freq == tables.lemma_frequency.get(wf.text, 0)
+    assert result.glossary_count == tables.glossary_count.get(wf.text, 0)
@@ -1,37 +1,9 @@
-from pathlib import Path
-
-from morphodict.utils import shared_res_dir
-
-DOCUMENT_FREQUENCY = {}
+from morphodict.search.frequency import annotate_frequencies, tables
 
 
 def get_glossary_count(search_results):
-    prep_freqs()
-    [find_glossary_count(result) for result in search_results.unsorted_results()]
-
-
-def prep_freqs():
-    # print(
-    #     "Location of glossary file:",
-    #     Path(shared_res_dir / "crk_glossaries_aggregate_vocab.txt"),
-    # )
-    lines = (
-        Path(shared_res_dir / "crk_glossaries_aggregate_vocab.txt")
-        .read_text()
-        .splitlines()
-    )
-    max = 3
-    for line in lines:
-        cells = line.split("\t")
-        if len(cells) >= 2:
-            freq, morpheme, *_ = cells
-            # normalize by dividing by max
-            DOCUMENT_FREQUENCY[morpheme] = int(freq) / max
+    annotate_frequencies(search_results.unsorted_results(), lemma_freq=False)
 
 
 def find_glossary_count(result):
-    if result.lemma_wordform.text in DOCUMENT_FREQUENCY:
-        result.glossary_count = DOCUMENT_FREQUENCY[result.lemma_wordform.text]
-        return
-    result.glossary_count = 0
-    return
+    result.glossary_count = tables.glossary_count.get(result.lemma_wordform.text, 0)
@@ -4,16 +4,22 @@ import logging
 
 from django.db.models import Q
 
-from morphodict.utils import (
-    get_modified_distance,
-)
+from morphodict.utils import get_modified_distance
+from morphodict.utils.cree_lev_dist import get_modified_distances
 from morphodict.utils.english_keyword_extraction import stem_keywords
 from morphodict.analysis import (
     strict_generator,
     rich_analyze_relaxed,
 )
-from morphodict.lexicon.models import Wordform, SourceLanguageKeyword
-from morphodict.lexicon.util import to_source_language_keyword
+from morphodict.lexicon.models import (
+    Wordform,
+    SourceLanguageKeyword,
+    TargetLanguageKeyword,
+)
+from morphodict.lexicon.util import (
+    to_source_language_keyword,
+    to_target_language_keyword,
+)
 from . import core
 from .types import Result
 
@@ -41,15 +47,16 @@ def fetch_results(query: core.Query, search_results: core.SearchResults):
     db_matches = list(
         Wordform.objects.filter(raw_analysis__in=[a.tuple for a in fst_analyses])
     )
+    distances = get_modified_distances(
+        [wf.text for wf in db_matches], query.query_string
+    )
 
-    for wf in db_matches:
+    for wf, distance in zip(db_matches, distances):
         search_results.add_result(
             Result(
                 wf,
                 source_language_match=wf.text,
-                query_wordform_edit_distance=get_modified_distance(
-                    wf.text, query.query_string
-                ),
+                query_wordform_edit_distance=distance,
             )
         )
 
@@ -61,13 +68,35 @@ def fetch_results(query: core.Query, search_results: core.SearchResults):
     # although their lemmas should be.
     #
     # Therefore, we will make on the go the extra entries.
-    for analysis in fst_analyses:
-        # When the user query is outside of paradigm tables
-        # e.g. mad preverb and reduplication: ê-mâh-misi-nâh-nôcihikocik
-        # e.g. Initial change: nêpât: {'IC+nipâw+V+AI+Cnj+3Sg'}
+    if fst_analyses:
+        add_synthetic_results(query, search_results, fst_analyses)
+
+
+def add_synthetic_results(
+    query: core.Query, search_results: core.SearchResults, fst_analyses
+):
+    """
+    Add results for analyses whose wordforms are not in the database
 
-        normatized_form_for_analysis = strict_generator().lookup(analysis.smushed())
-        if len(normatized_form_for_analysis) == 0:
+    This is done in batches, so that there is a single generator lookup and a
+    single database query no matter how many analyses there are.
+    """
+    # When the user query is outside of paradigm tables
+    # e.g. mad preverb and reduplication: ê-mâh-misi-nâh-nôcihikocik
+    # e.g. Initial change: nêpât: {'IC+nipâw+V+AI+Cnj+3Sg'}
+    normatized_forms = strict_generator().bulk_lookup(
+        {analysis.smushed() for analysis in fst_analyses}
+    )
+
+    lemmas_by_text: dict[str, list[Wordform]] = {}
+    for lemma in Wordform.objects.filter(
+        text__in={analysis.lemma for analysis in fst_analyses}, is_lemma=True
+    ):
+        lemmas_by_text.setdefault(lemma.text, []).append(lemma)
+
+    for analysis in fst_analyses:
+        normatized_form_for_analysis = normatized_forms.get(analysis.smushed())
+        if not normatized_form_for_analysis:
             logger.error(
                 "Cannot generate normative form for analysis: %s (query: %s)",
                 analysis,
@@ -76,14 +105,14 @@ def fetch_results(query: core.Query, search_results: core.SearchResults):
             continue
 
         # If there are multiple forms for this analysis, use the one that is
-        # closest to what the user typed.
-        normatized_user_query = min(
-            normatized_form_for_analysis,
-            key=lambda f: get_modified_distance(f, query.query_string),
-        )
+        # closest to what the user typed. (Sorted, because bulk_lookup returns
+        # sets, so that ties are broken the same way every time.)
+        candidates = sorted(normatized_form_for_analysis)
+        distances = get_modified_distances(candidates, query.query_string)
+        normatized_user_query = candidates[distances.index(min(distances))]
 
         possible_lemma_wordforms = best_lemma_matches(
-            analysis, Wordform.objects.filter(text=analysis.lemma, is_lemma=True)
+            analysis, lemmas_by_text.get(analysis.lemma, [])
         )
 
         for lemma_wordform in possible_lemma_wordforms:
@@ -149,13 +178,19 @@ def best_lemma_matches(analysis, possible_lemmas) -> list[Wordform]:
 def fetch_results_from_target_language_keywords(
     query: core.Query, search_results: core.SearchResults
 ):
-    for stemmed_keyword in stem_keywords(query.query_string):
-        for wordform in Wordform.objects.filter(
-            target_language_keyword__text__iexact=stemmed_keyword
-        ):
-            search_results.add_result(
-                Result(wordform, target_language_keyword_match=[stemmed_keyword])
-            )
+    stemmed_keywords = {
+        to_target_language_keyword(kw) for kw in stem_keywords(query.query_string)
+    }
+    if not stemmed_keywords:
+        return
+
+    # A single indexed lookup for all the keywords in the query
+    for kw in TargetLanguageKeyword.objects.filter(
+        normalized_text__in=stemmed_keywords
+    ).select_related("wordform__lemma"):
+        search_results.add_result(
+            Result(kw.wordform, target_language_keyword_match=[kw.normalized_text])
+        )
 
 
 def fetch_results_from_source_language_keywords(
@@ -163,7 +198,7 @@ def fetch_results_from_source_language_keywords(
 ):
     res = SourceLanguageKeyword.objects.filter(
         Q(text=to_source_language_keyword(query.query_string))
-    )
+    ).select_related("wordform__lemma")
     for kw in res:
         search_results.add_result(
             Result(
@@ -0,0 +1,20 @@
+import pytest
+
+from morphodict.search.core import SearchResults
+from morphodict.search.lookup import fetch_results
+from morphodict.search.query import Query
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["atchakosuk", "ê-mâh-misi-nâh-nôcihikocik"])
+def test_fetch_results_uses_fixed_number_of_queries(
+    query, django_assert_max_num_queries
+):
+    search_results = SearchResults()
+
+    # target keywords, source keywords, analysed wordforms, and lemmas of
+    # analyses that are not in the database
+    with django_assert_max_num_queries(4):
+        fetch_results(Query(query), search_results)
+
+    assert list(search_results.unsorted_results())
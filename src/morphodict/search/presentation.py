@@ -5,9 +5,10 @@ from dataclasses import dataclass
 from typing import Any, Dict, Iterable, List, Literal, Optional, TypedDict, cast, Tuple
 
 from django.conf import settings
+from django.db.models import prefetch_related_objects
 from django.forms import model_to_dict
 
-from morphodict.search import core, types
+from morphodict.search import core, preverbs, types
 from morphodict.relabelling import read_labels, LABELS
 from morphodict.utils.fst_analysis_parser import partition_analysis
 from morphodict.search.types import Preverb, LinguisticTag, linguistic_tag_from_fst_tags
@@ -18,7 +19,7 @@ from crkeng.app.preferences import (
     DictionarySource,
     ShowEmoji,
 )
-from morphodict.analysis import RichAnalysis
+from morphodict.analysis import RichAnalysis, bulk_generate_with_morphemes
 from morphodict.lexicon.models import Wordform, SourceLanguageKeyword
 
 from morphodict.utils.serializer import (
@@ -99,6 +100,65 @@ class SerializedRelabelling(TypedDict):
     label: str
 
 
+MorphemeSegmentations = Dict[Tuple[RichAnalysis, str], Optional[List[str]]]
+
+# What serialize_wordform() needs from the database
+SERIALIZED_WORDFORM_PREFETCHES = ("definitions__citations", "rapidwords", "synsets")
+
+
+def segment_morphemes(results: Iterable[types.Result]) -> MorphemeSegmentations:
+    """
+    Work out the morphemes of the wordforms and lemmas of all the given results
+
+    Segmentation needs a generator FST lookup per form, so it is only done for
+    results that are actually going to be presented, and all at once.
+    """
+    return bulk_generate_with_morphemes(
+        (analysis, wordform.text)
+        for r in results
+        for wordform in (r.wordform, r.lemma_wordform)
+        if (analysis := wordform.analysis)
+    )
+
+
+def preverb_text(tag: str) -> str:
+    """
+    >>> preverb_text("PV/nitawi+")
+    'nitawi'
+    """
+    return tag.replace("PV/", "").replace("+", "")
+
+
+@dataclass
+class PresentationBatch:
+    """
+    Everything from the database and the FSTs that presenting a set of
+    results needs, fetched for all of them together.
+
+    Presenting results one at a time would take several queries and FST
+    lookups for each one.
+    """
+
+    morphemes: MorphemeSegmentations
+    preverb_index: preverbs.PreverbIndex
+
+    @classmethod
+    def for_results(cls, results: List[types.Result]) -> PresentationBatch:
+        prefetch_related_objects(
+            [r.wordform for r in results if not r.wordform._state.adding],
+            "definitions__citations",
+        )
+        # Synthetic wordforms are not saved, but their lemmas are.
+        prefetch_related_objects(
+            [r.lemma_wordform for r in results], *SERIALIZED_WORDFORM_PREFETCHES
+        )
+
+        return cls(
+            morphemes=segment_morphemes(results),
+            preverb_index=preverbs.cache.index(),
+        )
+
+
 class PresentationResult:
     """
     A result ready for user display, and serializable for templates
@@ -119,6 +179,7 @@ class PresentationResult:
         animate_emoji=AnimateEmoji.default,
         show_emoji=ShowEmoji.default,
         dict_source=None,
+        batch: Optional[PresentationBatch] = None,
     ):
         self._result = result
         self._search_results = search_results
@@ -160,22 +221,28 @@ class PresentationResult:
         else:
             raise Exception(f"Unknown {settings.MORPHODICT_TAG_STYLE=}")
 
-        self.lexical_info = get_lexical_info(
-            result.wordform.analysis, animate_emoji, self._show_emoji, self.dict_source
-        )
+        if batch is None:
+            batch = PresentationBatch.for_results([result])
+        morphemes = batch.morphemes
 
         if rich_analysis := result.wordform.analysis:
-            self.morphemes = rich_analysis.generate_with_morphemes(result.wordform.text)
+            self.morphemes = morphemes.get((rich_analysis, result.wordform.text))
         else:
             self.morphemes = None
 
-        self.lemma_morphemes = result.lemma_morphemes
+        if lemma_analysis := result.lemma_wordform.analysis:
+            self.lemma_morphemes = morphemes.get(
+                (lemma_analysis, result.lemma_wordform.text)
+            )
+        else:
+            self.lemma_morphemes = None
 
         self.lexical_info = get_lexical_info(
             result.wordform.analysis,
             animate_emoji=animate_emoji,
             dict_source=self.dict_source,
             show_emoji=self._show_emoji,
+            preverb_index=batch.preverb_index,
         )
 
         self.preverbs: List[SerializedWordform] = [
@@ -470,10 +537,14 @@ def get_lexical_info(
     animate_emoji: str,
     show_emoji: str,
     dict_source: list,
+    preverb_index: Optional[preverbs.PreverbIndex] = None,
 ) -> List[dict]:
     if not result_analysis:
         return []
 
+    if preverb_index is None:
+        preverb_index = preverbs.cache.index()
+
     result_analysis_tags = result_analysis.prefix_tags
     first_letters = extract_first_letters(result_analysis)
 
@@ -496,31 +567,19 @@ def get_lexical_info(
             entry = _InitialChangeResult(text=" ", definitions=change_types).serialize()
 
         elif tag.startswith("PV/"):
-            preverb_text = tag.replace("PV/", "").replace("+", "")
-            # Our FST analyzer doesn't return preverbs with diacritics
-            # but we store variations of words in this table
-            preverb_results = SourceLanguageKeyword.objects.filter(text=preverb_text)
-            # get the actual wordform object and
-            # make sure the result we return is an IPV
-            if preverb_results:
-                entries = []
-                for preverb in preverb_results:
-                    lexicon_result = Wordform.objects.get(id=preverb.wordform_id)
-                    if lexicon_result:
-                        _info = lexicon_result.linguist_info
-                        if _info["wordclass"] == "IPV":
-                            entry = serialize_wordform(
-                                lexicon_result, animate_emoji, show_emoji, dict_source
-                            )
-                            if entry:
-                                entries.append(entry)
-                url = "search?q=" + preverb_text
+            pv_text = preverb_text(tag)
+            # The index only holds IPV wordforms
+            entries = preverb_index.serialized_entries(
+                pv_text, animate_emoji, show_emoji, dict_source
+            )
+            if entries:
+                url = "search?q=" + pv_text
                 _type = "Preverb"
                 try:
                     id: Optional[int] = entries[0]["id"]
                     result = _LexicalEntry(
                         entry=cast(Any, entries),
-                        text=preverb_text,
+                        text=pv_text,
                         url=url,
                         id=id,
                         type=_type,
@@ -529,13 +588,13 @@ def get_lexical_info(
                     lexical_info.append(result)
                 except IndexError:
                     # Pretend we didn't find it.
-                    preverb_result1 = Wordform(text=preverb_text, is_lemma=True)
+                    preverb_result1 = Wordform(text=pv_text, is_lemma=True)
             else:
                 # Can't find a match for the preverb in the database.
                 # This happens when searching against the test database for
                 # ê-kî-nitawi-kâh-kîmôci-kotiskâwêyâhk, as the test database
                 # lacks lacks ê and kî.
-                preverb_result1 = Wordform(text=preverb_text, is_lemma=True)
+                preverb_result1 = Wordform(text=pv_text, is_lemma=True)
 
         if reduplication_string is not None:
             entry = _ReduplicationResult(
@@ -0,0 +1,33 @@
+import pytest
+
+from morphodict.search import preverbs, search
+
+# All the prefetching for one page:
+#  - definitions and citations of the result wordforms: 2
+#  - definitions, citations, rapidwords and synsets of the lemmas: 4
+#  - the import stamp, to check that the preverb index is current: 1
+MAX_PRESENTATION_QUERIES = 7
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query",
+    [
+        "wapamew",
+        "ê-kî-nitawi-kâh-kîmôci-kotiskâwêyâhk",
+        "see",
+    ],
+)
+@pytest.mark.parametrize("dict_source", [None, ["CW"]])
+def test_presentation_uses_constant_number_of_queries(
+    query, dict_source, django_assert_max_num_queries
+):
+    search_results = search(query=query)
+    preverbs.cache.preload()
+
+    with django_assert_max_num_queries(MAX_PRESENTATION_QUERIES):
+        serialized = search_results.serialized_presentation_results(
+            dict_source=dict_source
+        )
+
+    assert serialized
@@ -0,0 +1,116 @@
+"""
+Preverb index for lexical info
+
+Search results for Cree verbs show an entry for every preverb in their
+analysis, e.g., PV/nitawi+ in ê-kî-nitawi-kâh-kîmôci-kotiskâwêyâhk. There are
+not many preverbs, so instead of querying for them every time, they are all
+loaded once, and each one is serialized only once per combination of display
+options.
+
+The index is rebuilt when a new import changes the ImportStamp.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Optional
+
+from django.db.models import prefetch_related_objects
+
+from morphodict.lexicon.models import ImportStamp, SourceLanguageKeyword, Wordform
+from morphodict.search import presentation
+from morphodict.utils.serializer import SerializedWordform
+
+logger = logging.getLogger(__name__)
+
+
+class PreverbIndex:
+    """Maps preverb keywords, as they appear in PV/ tags, to IPV wordforms"""
+
+    def __init__(self, wordforms_by_keyword: dict[str, list[Wordform]]):
+        self._wordforms_by_keyword = wordforms_by_keyword
+        self._serialized: dict[tuple, list[SerializedWordform]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_database(cls) -> PreverbIndex:
+        # Our FST analyzer doesn't return preverbs with diacritics
+        # but we store variations of words in this table
+        keywords = list(
+            SourceLanguageKeyword.objects.filter(
+                wordform__linguist_info__wordclass="IPV"
+            )
+            .select_related("wordform")
+            .order_by("id")
+        )
+        prefetch_related_objects(
+            [kw.wordform for kw in keywords],
+            *presentation.SERIALIZED_WORDFORM_PREFETCHES,
+        )
+
+        wordforms_by_keyword: dict[str, list[Wordform]] = {}
+        for kw in keywords:
+            wordforms_by_keyword.setdefault(kw.text, []).append(kw.wordform)
+        return cls(wordforms_by_keyword)
+
+    def serialized_entries(
+        self,
+        keyword: str,
+        animate_emoji: str,
+        show_emoji: str,
+        dict_source: Optional[list],
+    ) -> list[SerializedWordform]:
+        """
+        Return the serialized IPV wordforms for the preverb keyword
+
+        The returned objects are shared, and must not be modified.
+        """
+        wordforms = self._wordforms_by_keyword.get(keyword)
+        if not wordforms:
+            return []
+
+        key = (keyword, animate_emoji, show_emoji, tuple(dict_source or ()))
+        entries = self._serialized.get(key)
+        if entries is None:
+            entries = [
+                presentation.serialize_wordform(
+                    wf, animate_emoji, show_emoji, dict_source or []
+                )
+                for wf in wordforms
+            ]
+            with self._lock:
+                self._serialized[key] = entries
+        return entries
+
+
+class _Cache:
+    """Holds the preverb index, rebuilding it after every import"""
+
+    def __init__(self):
+        self._index: Optional[PreverbIndex] = None
+        self._import_stamp: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def index(self) -> PreverbIndex:
+        import_stamp = ImportStamp.latest_timestamp()
+        with self._lock:
+            if self._index is None or import_stamp != self._import_stamp:
+                logger.debug("building preverb index")
+                self._index = PreverbIndex.from_database()
+                self._import_stamp = import_stamp
+            return self._index
+
+    def preload(self):
+        """Build the index
+
+        To be called on production server startup.
+        """
+        self.index()
+
+    def flush(self):
+        with self._lock:
+            self._index = None
+
+
+cache = _Cache()
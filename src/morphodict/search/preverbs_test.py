@@ -0,0 +1,28 @@
+import pytest
+
+from morphodict.lexicon.models import ImportStamp
+from morphodict.search.preverbs import _Cache
+
+
+@pytest.mark.django_db
+def test_preverb_index_is_rebuilt_after_import():
+    cache = _Cache()
+    index = cache.index()
+    assert cache.index() is index
+
+    ImportStamp.objects.all().delete()
+    ImportStamp.objects.create(timestamp=12345.0)
+
+    assert cache.index() is not index
+
+
+@pytest.mark.django_db
+def test_serialized_preverb_entries_are_reused():
+    index = _Cache().index()
+
+    first = index.serialized_entries("nitawi", "white", "yes", None)
+    assert first
+    assert all(entry["wordclass"] == "IPV" for entry in first)
+    assert index.serialized_entries("nitawi", "white", "yes", None) is first
+    assert index.serialized_entries("nitawi", "white", "no", None) is not first
+    assert index.serialized_entries("not-a-preverb", "white", "yes", None) == []
@@ -0,0 +1,247 @@
+"""
+Search result cache
+
+A small number of queries make up most of our traffic, and running the whole
+search pipeline—FST analysis, keyword queries, affix search, CVD, ESPT—for
+each of them again is wasted work. This module keeps the SearchResults of
+recent searches, keyed on the normalized query and the search options.
+
+Every key includes the timestamp of the last dictionary import, so entries
+become stale as soon as a new import finishes.
+
+The backend is chosen with the MORPHODICT_SEARCH_CACHE_BACKEND setting:
+
+  - "memory": a bounded LRU cache in this process, holding up to
+    MORPHODICT_SEARCH_CACHE_SIZE entries
+  - "django": the Django cache named by MORPHODICT_SEARCH_CACHE_ALIAS, which
+    can be shared between processes
+  - None: no caching
+
+Cached SearchResults are shared between requests, so code handed one must
+not add or remove results.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+from typing import Callable, Optional, Protocol
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from morphodict.lexicon.models import ImportStamp
+from morphodict.search.core import SearchResults
+from morphodict.search.query import Query
+
+logger = logging.getLogger(__name__)
+
+# Bump this if the format of cached SearchResults changes, so that a shared
+# Django cache does not hand out objects pickled by older code.
+CACHE_KEY_VERSION = 1
+
+
+@dataclass
+class SearchCacheStats:
+    hits: int
+    misses: int
+    # Only tracked by the in-memory backend; None for the Django backend.
+    evictions: Optional[int]
+    size: Optional[int]
+
+
+class _Backend(Protocol):
+    def get(self, key: str) -> Optional[SearchResults]: ...
+
+    def set(self, key: str, value: SearchResults) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> tuple[Optional[int], Optional[int]]:
+        """Return (evictions, size), or Nones if unknown"""
+        ...
+
+
+class InMemoryBackend:
+    """A thread-safe LRU mapping with a maximum size"""
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError(f"cache size must be positive, not {maxsize}")
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, SearchResults] = OrderedDict()
+        self._lock = threading.Lock()
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[SearchResults]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: SearchResults) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> tuple[Optional[int], Optional[int]]:
+        with self._lock:
+            return self._evictions, len(self._entries)
+
+
+class DjangoCacheBackend:
+    """Store entries in one of the caches configured in settings.CACHES"""
+
+    KEY_PREFIX = "morphodict-search:"
+
+    def __init__(self, alias: str):
+        self._alias = alias
+
+    @property
+    def _cache(self):
+        return caches[self._alias]
+
+    def get(self, key: str) -> Optional[SearchResults]:
+        return self._cache.get(self.KEY_PREFIX + key)
+
+    def set(self, key: str, value: SearchResults) -> None:
+        self._cache.set(self.KEY_PREFIX + key, value)
+
+    def clear(self) -> None:
+        # Stale entries cannot be hit, since every key contains the import
+        # stamp, and the cache backend expires them on its own.
+        pass
+
+    def stats(self) -> tuple[Optional[int], Optional[int]]:
+        return None, None
+
+
+def cache_key(
+    query: Query,
+    *,
+    import_stamp: Optional[float],
+    include_affixes: bool,
+    include_auto_definitions: bool,
+    inflect_english_phrases: bool,
+) -> str:
+    """
+    Return a key identifying everything that affects the results of a search
+
+    The query is normalized by Query, so queries differing only in whitespace,
+    case, or orthography get the same key.
+
+    >>> cache_key(Query(" Nipaw  verbose:1"), import_stamp=1.0,
+    ...     include_affixes=True, include_auto_definitions=False,
+    ...     inflect_english_phrases=False) == cache_key(Query("nipaw verbose:yes"),
+    ...     import_stamp=1.0, include_affixes=True,
+    ...     include_auto_definitions=False, inflect_english_phrases=False)
+    True
+    """
+    parts = (
+        CACHE_KEY_VERSION,
+        import_stamp,
+        query.query_string,
+        tuple(getattr(query, flag) for flag in Query.BOOL_KEYS),
+        query.cvd.name if query.cvd is not None else None,
+        include_affixes,
+        include_auto_definitions,
+        inflect_english_phrases,
+    )
+    # Hashed so that keys are a safe length and charset for any cache backend
+    return hashlib.sha256(repr(parts).encode("UTF-8")).hexdigest()
+
+
+class SearchResultCache:
+    def __init__(self, backend: _Backend):
+        self._backend = backend
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._import_stamp: Optional[float] = None
+
+    def get_or_search(
+        self,
+        query: Query,
+        do_search: Callable[[], SearchResults],
+        *,
+        include_affixes: bool,
+        include_auto_definitions: bool,
+        inflect_english_phrases: bool,
+    ) -> SearchResults:
+        """
+        Return the cached results for this query, or call do_search() and
+        cache what it returns.
+        """
+        import_stamp = ImportStamp.latest_timestamp()
+        if import_stamp != self._import_stamp:
+            logger.debug("import stamp changed, clearing search result cache")
+            self._backend.clear()
+            self._import_stamp = import_stamp
+
+        key = cache_key(
+            query,
+            import_stamp=import_stamp,
+            include_affixes=include_affixes,
+            include_auto_definitions=include_auto_definitions,
+            inflect_english_phrases=inflect_english_phrases,
+        )
+
+        results = self._backend.get(key)
+        if results is not None:
+            with self._lock:
+                self._hits += 1
+            return results
+
+        with self._lock:
+            self._misses += 1
+        results = do_search()
+        self._backend.set(key, results)
+        return results
+
+    def clear(self):
+        self._backend.clear()
+
+    def stats(self) -> SearchCacheStats:
+        evictions, size = self._backend.stats()
+        with self._lock:
+            return SearchCacheStats(
+                hits=self._hits, misses=self._misses, evictions=evictions, size=size
+            )
+
+
+def get_search_cache() -> Optional[SearchResultCache]:
+    """Return the cache configured in settings, or None if caching is off"""
+    return _cache_for_settings(
+        getattr(settings, "MORPHODICT_SEARCH_CACHE_BACKEND", None),
+        getattr(settings, "MORPHODICT_SEARCH_CACHE_SIZE", 512),
+        getattr(settings, "MORPHODICT_SEARCH_CACHE_ALIAS", "default"),
+    )
+
+
+@cache
+def _cache_for_settings(
+    backend: Optional[str], size: int, alias: str
+) -> Optional[SearchResultCache]:
+    if backend is None:
+        return None
+    if backend == "memory":
+        return SearchResultCache(InMemoryBackend(size))
+    if backend == "django":
+        return SearchResultCache(DjangoCacheBackend(alias))
+    raise ImproperlyConfigured(
+        f"Unknown MORPHODICT_SEARCH_CACHE_BACKEND {backend!r}, expected"
+        ' "memory", "django", or None'
+    )
@@ -0,0 +1,83 @@
+import pickle
+
+import pytest
+
+from morphodict.lexicon.models import ImportStamp
+from morphodict.search.core import SearchResults
+from morphodict.search.query import Query
+from morphodict.search.result_cache import (
+    InMemoryBackend,
+    SearchResultCache,
+    cache_key,
+)
+from morphodict.search.runner import sort_by_cvd
+
+OPTIONS = dict(
+    include_affixes=True, include_auto_definitions=False, inflect_english_phrases=False
+)
+
+
+def test_in_memory_backend_evicts_least_recently_used():
+    backend = InMemoryBackend(maxsize=2)
+    a, b, c = SearchResults(), SearchResults(), SearchResults()
+
+    backend.set("a", a)
+    backend.set("b", b)
+    assert backend.get("a") is a
+    backend.set("c", c)
+
+    assert backend.get("b") is None
+    assert backend.get("a") is a
+    assert backend.get("c") is c
+    assert backend.stats() == (1, 2)
+
+
+@pytest.mark.parametrize(
+    "option", ["include_affixes", "include_auto_definitions", "inflect_english_phrases"]
+)
+def test_cache_key_depends_on_options(option):
+    query = Query("nipaw")
+    changed = {**OPTIONS, option: not OPTIONS[option]}
+
+    assert cache_key(query, import_stamp=1.0, **OPTIONS) != cache_key(
+        query, import_stamp=1.0, **changed
+    )
+
+
+def test_cache_key_depends_on_flags_and_stamp():
+    key = cache_key(Query("nipaw"), import_stamp=1.0, **OPTIONS)
+
+    assert key != cache_key(Query("nipaw cvd:exclusive"), import_stamp=1.0, **OPTIONS)
+    assert key != cache_key(Query("nipaw"), import_stamp=2.0, **OPTIONS)
+
+
+def test_cvd_exclusive_results_can_be_pickled():
+    search_results = SearchResults()
+    search_results.sort_function = sort_by_cvd
+
+    assert pickle.loads(pickle.dumps(search_results)).sort_function is sort_by_cvd
+
+
+@pytest.mark.django_db
+def test_repeated_searches_are_cached_until_next_import():
+    result_cache = SearchResultCache(InMemoryBackend(maxsize=10))
+    searches = []
+
+    def do_search():
+        searches.append(1)
+        return SearchResults()
+
+    first = result_cache.get_or_search(Query("Nipaw "), do_search, **OPTIONS)
+    second = result_cache.get_or_search(Query("nipaw"), do_search, **OPTIONS)
+    assert second is first
+    assert len(searches) == 1
+
+    ImportStamp.objects.all().delete()
+    ImportStamp.objects.create(timestamp=12345.0)
+
+    third = result_cache.get_or_search(Query("nipaw"), do_search, **OPTIONS)
+    assert third is not first
+    assert len(searches) == 2
+
+    stats = result_cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 2, 1)
@@ -9,12 +9,13 @@ from morphodict.search.affix import (
 )
 from morphodict.search.core import SearchResults
 from morphodict.search.cvd_search import do_cvd_search
+from morphodict.search.frequency import annotate_frequencies
 from morphodict.search.lemma_freq import get_lemma_freq
-from morphodict.search.glossary_count import get_glossary_count
 from morphodict.search.espt import EsptSearch
 from morphodict.search.lookup import fetch_results
 from morphodict.search.pos_matches import find_pos_matches
 from morphodict.search.query import CvdSearchType, Query
+from morphodict.search.result_cache import get_search_cache
 from morphodict.search.types import Result, WordnetEntry
 from morphodict.search.util import first_non_none_value
 from morphodict.search.wordnet import WordNetSearch
@@ -31,10 +32,32 @@ def search(
 
     This class encapsulates the logic of which search methods to try, and in
     which order, to build up results in a SearchResults object.
+
+    If a search result cache is configured, repeated searches are answered
+    from it; see result_cache.py.
     """
 
     search_query = Query(query)
+    options = dict(
+        include_affixes=include_affixes,
+        include_auto_definitions=include_auto_definitions,
+        inflect_english_phrases=inflect_english_phrases,
+    )
+
+    result_cache = get_search_cache()
+    if result_cache is None:
+        return _search(search_query, **options)
+    return result_cache.get_or_search(
+        search_query, lambda: _search(search_query, **options), **options
+    )
+
 
+def _search(
+    search_query: Query,
+    include_affixes: bool,
+    include_auto_definitions: bool,
+    inflect_english_phrases: bool,
+) -> SearchResults:
     search_results = SearchResults(
         auto=search_query.auto,
         verbose=search_query.verbose,
@@ -60,10 +83,6 @@ def search(
 
         # For when you type 'cvd:exclusive' in a query to debug ONLY CVD results!
         if cvd_search_type == CvdSearchType.EXCLUSIVE:
-
-            def sort_by_cvd(r: Result):
-                return r.cosine_vector_distance
-
             search_results.sort_function = sort_by_cvd
             do_cvd_search(search_query, search_results)
             return search_results
@@ -103,17 +122,21 @@ def search(
     if espt_search:
         find_pos_matches(espt_search, search_results)
 
-    # Annotate every entry with a frequency count from the glossary
-    get_glossary_count(search_results)
-
-    # Annotate every entry with a lemma frequency from lemma_frequency.txt
-    get_lemma_freq(search_results)
+    # Annotate every entry with a frequency count from the glossary, and with
+    # a lemma frequency from lemma_frequency.txt
+    annotate_frequencies(search_results.unsorted_results())
 
     # Return. NOTE THAT WE HAVE NOT SORTED RESULTS YET!
     # This will be done when we call sorted_results
     return search_results
 
 
+def sort_by_cvd(r: Result):
+    # Module-level, rather than a closure, so that SearchResults using it can be
+    # pickled into a shared cache.
+    return r.cosine_vector_distance
+
+
 CREE_LONG_VOWEL = re.compile("[êîôâēīōā]")
 
 
@@ -13,8 +13,9 @@ from collections.abc import Iterable
 
 from morphodict.utils.serializer import SerializedLinguisticTag
 from morphodict.utils.types import FSTTag, Label
-from morphodict.lexicon.models import Wordform, wordform_cache
+from morphodict.lexicon.models import Wordform
 from morphodict.search import ranking
+from morphodict.search.frequency import tables as frequency_tables
 from morphodict.relabelling import LABELS
 from functools import lru_cache
 
@@ -134,14 +135,10 @@ class Result:
 
         if self.morpheme_ranking is None:
             # todo: normalize morpheme ranking by dividing by max value
-            self.morpheme_ranking = wordform_cache.MORPHEME_RANKINGS.get(
+            morpheme_rankings = frequency_tables.morpheme_ranking.mapping()
+            self.morpheme_ranking = morpheme_rankings.get(
                 self.wordform.text, None
-            ) or wordform_cache.MORPHEME_RANKINGS.get(self.lemma_wordform.text, None)
-
-        if rich_analysis := self.lemma_wordform.analysis:
-            self.lemma_morphemes = rich_analysis.generate_with_morphemes(
-                self.lemma_wordform.text
-            )
+            ) or morpheme_rankings.get(self.lemma_wordform.text, None)
 
     def add_features_from(self, other: Result):
         """Add the features from `other` into this object
@@ -202,7 +199,6 @@ class Result:
     lemma_wordform: Lemma = field(init=False)
     is_lemma: bool = field(init=False)
     wordform_length: int = field(init=False)
-    lemma_morphemes: Optional[list] = None
 
     #: What, if any, was the matching string?
     source_language_match: Optional[str] = None
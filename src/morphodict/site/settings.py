@@ -361,6 +361,10 @@ SHOW_DICT_SOURCE_SETTING = False
 # We only apply affix search for user queries longer than the threshold length
 AFFIX_SEARCH_THRESHOLD = 4
 
+# The most wordforms that affix search adds for each of the prefix and suffix
+# directions. The shortest completions are kept.
+AFFIX_SEARCH_MAX_MATCHES = 100
+
 # This defaults to False, because in order to work it requires that there
 # be correct tag mappings for all analyzable forms.
 MORPHODICT_SUPPORTS_AUTO_DEFINITIONS = False
@@ -369,6 +373,24 @@ MORPHODICT_SUPPORTS_AUTO_DEFINITIONS = False
 # requires libraries we do not currently build, and a smaller vector file.
 MORPHODICT_ENABLE_CVD = True
 
+# How many lists of the approximate nearest-neighbour index built by
+# builddefinitionvectors to search for CVD. Higher values find more of the
+# exact closest definitions, at the cost of speed; builddefinitionvectors
+# reports the recall for a given value. 0 searches every definition vector
+# exactly.
+MORPHODICT_CVD_ANN_NPROBE = env.int("MORPHODICT_CVD_ANN_NPROBE", default=16)
+
+# The news vectors used to look up the words in English queries for CVD. None
+# uses the full Google News model; a model pruned to the dictionary’s
+# vocabulary by `manage.py buildprunednewsvectors` uses far less memory.
+MORPHODICT_NEWS_VECTORS_PATH = env("MORPHODICT_NEWS_VECTORS_PATH", default=None)
+
+# How builddefinitionvectors and buildprunednewsvectors store vectors:
+# "float32", or "float16" or "int8" for smaller files that map less memory,
+# but are slightly less precise and no faster to search. `manage.py
+# comparecvdquantization` reports how much the results change.
+MORPHODICT_CVD_VECTOR_DTYPE = env("MORPHODICT_CVD_VECTOR_DTYPE", default="float32")
+
 # Enable affix search. Optional because it requires a C++ library which we do
 # not currently build for mobile.
 MORPHODICT_ENABLE_AFFIX_SEARCH = True
@@ -377,6 +399,27 @@ MORPHODICT_ENABLE_AFFIX_SEARCH = True
 # lemma text when generating wordforms
 MORPHODICT_ENABLE_FST_LEMMA_SUPPORT = False
 
+# Cache the results of repeated searches. "memory" keeps up to
+# MORPHODICT_SEARCH_CACHE_SIZE searches in each process, "django" uses the
+# Django cache named by MORPHODICT_SEARCH_CACHE_ALIAS, and None turns the cache
+# off. It is off for the test database, whose contents tests may change
+# without a new import.
+MORPHODICT_SEARCH_CACHE_BACKEND = env(
+    "MORPHODICT_SEARCH_CACHE_BACKEND", default=None if USE_TEST_DB else "memory"
+)
+MORPHODICT_SEARCH_CACHE_SIZE = env.int("MORPHODICT_SEARCH_CACHE_SIZE", default=512)
+MORPHODICT_SEARCH_CACHE_ALIAS = "default"
+
+# How many lookup results to cache for each HFST transducer. 0 turns the
+# caches off.
+MORPHODICT_FST_CACHE_SIZE = env.int("MORPHODICT_FST_CACHE_SIZE", default=10_000)
+
+# How many inflected target-language phrases to cache. 0 turns the cache off.
+MORPHODICT_PHRASE_CACHE_SIZE = env.int("MORPHODICT_PHRASE_CACHE_SIZE", default=10_000)
+
+# How many filled paradigm tables to cache. 0 turns the cache off.
+MORPHODICT_PARADIGM_CACHE_SIZE = env.int("MORPHODICT_PARADIGM_CACHE_SIZE", default=256)
+
 # Default names for FST files
 STRICT_ANALYZER_FST_FILENAME = "analyser-gt-norm.hfstol"
 RELAXED_ANALYZER_FST_FILENAME = "analyser-gt-desc.hfstol"
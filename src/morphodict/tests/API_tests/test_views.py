@@ -24,6 +24,30 @@ def test_click_in_text_no_params(client):
     assert response.status_code == 400
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", ["limit=0", "limit=x", "offset=-1"])
+def test_click_in_text_rejects_bad_paging(client, params):
+    response = client.get(
+        reverse("dictionary-word-click-in-text-api") + f"?q=niskak&{params}"
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_search_api_pages_results(client):
+    url = reverse("dictionary-search-api") + f"?query={ASCII_WAPAMEW}"
+    everything = client.get(url).json()["search_results"]
+
+    first_page = client.get(url + "&limit=2").json()
+    second_page = client.get(url + "&limit=2&offset=2").json()
+
+    assert first_page["search_results"] + second_page["search_results"] == (
+        everything[:4]
+    )
+    assert first_page["has_more"] == (len(everything) > 2)
+
+
 @pytest.mark.django_db
 def test_normal_search_uses_affix_search(client):
     """
@@ -0,0 +1,104 @@
+"""
+Benchmark the Cree edit distance against the original implementation
+
+Run with
+
+    python -m morphodict.tests.utils_tests.cree_lev_dist_benchmark [WORDS_FILE]
+
+WORDS_FILE has one word per line, with # comments; it defaults to the crkeng
+test database word list. Every word is misspelled in a few typical ways, and
+the distance from every misspelling to every word is computed with both the
+reference implementation and the fast one. The results must be identical.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from morphodict.tests.utils_tests.test_cree_lev_dist import (
+    reference_modified_distance,
+)
+from morphodict.utils.cree_lev_dist import (
+    get_modified_distance,
+    get_modified_distances,
+    remove_cree_diacritics,
+)
+
+DEFAULT_WORDS_FILE = (
+    Path(__file__).parents[3]
+    / "crkeng"
+    / "resources"
+    / "dictionary"
+    / "test_db_words.txt"
+)
+
+
+def read_words(path: Path) -> list[str]:
+    words = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            words.append(line)
+    return sorted(set(words))
+
+
+def misspellings(word: str, rng: random.Random) -> list[str]:
+    """Ways a user might type the word"""
+    without_diacritics = remove_cree_diacritics(word)
+    ret = [word, without_diacritics, without_diacritics.replace("h", "")]
+    if len(word) > 1:
+        i = rng.randrange(len(word))
+        ret.append(word[:i] + word[i + 1 :])
+    return ret
+
+
+def time_it(function) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("words_file", nargs="?", type=Path, default=DEFAULT_WORDS_FILE)
+    args = parser.parse_args(argv)
+
+    words = read_words(args.words_file)
+    rng = random.Random(1234)
+    spellings = [s for word in words for s in misspellings(word, rng)]
+    print(f"{len(spellings)} spellings × {len(words)} words")
+
+    reference_time, reference = time_it(
+        lambda: [
+            [reference_modified_distance(s, word) for s in spellings] for word in words
+        ]
+    )
+    single_time, single = time_it(
+        lambda: [[get_modified_distance(s, word) for s in spellings] for word in words]
+    )
+    batched_time, batched = time_it(
+        lambda: [get_modified_distances(spellings, word) for word in words]
+    )
+    threshold_time, thresholded = time_it(
+        lambda: [get_modified_distances(spellings, word, threshold=2) for word in words]
+    )
+
+    expected_thresholded = [[d if d <= 2 else None for d in row] for row in reference]
+    if not (reference == single == batched and thresholded == expected_thresholded):
+        print("ERROR: fast implementation disagrees with reference", file=sys.stderr)
+        return 1
+
+    print(f"reference:               {reference_time:8.3f}s")
+    for name, elapsed in [
+        ("get_modified_distance", single_time),
+        ("get_modified_distances", batched_time),
+        ("  with threshold=2", threshold_time),
+    ]:
+        print(f"{name:24} {elapsed:8.3f}s  {reference_time / elapsed:5.1f}× faster")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,45 @@ from string import ascii_letters
 
 import pytest
 from hypothesis import assume, example, given
-from hypothesis.strategies import text
+from hypothesis.strategies import floats, lists, text
 from Levenshtein import distance
 from morphodict.utils import get_modified_distance
+from morphodict.utils.cree_lev_dist import (
+    del_dist,
+    get_modified_distances,
+    ins_dist,
+    sub_dist,
+)
+
+# Letters that exercise every special case of the metric
+CREE_ALPHABET = "aâāeêēiîīoôōhHkmnpstwyÂÊ-"
+
+
+def reference_modified_distance(spelling: str, normal_form: str) -> float:
+    """
+    The original, straightforward implementation of get_modified_distance()
+
+    It is much slower, but easy to check against the definition of the
+    metric. The fast implementation is tested, and benchmarked in
+    cree_lev_dist_benchmark, against it.
+    """
+    spelling = spelling.lower()
+    normal_form = normal_form.lower()
+    n, m = len(spelling), len(normal_form)
+    d = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        d[i][0] = d[i - 1][0] + del_dist(spelling, i - 1)
+    for j in range(1, m + 1):
+        d[0][j] = d[0][j - 1] + ins_dist(normal_form, normal_form[j - 1], j - 1)
+
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            _del_dist = d[i - 1][j] + del_dist(spelling, i - 1)
+            _ins_dist = d[i][j - 1] + ins_dist(normal_form, normal_form[j - 1], j - 1)
+            _sub_dist = d[i - 1][j - 1] + sub_dist(spelling, normal_form[j - 1], i - 1)
+            d[i][j] = min((_del_dist, _ins_dist, _sub_dist))
+
+    return d[-1][-1]
 
 
 @given(text(alphabet=ascii_letters), text(alphabet=ascii_letters))
@@ -38,3 +74,29 @@ def test_get_distance_basic_lev(spelling: str, normal_form: str):
 )
 def test_get_distance(spelling: str, normal_form: str, expected_distance):
     assert get_modified_distance(spelling, normal_form) == expected_distance
+
+
+@given(text(alphabet=CREE_ALPHABET), text(alphabet=CREE_ALPHABET))
+@example("ha", "")
+@example("", "ha")
+@example("a", "ha")
+def test_fast_distance_matches_reference(spelling: str, normal_form: str):
+    assert get_modified_distance(spelling, normal_form) == (
+        reference_modified_distance(spelling, normal_form)
+    )
+
+
+@given(
+    lists(text(alphabet=CREE_ALPHABET, max_size=12), max_size=8),
+    text(alphabet=CREE_ALPHABET, max_size=12),
+    floats(min_value=0, max_value=6),
+)
+def test_threshold_only_drops_distant_spellings(spellings, normal_form, threshold):
+    distances = get_modified_distances(spellings, normal_form, threshold=threshold)
+
+    for spelling, distance in zip(spellings, distances):
+        expected = reference_modified_distance(spelling, normal_form)
+        if expected <= threshold:
+            assert distance == expected
+        else:
+            assert distance is None
@@ -1,3 +1,5 @@
+from typing import Iterable, Optional, overload
+
 VOWELS = {"a", "e", "i", "o"}
 
 
@@ -96,26 +98,144 @@ def get_modified_distance(spelling: str, normal_form: str) -> float:
 
     This function neglects letter case
 
+    >>> get_modified_distance("atak", "atâhk")
+    1.0
+    >>> get_modified_distance("wâpamew", "wâpamêw")
+    0
+
     :param spelling:
     :param normal_form:
     :return: Our own metric of edit distance
     """
-    # see these slides for "weighted min edit distance"
-    # https://web.stanford.edu/class/cs124/lec/med.pdf
-    spelling = spelling.lower()
-    normal_form = normal_form.lower()
-    n, m = len(spelling), len(normal_form)
-    d = [[0] * (m + 1) for _ in range(n + 1)]
-    for i in range(1, n + 1):
-        d[i][0] = d[i - 1][0] + del_dist(spelling, i - 1)
-    for j in range(1, m + 1):
-        d[0][j] = d[0][j - 1] + ins_dist(normal_form, normal_form[j - 1], j - 1)
-
-    for i in range(1, n + 1):
-        for j in range(1, m + 1):
-            _del_dist = d[i - 1][j] + del_dist(spelling, i - 1)
-            _ins_dist = d[i][j - 1] + ins_dist(normal_form, normal_form[j - 1], j - 1)
-            _sub_dist = d[i - 1][j - 1] + sub_dist(spelling, normal_form[j - 1], i - 1)
-            d[i][j] = min((_del_dist, _ins_dist, _sub_dist))
-
-    return d[-1][-1]
+    return get_modified_distances([spelling], normal_form)[0]
+
+
+@overload
+def get_modified_distances(
+    spellings: Iterable[str], normal_form: str, threshold: None = None
+) -> list[float]: ...
+
+
+@overload
+def get_modified_distances(
+    spellings: Iterable[str], normal_form: str, threshold: float
+) -> list[Optional[float]]: ...
+
+
+def get_modified_distances(
+    spellings: Iterable[str], normal_form: str, threshold: Optional[float] = None
+) -> list[float] | list[Optional[float]]:
+    """
+    Compute get_modified_distance(spelling, normal_form) for many spellings
+
+    This is much faster than calling get_modified_distance() in a loop: the
+    normal form is only prepared once, and all the spellings share one row
+    buffer.
+
+    If a threshold is given, the distance is None for any spelling that is
+    further away than the threshold from the normal form. Those spellings are
+    abandoned as soon as that is certain.
+
+    >>> get_modified_distances(["atâk", "adak", "atâhk"], "atâhk")
+    [0.5, 2.0, 0]
+    >>> get_modified_distances(["atâk", "adak"], "atâhk", threshold=1)
+    [0.5, None]
+    """
+    target = _NormalForm(normal_form)
+    row: list[float] = [0] * (len(target.text) + 1)
+    return [target.distance_from(spelling, row, threshold) for spelling in spellings]
+
+
+class _NormalForm:
+    """A normal form with everything precomputed for comparing spellings to it"""
+
+    def __init__(self, normal_form: str):
+        self.text = normal_form.lower()
+        self.stripped = remove_cree_diacritics(self.text)
+
+        # Cost of inserting each character of the normal form.
+        #
+        # Note that for the first character, this looks at the *last* character
+        # as the preceding one. That is how the original implementation
+        # behaved, and it is kept so that distances do not change.
+        self.insertion_costs = [
+            0.5 if self.stripped[j - 1] in VOWELS and char == "h" else 1
+            for j, char in enumerate(self.text)
+        ]
+
+        # The first row of the distance matrix: inserting every prefix.
+        self.first_row: list[float] = [0]
+        for cost in self.insertion_costs:
+            self.first_row.append(self.first_row[-1] + cost)
+
+        self._substitution_costs: dict[str, list[float]] = {}
+
+    def substitution_costs(self, char: str) -> list[float]:
+        """Cost of substituting char for each character of the normal form
+
+        Memoized, since words share most of their letters.
+        """
+        costs = self._substitution_costs.get(char)
+        if costs is None:
+            stripped_char = remove_cree_diacritics(char)
+            costs = []
+            for other, stripped_other in zip(self.text, self.stripped):
+                if char == other:
+                    costs.append(0)
+                elif stripped_char == stripped_other:
+                    costs.append(0 if stripped_char == "e" else 0.5)
+                else:
+                    costs.append(1)
+            self._substitution_costs[char] = costs
+        return costs
+
+    def distance_from(
+        self, spelling: str, row: list[float], threshold: Optional[float]
+    ) -> Optional[float]:
+        # see these slides for "weighted min edit distance"
+        # https://web.stanford.edu/class/cs124/lec/med.pdf
+        #
+        # Only one row of the matrix is kept: before processing column j,
+        # row[j + 1] holds the distance for the previous prefix of the
+        # spelling, and afterwards for the current one.
+        spelling = spelling.lower()
+        stripped_spelling = remove_cree_diacritics(spelling)
+        insertion_costs = self.insertion_costs
+        m = len(insertion_costs)
+
+        row[:] = self.first_row
+        for i, char in enumerate(spelling):
+            if i > 0 and stripped_spelling[i - 1] in VOWELS and char == "h":
+                deletion_cost = 0.5
+            else:
+                deletion_cost = 1
+            substitution_costs = self.substitution_costs(char)
+
+            diagonal = row[0]
+            left = diagonal + deletion_cost
+            row[0] = left
+            row_minimum = left
+            for j in range(m):
+                above = row[j + 1]
+                best = above + deletion_cost
+                candidate = left + insertion_costs[j]
+                if candidate < best:
+                    best = candidate
+                candidate = diagonal + substitution_costs[j]
+                if candidate < best:
+                    best = candidate
+                row[j + 1] = best
+                diagonal = above
+                left = best
+                if best < row_minimum:
+                    row_minimum = best
+
+            # Costs are never negative, so the final distance is at least the
+            # smallest value in any row.
+            if threshold is not None and row_minimum > threshold:
+                return None
+
+        distance = row[m]
+        if threshold is not None and distance > threshold:
+            return None
+        return distance